@@ -4,6 +4,8 @@ import os
 import shutil
 import base64
 import redis
+import threading
+import time
 
 from datetime import datetime
 from pathlib import Path
@@ -212,15 +214,39 @@ class AppConfig:
     _state: dict[str, PersistentConfig]
     _redis: Optional[redis.Redis] = None
 
+    # Keys whose in-memory value is known to match Redis; updates published by
+    # other workers drop keys from this set so only they are re-read
+    _synced: set[str]
+
+    REDIS_UPDATES_CHANNEL = "open-webui:config:updates"
+
     def __init__(
         self, redis_url: Optional[str] = None, redis_sentinels: Optional[list] = []
     ):
         super().__setattr__("_state", {})
+        super().__setattr__("_synced", set())
         if redis_url:
             super().__setattr__(
                 "_redis",
                 get_redis_connection(redis_url, redis_sentinels, decode_responses=True),
             )
+            threading.Thread(target=self._listen_for_updates, daemon=True).start()
+
+    def _listen_for_updates(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub()
+                pubsub.subscribe(self.REDIS_UPDATES_CHANNEL)
+                for message in pubsub.listen():
+                    if message["type"] == "subscribe":
+                        # Updates may have been missed while not subscribed
+                        self._synced.clear()
+                    elif message["type"] == "message":
+                        self._synced.discard(message["data"])
+            except Exception as e:
+                log.warning(f"Config update subscription lost, retrying: {e}")
+                self._synced.clear()
+                time.sleep(1)
 
     def __setattr__(self, key, value):
         if isinstance(value, PersistentConfig):
@@ -231,16 +257,27 @@ class AppConfig:
 
             if self._redis:
                 redis_key = f"open-webui:config:{key}"
-                self._redis.set(redis_key, json.dumps(self._state[key].value))
+                pipe = self._redis.pipeline()
+                pipe.set(redis_key, json.dumps(self._state[key].value))
+                pipe.publish(self.REDIS_UPDATES_CHANNEL, key)
+                pipe.execute()
 
     def __getattr__(self, key):
         if key not in self._state:
             raise AttributeError(f"Config key '{key}' not found")
 
         # If Redis is available, check for an updated value
-        if self._redis:
+        if self._redis and key not in self._synced:
+            # Mark before reading so an update arriving meanwhile invalidates it again
+            self._synced.add(key)
+
             redis_key = f"open-webui:config:{key}"
-            redis_value = self._redis.get(redis_key)
+            try:
+                redis_value = self._redis.get(redis_key)
+            except Exception as e:
+                log.error(f"Failed to read {key} from Redis: {e}")
+                self._synced.discard(key)
+                redis_value = None
 
             if redis_value is not None:
                 try:
@@ -2175,6 +2212,29 @@ RAG_EMBEDDING_BATCH_SIZE = PersistentConfig(
     ),
 )
 
+# Number of embedding batches sent to ollama/openai/azure_openai in parallel
+RAG_EMBEDDING_CONCURRENT_REQUESTS = int(
+    os.environ.get("RAG_EMBEDDING_CONCURRENT_REQUESTS", "4")
+)
+
+# Seconds to wait for an ollama/openai/azure_openai embedding response
+RAG_EMBEDDING_TIMEOUT = int(os.environ.get("RAG_EMBEDDING_TIMEOUT", "300"))
+
+# Chunks embedded and inserted per step when saving documents to the vector DB,
+# bounding memory to one batch per stage instead of the whole document
+RAG_INGESTION_EMBEDDING_BATCH_SIZE = int(
+    os.environ.get("RAG_INGESTION_EMBEDDING_BATCH_SIZE", "256")
+)
+
+RAG_INGESTION_INSERT_BATCH_SIZE = int(
+    os.environ.get("RAG_INGESTION_INSERT_BATCH_SIZE", "256")
+)
+
+# Embedded batches allowed to wait for insertion before embedding pauses
+RAG_INGESTION_MAX_PENDING_BATCHES = int(
+    os.environ.get("RAG_INGESTION_MAX_PENDING_BATCHES", "2")
+)
+
 RAG_EMBEDDING_QUERY_PREFIX = os.environ.get("RAG_EMBEDDING_QUERY_PREFIX", None)
 
 RAG_EMBEDDING_CONTENT_PREFIX = os.environ.get("RAG_EMBEDDING_CONTENT_PREFIX", None)
@@ -2183,6 +2243,48 @@ RAG_EMBEDDING_PREFIX_FIELD_NAME = os.environ.get(
     "RAG_EMBEDDING_PREFIX_FIELD_NAME", None
 )
 
+# Number of embeddings kept in the in-process LRU cache, 0 disables caching
+RAG_EMBEDDING_CACHE_SIZE = int(os.environ.get("RAG_EMBEDDING_CACHE_SIZE", "10000"))
+
+# Share cached embeddings across workers through Redis (requires REDIS_URL)
+ENABLE_RAG_EMBEDDING_CACHE_REDIS = (
+    os.environ.get("ENABLE_RAG_EMBEDDING_CACHE_REDIS", "False").lower() == "true"
+)
+
+RAG_EMBEDDING_CACHE_REDIS_TTL = int(
+    os.environ.get("RAG_EMBEDDING_CACHE_REDIS_TTL", "86400")
+)
+
+# Reuse split chunks and their vectors when the same content is added to
+# another collection. Stored chunks are plain text on local disk, so the store
+# stays off when vectors are encrypted with pgcrypto
+ENABLE_RAG_CHUNK_STORE = (
+    os.environ.get("ENABLE_RAG_CHUNK_STORE", "False").lower() == "true"
+    and not PGVECTOR_PGCRYPTO
+)
+
+# Bytes of chunks kept on disk before the least recently used are evicted
+RAG_CHUNK_STORE_MAX_SIZE = os.environ.get("RAG_CHUNK_STORE_MAX_SIZE", "1073741824")
+
+try:
+    RAG_CHUNK_STORE_MAX_SIZE = int(RAG_CHUNK_STORE_MAX_SIZE)
+except Exception:
+    RAG_CHUNK_STORE_MAX_SIZE = 1_073_741_824
+
+# Persisted BM25 indexes for hybrid search. Each node rebuilds an index whose
+# document count differs from its vector DB collection, which catches changes
+# made on nodes that don't share this directory (vector DBs without a cheap
+# count, e.g. OpenSearch and Pinecone, need storage shared by all nodes)
+RAG_BM25_INDEX_DIR = Path(os.environ.get("RAG_BM25_INDEX_DIR", str(CACHE_DIR / "bm25")))
+
+# Characters of document text each worker keeps loaded in BM25 indexes
+RAG_BM25_INDEX_CACHE_SIZE = os.environ.get("RAG_BM25_INDEX_CACHE_SIZE", "50000000")
+
+try:
+    RAG_BM25_INDEX_CACHE_SIZE = int(RAG_BM25_INDEX_CACHE_SIZE)
+except Exception:
+    RAG_BM25_INDEX_CACHE_SIZE = 50_000_000
+
 RAG_RERANKING_ENGINE = PersistentConfig(
     "RAG_RERANKING_ENGINE",
     "rag.reranking_engine",
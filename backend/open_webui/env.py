@@ -320,6 +320,60 @@ ENABLE_REALTIME_CHAT_SAVE = (
     os.environ.get("ENABLE_REALTIME_CHAT_SAVE", "False").lower() == "true"
 )
 
+# Seconds to coalesce socket chat events (message/replace/status) before writing them to the database, 0 writes every event
+CHAT_EVENT_WRITE_BUFFER_INTERVAL = os.environ.get(
+    "CHAT_EVENT_WRITE_BUFFER_INTERVAL", "1"
+)
+
+if CHAT_EVENT_WRITE_BUFFER_INTERVAL == "":
+    CHAT_EVENT_WRITE_BUFFER_INTERVAL = 1.0
+else:
+    try:
+        CHAT_EVENT_WRITE_BUFFER_INTERVAL = float(CHAT_EVENT_WRITE_BUFFER_INTERVAL)
+    except Exception:
+        CHAT_EVENT_WRITE_BUFFER_INTERVAL = 1.0
+
+# Number of buffered content characters that triggers an immediate write
+CHAT_EVENT_WRITE_BUFFER_MAX_SIZE = os.environ.get(
+    "CHAT_EVENT_WRITE_BUFFER_MAX_SIZE", "8192"
+)
+
+if CHAT_EVENT_WRITE_BUFFER_MAX_SIZE == "":
+    CHAT_EVENT_WRITE_BUFFER_MAX_SIZE = 8192
+else:
+    try:
+        CHAT_EVENT_WRITE_BUFFER_MAX_SIZE = int(CHAT_EVENT_WRITE_BUFFER_MAX_SIZE)
+    except Exception:
+        CHAT_EVENT_WRITE_BUFFER_MAX_SIZE = 8192
+
+# Seconds to coalesce streamed message content into one chat:completion event, 0 sends every update
+CHAT_RESPONSE_STREAM_FRAME_INTERVAL = os.environ.get(
+    "CHAT_RESPONSE_STREAM_FRAME_INTERVAL", "0.05"
+)
+
+if CHAT_RESPONSE_STREAM_FRAME_INTERVAL == "":
+    CHAT_RESPONSE_STREAM_FRAME_INTERVAL = 0.05
+else:
+    try:
+        CHAT_RESPONSE_STREAM_FRAME_INTERVAL = float(CHAT_RESPONSE_STREAM_FRAME_INTERVAL)
+    except Exception:
+        CHAT_RESPONSE_STREAM_FRAME_INTERVAL = 0.05
+
+# Seconds between full content snapshots among the streamed content deltas
+CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL = os.environ.get(
+    "CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL", "5"
+)
+
+if CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL == "":
+    CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL = 5.0
+else:
+    try:
+        CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL = float(
+            CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL
+        )
+    except Exception:
+        CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL = 5.0
+
 ####################################
 # REDIS
 ####################################
@@ -457,6 +511,155 @@ AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL = (
     os.environ.get("AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL", "True").lower() == "true"
 )
 
+# Tool calls of one model response executed at the same time, 0 means unlimited
+TOOL_CALL_MAX_CONCURRENCY = os.environ.get("TOOL_CALL_MAX_CONCURRENCY", "5")
+
+try:
+    TOOL_CALL_MAX_CONCURRENCY = int(TOOL_CALL_MAX_CONCURRENCY)
+except Exception:
+    TOOL_CALL_MAX_CONCURRENCY = 5
+
+# Seconds a single tool call may run, empty means no limit
+TOOL_CALL_TIMEOUT = os.environ.get("TOOL_CALL_TIMEOUT", "")
+
+if TOOL_CALL_TIMEOUT == "":
+    TOOL_CALL_TIMEOUT = None
+else:
+    try:
+        TOOL_CALL_TIMEOUT = float(TOOL_CALL_TIMEOUT)
+    except Exception:
+        TOOL_CALL_TIMEOUT = None
+
+# Start retrieving with the user's message while the search queries are generated
+ENABLE_RAG_SPECULATIVE_RETRIEVAL = (
+    os.environ.get("ENABLE_RAG_SPECULATIVE_RETRIEVAL", "False").lower() == "true"
+)
+
+# Connection limits for the pooled upstream (Ollama/OpenAI) sessions, 0 means unlimited
+AIOHTTP_CLIENT_POOL_LIMIT = os.environ.get("AIOHTTP_CLIENT_POOL_LIMIT", "0")
+
+try:
+    AIOHTTP_CLIENT_POOL_LIMIT = int(AIOHTTP_CLIENT_POOL_LIMIT)
+except Exception:
+    AIOHTTP_CLIENT_POOL_LIMIT = 0
+
+AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = os.environ.get(
+    "AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST", "100"
+)
+
+try:
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = int(AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST)
+except Exception:
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = 100
+
+AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT = os.environ.get(
+    "AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT", "30"
+)
+
+try:
+    AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT = float(AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT)
+except Exception:
+    AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT = 30.0
+
+AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL = os.environ.get(
+    "AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL", "300"
+)
+
+try:
+    AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL = int(AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL)
+except Exception:
+    AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL = 300
+
+
+# Upstream selection when a model is served by several Ollama/OpenAI connections:
+# "least_outstanding", "ewma" (latency weighted by in-flight requests) or "random"
+UPSTREAM_LOAD_BALANCING_STRATEGY = os.environ.get(
+    "UPSTREAM_LOAD_BALANCING_STRATEGY", "least_outstanding"
+).lower()
+
+# Consecutive failures after which a connection is skipped for the cooldown period
+UPSTREAM_HEALTH_CHECK_MAX_FAILURES = os.environ.get(
+    "UPSTREAM_HEALTH_CHECK_MAX_FAILURES", "3"
+)
+
+try:
+    UPSTREAM_HEALTH_CHECK_MAX_FAILURES = int(UPSTREAM_HEALTH_CHECK_MAX_FAILURES)
+except Exception:
+    UPSTREAM_HEALTH_CHECK_MAX_FAILURES = 3
+
+UPSTREAM_HEALTH_CHECK_COOLDOWN = os.environ.get("UPSTREAM_HEALTH_CHECK_COOLDOWN", "30")
+
+try:
+    UPSTREAM_HEALTH_CHECK_COOLDOWN = float(UPSTREAM_HEALTH_CHECK_COOLDOWN)
+except Exception:
+    UPSTREAM_HEALTH_CHECK_COOLDOWN = 30.0
+
+# Process uploaded files and knowledge reindexing on background workers instead
+# of inside the request (the queue is kept in Redis when REDIS_URL is set)
+ENABLE_INGESTION_QUEUE = (
+    os.environ.get("ENABLE_INGESTION_QUEUE", "False").lower() == "true"
+)
+
+INGESTION_QUEUE_WORKERS = os.environ.get("INGESTION_QUEUE_WORKERS", "2")
+
+try:
+    INGESTION_QUEUE_WORKERS = max(int(INGESTION_QUEUE_WORKERS), 1)
+except Exception:
+    INGESTION_QUEUE_WORKERS = 2
+
+INGESTION_QUEUE_MAX_RETRIES = os.environ.get("INGESTION_QUEUE_MAX_RETRIES", "3")
+
+try:
+    INGESTION_QUEUE_MAX_RETRIES = int(INGESTION_QUEUE_MAX_RETRIES)
+except Exception:
+    INGESTION_QUEUE_MAX_RETRIES = 3
+
+# Worker processes used to run local document loaders (PDF, Office, ...) outside
+# the API process, 0 runs them in the request thread
+DOCUMENT_EXTRACTION_PROCESS_POOL_SIZE = os.environ.get(
+    "DOCUMENT_EXTRACTION_PROCESS_POOL_SIZE", "0"
+)
+
+try:
+    DOCUMENT_EXTRACTION_PROCESS_POOL_SIZE = int(DOCUMENT_EXTRACTION_PROCESS_POOL_SIZE)
+except Exception:
+    DOCUMENT_EXTRACTION_PROCESS_POOL_SIZE = 0
+
+# Seconds a single file may take to extract in the process pool, 0 means no limit
+DOCUMENT_EXTRACTION_TIMEOUT = os.environ.get("DOCUMENT_EXTRACTION_TIMEOUT", "300")
+
+try:
+    DOCUMENT_EXTRACTION_TIMEOUT = float(DOCUMENT_EXTRACTION_TIMEOUT)
+except Exception:
+    DOCUMENT_EXTRACTION_TIMEOUT = 300.0
+
+# Address space limit in MB for each extraction process, 0 means no limit
+DOCUMENT_EXTRACTION_MEMORY_LIMIT = os.environ.get(
+    "DOCUMENT_EXTRACTION_MEMORY_LIMIT", "0"
+)
+
+try:
+    DOCUMENT_EXTRACTION_MEMORY_LIMIT = int(DOCUMENT_EXTRACTION_MEMORY_LIMIT)
+except Exception:
+    DOCUMENT_EXTRACTION_MEMORY_LIMIT = 0
+
+# Seconds the Ollama/OpenAI model lists are reused before they are fetched again
+MODELS_CACHE_TTL = os.environ.get("MODELS_CACHE_TTL", "1")
+
+try:
+    MODELS_CACHE_TTL = float(MODELS_CACHE_TTL)
+except Exception:
+    MODELS_CACHE_TTL = 1.0
+
+# Seconds past the TTL an expired model list is still served while it is
+# refreshed in the background, 0 waits for the refresh instead
+MODELS_CACHE_STALE_TTL = os.environ.get("MODELS_CACHE_STALE_TTL", "30")
+
+try:
+    MODELS_CACHE_STALE_TTL = float(MODELS_CACHE_STALE_TTL)
+except Exception:
+    MODELS_CACHE_STALE_TTL = 30.0
+
 
 ####################################
 # SENTENCE TRANSFORMERS
@@ -66,7 +66,7 @@ def get_function_module_by_id(request: Request, pipe_id: str):
 
 
 async def get_function_models(request):
-    pipes = Functions.get_functions_by_type("pipe", active_only=True)
+    pipes = await Functions.get_functions_by_type_async("pipe", active_only=True)
     pipe_models = []
 
     for pipe in pipes:
@@ -197,7 +197,7 @@ async def generate_function_chat_completion(
         return params
 
     model_id = form_data.get("model")
-    model_info = Models.get_model_by_id(model_id)
+    model_info = await Models.get_model_by_id_async(model_id)
 
     metadata = form_data.pop("metadata", {})
 
@@ -1,6 +1,9 @@
+import asyncio
+import functools
 import json
 import logging
-from contextlib import contextmanager
+import re
+from contextlib import asynccontextmanager, contextmanager
 from typing import Any, Optional
 
 from open_webui.internal.wrappers import register_connection
@@ -15,7 +18,8 @@ from open_webui.env import (
     DATABASE_POOL_TIMEOUT,
 )
 from peewee_migrate import Router
-from sqlalchemy import Dialect, create_engine, MetaData, types
+from sqlalchemy import Dialect, create_engine, MetaData, text, types
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.pool import QueuePool, NullPool
@@ -114,3 +118,144 @@ def get_session():
 
 
 get_db = contextmanager(get_session)
+
+
+####################
+# Async sessions
+####################
+
+
+# Query parameters asyncpg understands itself, all other libpq parameters are
+# translated to asyncpg's connect arguments or dropped
+ASYNCPG_URL_PARAMETERS = {"host", "port", "prepared_statement_cache_size"}
+
+
+def get_async_database_config(database_url: str) -> Optional[tuple[str, dict]]:
+    """
+    Returns the URL and connect_args of the async driver for the database, or
+    None if it has none.
+    """
+    if database_url.startswith("sqlite:///"):
+        return database_url.replace("sqlite://", "sqlite+aiosqlite://", 1), {}
+    if not database_url.startswith("postgresql://"):
+        return None
+
+    url = make_url(database_url)
+    query = {}
+    connect_args = {}
+    server_settings = {}
+
+    for key, value in url.query.items():
+        if isinstance(value, tuple):
+            value = value[-1]
+
+        if key in ASYNCPG_URL_PARAMETERS:
+            query[key] = value
+        elif key == "sslmode":
+            connect_args["ssl"] = value
+        elif key == "connect_timeout":
+            connect_args["timeout"] = float(value)
+        elif key == "application_name":
+            server_settings["application_name"] = value
+        elif key == "options":
+            # e.g. "-c search_path=app -c statement_timeout=5000"
+            for name, setting in re.findall(r"(?:-c\s*|--)([\w.-]+)=(\S+)", value):
+                server_settings[name.replace("-", "_")] = setting
+        else:
+            log.warning(
+                f"Database URL parameter {key} is not supported by asyncpg, async queries ignore it"
+            )
+
+    if server_settings:
+        connect_args["server_settings"] = server_settings
+
+    url = url.set(drivername="postgresql+asyncpg", query=query)
+    return url.render_as_string(hide_password=False), connect_args
+
+
+async_engine = None
+try:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    ASYNC_DATABASE_CONFIG = get_async_database_config(SQLALCHEMY_DATABASE_URL)
+    if ASYNC_DATABASE_CONFIG is None:
+        log.info("No async driver for the database, async queries run in threads")
+    else:
+        ASYNC_SQLALCHEMY_DATABASE_URL, ASYNC_CONNECT_ARGS = ASYNC_DATABASE_CONFIG
+        if ASYNC_SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+            async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL)
+        elif DATABASE_POOL_SIZE > 0:
+            async_engine = create_async_engine(
+                ASYNC_SQLALCHEMY_DATABASE_URL,
+                connect_args=ASYNC_CONNECT_ARGS,
+                pool_size=DATABASE_POOL_SIZE,
+                max_overflow=DATABASE_POOL_MAX_OVERFLOW,
+                pool_timeout=DATABASE_POOL_TIMEOUT,
+                pool_recycle=DATABASE_POOL_RECYCLE,
+                pool_pre_ping=True,
+            )
+        else:
+            async_engine = create_async_engine(
+                ASYNC_SQLALCHEMY_DATABASE_URL,
+                connect_args=ASYNC_CONNECT_ARGS,
+                pool_pre_ping=True,
+                poolclass=NullPool,
+            )
+except ImportError as e:
+    log.info(f"Async database driver not installed, async queries run in threads: {e}")
+except Exception as e:
+    log.warning(
+        f"Unable to create async database engine, async queries run in threads: {e}"
+    )
+
+AsyncSessionLocal = (
+    async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    if async_engine is not None
+    else None
+)
+async_engine_checked = False
+
+
+@asynccontextmanager
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def check_async_engine() -> bool:
+    """
+    Connects with the async engine on first use. If that fails, e.g. because
+    the driver rejects the connection settings, async queries run in threads
+    from then on.
+    """
+    global async_engine, async_engine_checked
+
+    if async_engine is None or async_engine_checked:
+        return async_engine is not None
+
+    try:
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        async_engine_checked = True
+    except Exception as e:
+        log.warning(
+            f"Async database connection failed, async queries run in threads: {e}"
+        )
+        async_engine = None
+    return async_engine is not None
+
+
+def async_db_method(func):
+    """
+    Marks a `*_async` table method. Without an async driver the blocking
+    method of the same name runs in a worker thread instead.
+    """
+    sync_name = func.__name__.removesuffix("_async")
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        if not await check_async_engine():
+            return await asyncio.to_thread(getattr(self, sync_name), *args, **kwargs)
+        return await func(self, *args, **kwargs)
+
+    return wrapper
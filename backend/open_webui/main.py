@@ -57,6 +57,7 @@ from open_webui.utils.logger import start_logger
 from open_webui.socket.main import (
     app as socket_app,
     periodic_usage_pool_cleanup,
+    flush_chat_event_writes,
     get_models_in_use,
     get_active_user_ids,
 )
@@ -433,7 +434,8 @@ from open_webui.utils.chat import (
 )
 from open_webui.utils.embeddings import generate_embeddings
 from open_webui.utils.middleware import process_chat_payload, process_chat_response
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import has_access, get_user_group_ids
+from open_webui.utils.model_access import MODEL_ACCESS_CACHE
 
 from open_webui.utils.auth import (
     get_license_data,
@@ -443,6 +445,9 @@ from open_webui.utils.auth import (
     get_verified_user,
 )
 from open_webui.utils.plugin import install_tool_and_function_dependencies
+from open_webui.utils.http_client import CLIENT_SESSION_POOL, close_client_sessions
+from open_webui.utils.ingestion import INGESTION_QUEUE
+from open_webui.retrieval.loaders.pool import DOCUMENT_EXTRACTION_POOL
 from open_webui.utils.oauth import OAuthManager
 from open_webui.utils.security_headers import SecurityHeadersMiddleware
 from open_webui.utils.redis import get_redis_connection
@@ -533,8 +538,20 @@ async def lifespan(app: FastAPI):
 
     asyncio.create_task(periodic_usage_pool_cleanup())
 
+    # Background workers for queued file ingestion (ENABLE_INGESTION_QUEUE)
+    await INGESTION_QUEUE.start(app)
+
     yield
 
+    await INGESTION_QUEUE.stop()
+    DOCUMENT_EXTRACTION_POOL.shutdown()
+
+    # Persist any chat events still held by the write-behind buffer
+    await flush_chat_event_writes()
+
+    # Close the pooled upstream connections
+    await close_client_sessions()
+
     if hasattr(app.state, "redis_task_command_listener"):
         app.state.redis_task_command_listener.cancel()
 
@@ -1189,26 +1206,29 @@ if audit_level != AuditLevel.NONE:
 
 @app.get("/api/models")
 async def get_models(request: Request, user=Depends(get_verified_user)):
-    def get_filtered_models(models, user):
+    async def get_filtered_models(models, user):
         filtered_models = []
+        user_group_ids = None
+        accessible_model_ids = await MODEL_ACCESS_CACHE.get_accessible_model_ids(
+            user.id, [model["id"] for model in models if not model.get("arena")]
+        )
         for model in models:
             if model.get("arena"):
+                if user_group_ids is None:
+                    user_group_ids = get_user_group_ids(user.id)
                 if has_access(
                     user.id,
                     type="read",
                     access_control=model.get("info", {})
                     .get("meta", {})
                     .get("access_control", {}),
+                    user_group_ids=user_group_ids,
                 ):
                     filtered_models.append(model)
                 continue
 
-            model_info = Models.get_model_by_id(model["id"])
-            if model_info:
-                if user.id == model_info.user_id or has_access(
-                    user.id, type="read", access_control=model_info.access_control
-                ):
-                    filtered_models.append(model)
+            if model["id"] in accessible_model_ids:
+                filtered_models.append(model)
 
         return filtered_models
 
@@ -1246,7 +1266,7 @@ async def get_models(request: Request, user=Depends(get_verified_user)):
 
     # Filter out models that the user does not have access to
     if user.role == "user" and not BYPASS_MODEL_ACCESS_CONTROL:
-        models = get_filtered_models(models, user)
+        models = await get_filtered_models(models, user)
 
     log.debug(
         f"/api/models returned filtered models accessible to the user: {json.dumps([model['id'] for model in models])}"
@@ -1311,7 +1331,7 @@ async def chat_completion(
                 raise Exception("Model not found")
 
             model = request.app.state.MODELS[model_id]
-            model_info = Models.get_model_by_id(model_id)
+            model_info = await Models.get_model_by_id_async(model_id)
 
             # Check if user has access to the model
             if not BYPASS_MODEL_ACCESS_CONTROL and user.role == "user":
@@ -1362,13 +1382,14 @@ async def chat_completion(
         log.debug(f"Error processing chat payload: {e}")
         if metadata.get("chat_id") and metadata.get("message_id"):
             # Update the chat message with the error
-            Chats.upsert_message_to_chat_by_id_and_message_id(
+            await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                 metadata["chat_id"],
                 metadata["message_id"],
                 {
                     "error": {"content": str(e)},
                 },
             )
+            await Chats.compact_chat_messages_by_id_async(metadata["chat_id"])
 
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -1385,13 +1406,14 @@ async def chat_completion(
         log.debug(f"Error in chat completion: {e}")
         if metadata.get("chat_id") and metadata.get("message_id"):
             # Update the chat message with the error
-            Chats.upsert_message_to_chat_by_id_and_message_id(
+            await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                 metadata["chat_id"],
                 metadata["message_id"],
                 {
                     "error": {"content": str(e)},
                 },
             )
+            await Chats.compact_chat_messages_by_id_async(metadata["chat_id"])
 
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -1462,7 +1484,7 @@ async def list_tasks_endpoint(request: Request, user=Depends(get_verified_user))
 async def list_tasks_by_chat_id_endpoint(
     request: Request, chat_id: str, user=Depends(get_verified_user)
 ):
-    chat = Chats.get_chat_by_id(chat_id)
+    chat = await Chats.get_chat_by_id_async(chat_id)
     if chat is None or chat.user_id != user.id:
         return {"task_ids": []}
 
@@ -1493,7 +1515,7 @@ async def get_app_config(request: Request):
                 detail="Invalid token",
             )
         if data is not None and "id" in data:
-            user = Users.get_user_by_id(data["id"])
+            user = await Users.get_user_by_id_async(data["id"])
 
     user_count = Users.get_num_users()
     onboarding = False
@@ -1660,12 +1682,24 @@ async def get_current_usage(user=Depends(get_verified_user)):
     This is an experimental endpoint and subject to change.
     """
     try:
-        return {"model_ids": get_models_in_use(), "user_ids": get_active_user_ids()}
+        return {
+            "model_ids": get_models_in_use(),
+            "user_ids": await get_active_user_ids(),
+        }
     except Exception as e:
         log.error(f"Error getting usage statistics: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+@app.get("/api/usage/connections")
+async def get_upstream_connection_usage(user=Depends(get_admin_user)):
+    """
+    Get connection pool statistics for upstream (Ollama/OpenAI) servers.
+    A growing "queued" count means the per-host connection limit is saturated.
+    """
+    return CLIENT_SESSION_POOL.get_stats()
+
+
 ############################
 # OAuth Login & Callback
 ############################
@@ -0,0 +1,78 @@
+"""Add group_member table
+
+Revision ID: a5c2b1d84e3f
+Revises: d31026856c01
+Create Date: 2025-06-12 03:00:00.000000
+
+"""
+
+import json
+import time
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column
+
+revision = "a5c2b1d84e3f"
+down_revision = "d31026856c01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "group_member",
+        sa.Column(
+            "id", sa.Text(), nullable=False, primary_key=True, unique=True
+        ),  # Record ID for the membership row
+        sa.Column("group_id", sa.Text(), nullable=False),  # Associated group
+        sa.Column("user_id", sa.Text(), nullable=False),  # Associated user
+        sa.Column(
+            "created_at", sa.BigInteger(), nullable=True
+        ),  # Timestamp of when the user was added to the group
+    )
+
+    op.create_index("group_member_user_id_idx", "group_member", ["user_id"])
+    op.create_index("group_member_group_id_idx", "group_member", ["group_id"])
+
+    # Backfill memberships from the existing 'user_ids' JSON column
+    group = table(
+        "group",
+        column("id", sa.Text()),
+        column("user_ids", sa.JSON()),
+    )
+    group_member = table(
+        "group_member",
+        column("id", sa.Text()),
+        column("group_id", sa.Text()),
+        column("user_id", sa.Text()),
+        column("created_at", sa.BigInteger()),
+    )
+
+    conn = op.get_bind()
+    now = int(time.time())
+
+    rows = []
+    for group_id, user_ids in conn.execute(sa.select(group.c.id, group.c.user_ids)):
+        if isinstance(user_ids, str):
+            user_ids = json.loads(user_ids)
+
+        for user_id in set(user_ids or []):
+            rows.append(
+                {
+                    "id": str(uuid.uuid4()),
+                    "group_id": group_id,
+                    "user_id": user_id,
+                    "created_at": now,
+                }
+            )
+
+    if rows:
+        op.bulk_insert(group_member, rows)
+
+
+def downgrade():
+    op.drop_index("group_member_group_id_idx", table_name="group_member")
+    op.drop_index("group_member_user_id_idx", table_name="group_member")
+    op.drop_table("group_member")
@@ -0,0 +1,34 @@
+"""Add message indexes
+
+Revision ID: b7e41c9d2a60
+Revises: a5c2b1d84e3f
+Create Date: 2025-06-20 03:00:00.000000
+
+"""
+
+from alembic import op
+
+revision = "b7e41c9d2a60"
+down_revision = "a5c2b1d84e3f"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keyset pagination of channel and thread messages
+    op.create_index(
+        "message_channel_id_parent_id_created_at_idx",
+        "message",
+        ["channel_id", "parent_id", "created_at"],
+    )
+    # Reply counts of a page of messages
+    op.create_index("message_parent_id_idx", "message", ["parent_id"])
+    op.create_index(
+        "message_reaction_message_id_idx", "message_reaction", ["message_id"]
+    )
+
+
+def downgrade():
+    op.drop_index("message_reaction_message_id_idx", table_name="message_reaction")
+    op.drop_index("message_parent_id_idx", table_name="message")
+    op.drop_index("message_channel_id_parent_id_created_at_idx", table_name="message")
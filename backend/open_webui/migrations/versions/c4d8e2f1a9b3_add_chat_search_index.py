@@ -0,0 +1,170 @@
+"""Add chat search index
+
+Revision ID: c4d8e2f1a9b3
+Revises: b7e41c9d2a60
+Create Date: 2025-06-24 03:00:00.000000
+
+"""
+
+import json
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import table, column
+
+log = logging.getLogger(__name__)
+
+revision = "c4d8e2f1a9b3"
+down_revision = "b7e41c9d2a60"
+branch_labels = None
+depends_on = None
+
+# Keep in sync with open_webui.models.chats
+MAX_CONTENT_LENGTH = 200_000
+
+
+def get_token(prefix, value):
+    return f"{prefix}{value.encode().hex()}"
+
+
+def get_content(chat):
+    messages = chat.get("messages")
+    if not isinstance(messages, list):
+        messages = list(chat.get("history", {}).get("messages", {}).values())
+
+    contents = []
+    for message in messages:
+        content = message.get("content") if isinstance(message, dict) else None
+        if isinstance(content, list):
+            content = " ".join(
+                item.get("text", "")
+                for item in content
+                if isinstance(item, dict) and item.get("type") == "text"
+            )
+        if isinstance(content, str) and content:
+            contents.append(content)
+
+    return "\n".join(contents)[:MAX_CONTENT_LENGTH]
+
+
+def get_tags(meta):
+    tags = meta.get("tags", []) if isinstance(meta, dict) else []
+    if not tags:
+        # Matched by the "tag:none" search filter
+        return get_token("t", "none")
+    return " ".join(get_token("t", tag) for tag in tags)
+
+
+def upgrade():
+    conn = op.get_bind()
+    dialect_name = conn.dialect.name
+
+    if dialect_name == "sqlite":
+        try:
+            op.execute(
+                "CREATE VIRTUAL TABLE chat_search USING fts5("
+                "user_id, title, content, tags, "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+        except Exception as e:
+            # Without the index, chat search keeps scanning the chat JSON
+            log.warning(f"SQLite FTS5 unavailable, skipping chat search index: {e}")
+            return
+
+        op.create_table(
+            "chat_search_id",
+            sa.Column("id", sa.Integer(), primary_key=True),  # FTS5 rowid
+            sa.Column("chat_id", sa.Text(), nullable=False, unique=True),
+        )
+    elif dialect_name == "postgresql":
+        op.create_table(
+            "chat_search",
+            sa.Column("chat_id", sa.Text(), primary_key=True),
+            sa.Column("user_id", sa.Text(), nullable=False),
+            sa.Column("search_vector", postgresql.TSVECTOR()),
+        )
+        op.create_index("chat_search_user_id_idx", "chat_search", ["user_id"])
+        op.create_index(
+            "chat_search_search_vector_idx",
+            "chat_search",
+            ["search_vector"],
+            postgresql_using="gin",
+        )
+    else:
+        return
+
+    # Backfill the index from the existing chats
+    chat = table(
+        "chat",
+        column("id", sa.Text()),
+        column("user_id", sa.Text()),
+        column("title", sa.Text()),
+        column("chat", sa.JSON()),
+        column("meta", sa.JSON()),
+    )
+
+    result = conn.execution_options(yield_per=500).execute(
+        sa.select(
+            chat.c.id, chat.c.user_id, chat.c.title, chat.c.chat, chat.c.meta
+        ).where(chat.c.user_id.notlike("shared-%"))
+    )
+    for chat_id, user_id, title, chat_data, meta in result:
+        if isinstance(chat_data, str):
+            chat_data = json.loads(chat_data)
+        if isinstance(meta, str):
+            meta = json.loads(meta)
+
+        params = {
+            "chat_id": chat_id,
+            "user_id": user_id,
+            "title": title or "",
+            "content": get_content(chat_data or {}),
+            "tags": get_tags(meta or {}),
+        }
+
+        if dialect_name == "postgresql":
+            conn.execute(
+                sa.text(
+                    """
+                    INSERT INTO chat_search (chat_id, user_id, search_vector)
+                    VALUES (
+                        :chat_id,
+                        :user_id,
+                        setweight(to_tsvector('simple', :title), 'A')
+                        || setweight(to_tsvector('simple', :content), 'B')
+                        || setweight(to_tsvector('simple', :tags), 'D')
+                    )
+                    """
+                ),
+                params,
+            )
+        else:
+            rowid = conn.execute(
+                sa.text("INSERT INTO chat_search_id (chat_id) VALUES (:chat_id)"),
+                params,
+            ).lastrowid
+            conn.execute(
+                sa.text(
+                    """
+                    INSERT INTO chat_search (rowid, user_id, title, content, tags)
+                    VALUES (:rowid, :user_token, :title, :content, :tags)
+                    """
+                ),
+                {**params, "rowid": rowid, "user_token": get_token("u", user_id)},
+            )
+
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if conn.dialect.name == "postgresql":
+        if inspector.has_table("chat_search"):
+            op.drop_index("chat_search_search_vector_idx", table_name="chat_search")
+            op.drop_index("chat_search_user_id_idx", table_name="chat_search")
+            op.drop_table("chat_search")
+    elif inspector.has_table("chat_search_id"):
+        op.drop_table("chat_search_id")
+        op.execute("DROP TABLE IF EXISTS chat_search")
@@ -0,0 +1,46 @@
+"""Add chat_message table
+
+Revision ID: d31026856c01
+Revises: 9f0c9cd09105
+Create Date: 2025-06-10 03:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "d31026856c01"
+down_revision = "9f0c9cd09105"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "chat_message",
+        sa.Column(
+            "id", sa.Text(), nullable=False, primary_key=True, unique=True
+        ),  # Record ID for the pending message row
+        sa.Column("chat_id", sa.Text(), nullable=False),  # Associated chat
+        sa.Column("message_id", sa.Text(), nullable=False),  # Associated message
+        sa.Column(
+            "data", sa.JSON(), nullable=True
+        ),  # Message fields to merge into the chat history
+        sa.Column(
+            "status_history", sa.JSON(), nullable=True
+        ),  # Status entries to append to the message
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+    )
+
+    op.create_index(
+        "chat_message_chat_id_message_id_idx",
+        "chat_message",
+        ["chat_id", "message_id"],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_index("chat_message_chat_id_message_id_idx", table_name="chat_message")
+    op.drop_table("chat_message")
@@ -0,0 +1,26 @@
+"""Add data_updated_at to chat_message
+
+Revision ID: e5f1a7c3b9d2
+Revises: c4d8e2f1a9b3
+Create Date: 2025-06-30 03:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "e5f1a7c3b9d2"
+down_revision = "c4d8e2f1a9b3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "chat_message",
+        sa.Column("data_updated_at", sa.BigInteger(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_column("chat_message", "data_updated_at")
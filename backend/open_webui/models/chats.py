@@ -1,17 +1,20 @@
+import copy
 import logging
 import json
+import re
 import time
 import uuid
 from typing import Optional
 
-from open_webui.internal.db import Base, get_db
+from open_webui.internal.db import Base, get_db, get_async_db, async_db_method
 from open_webui.models.tags import TagModel, Tag, Tags
 from open_webui.env import SRC_LOG_LEVELS
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
-from sqlalchemy import or_, func, select, and_, text
-from sqlalchemy.sql import exists
+from sqlalchemy import or_, func, select, and_, text, delete, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.sql import exists, table, column
 
 ####################
 # Chat DB Schema
@@ -40,6 +43,23 @@ class Chat(Base):
     folder_id = Column(Text, nullable=True)
 
 
+class ChatMessage(Base):
+    __tablename__ = "chat_message"
+
+    id = Column(Text, primary_key=True)
+    chat_id = Column(Text)
+    message_id = Column(Text)
+
+    # Pending message fields and status entries, merged into `Chat.chat` on read
+    data = Column(JSON, nullable=True)
+    status_history = Column(JSON, nullable=True)
+
+    created_at = Column(BigInteger)  # time_ns
+    updated_at = Column(BigInteger)  # time_ns
+    # Last write to `data`, status entries only move `updated_at`
+    data_updated_at = Column(BigInteger, nullable=True)  # time_ns
+
+
 class ChatModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -59,6 +79,21 @@ class ChatModel(BaseModel):
     folder_id: Optional[str] = None
 
 
+class ChatMessageModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    chat_id: str
+    message_id: str
+
+    data: Optional[dict] = None
+    status_history: Optional[list] = None
+
+    created_at: int  # timestamp in epoch (time_ns)
+    updated_at: int  # timestamp in epoch (time_ns)
+    data_updated_at: Optional[int] = None  # timestamp in epoch (time_ns)
+
+
 ####################
 # Forms
 ####################
@@ -104,7 +139,273 @@ class ChatTitleIdResponse(BaseModel):
     created_at: int
 
 
+# Chats whose pending message rows are loaded with one query
+CHAT_MESSAGE_BATCH_SIZE = 500
+
+
+def merge_chat_messages(chat: dict, chat_messages: list[ChatMessageModel]) -> dict:
+    """
+    Applies pending per-message rows onto a chat blob, in write order. The
+    message whose data was written last becomes the current one, status
+    entries don't move it.
+    """
+    if not chat_messages:
+        return chat
+
+    history = chat.get("history", {})
+    messages = history.get("messages", {})
+    current_updated_at = None
+
+    for chat_message in sorted(chat_messages, key=lambda m: m.updated_at):
+        message_id = chat_message.message_id
+
+        if chat_message.data is not None:
+            if message_id in messages:
+                messages[message_id] = {
+                    **messages[message_id],
+                    **chat_message.data,
+                }
+            else:
+                messages[message_id] = chat_message.data
+
+            # Rows written before data_updated_at existed
+            data_updated_at = chat_message.data_updated_at or chat_message.updated_at
+            if current_updated_at is None or data_updated_at >= current_updated_at:
+                current_updated_at = data_updated_at
+                history["currentId"] = message_id
+
+        if chat_message.status_history and message_id in messages:
+            messages[message_id]["statusHistory"] = [
+                *messages[message_id].get("statusHistory", []),
+                *chat_message.status_history,
+            ]
+
+    history["messages"] = messages
+    chat["history"] = history
+    return chat
+
+
+####################
+# Chat search index
+####################
+
+# Tables maintained by the "Add chat search index" migration. SQLite uses an
+# FTS5 table keyed by the integer ids in chat_search_id, PostgreSQL a tsvector
+# column with a GIN index.
+chat_search_id_table = table("chat_search_id", column("id"), column("chat_id"))
+sqlite_chat_search_table = table("chat_search", column("rowid"))
+postgresql_chat_search_table = table("chat_search", column("chat_id"))
+
+# Longer chats are only indexed up to this many characters of content
+CHAT_SEARCH_MAX_CONTENT_LENGTH = 200_000
+
+
+def get_chat_search_token(prefix: str, value: str) -> str:
+    """
+    User and tag ids are indexed as single alphanumeric tokens so the
+    full-text index can match them exactly.
+    """
+    return f"{prefix}{value.encode().hex()}"
+
+
+def get_chat_search_content(chat: dict) -> str:
+    messages = chat.get("messages")
+    if not isinstance(messages, list):
+        messages = list(chat.get("history", {}).get("messages", {}).values())
+
+    contents = []
+    for message in messages:
+        content = message.get("content") if isinstance(message, dict) else None
+        if isinstance(content, list):
+            content = " ".join(
+                item.get("text", "")
+                for item in content
+                if isinstance(item, dict) and item.get("type") == "text"
+            )
+        if isinstance(content, str) and content:
+            contents.append(content)
+
+    return "\n".join(contents)[:CHAT_SEARCH_MAX_CONTENT_LENGTH]
+
+
+def get_chat_search_tags(meta: dict) -> str:
+    tags = meta.get("tags", []) if isinstance(meta, dict) else []
+    if not tags:
+        # Matched by the "tag:none" search filter
+        return get_chat_search_token("t", "none")
+    return " ".join(get_chat_search_token("t", tag) for tag in tags)
+
+
 class ChatTable:
+    # Whether the chat search index tables exist, checked on first use
+    chat_search_index: Optional[bool] = None
+
+    def _has_chat_search_index(self, db) -> bool:
+        if self.chat_search_index is None:
+            ChatTable.chat_search_index = inspect(db.connection()).has_table(
+                "chat_search"
+            )
+        return self.chat_search_index
+
+    def _update_chat_search_index(self, db, chat: Chat):
+        """
+        Refreshes the search index entry of a chat in the caller's transaction.
+        Indexing errors are logged and never fail the chat write itself.
+        """
+        if (
+            chat is None
+            or chat.user_id.startswith("shared-")
+            or not self._has_chat_search_index(db)
+        ):
+            return
+
+        params = {
+            "chat_id": chat.id,
+            "user_id": chat.user_id,
+            "title": chat.title or "",
+            "content": get_chat_search_content(chat.chat or {}),
+            "tags": get_chat_search_tags(chat.meta or {}),
+        }
+
+        try:
+            # A failed statement must not abort the caller's transaction, and the
+            # SQLite delete and insert of an entry must not apply on their own
+            with db.begin_nested():
+                if db.bind.dialect.name == "postgresql":
+                    db.execute(
+                        text(
+                            """
+                            INSERT INTO chat_search (chat_id, user_id, search_vector)
+                            VALUES (
+                                :chat_id,
+                                :user_id,
+                                setweight(to_tsvector('simple', :title), 'A')
+                                || setweight(to_tsvector('simple', :content), 'B')
+                                || setweight(to_tsvector('simple', :tags), 'D')
+                            )
+                            ON CONFLICT (chat_id) DO UPDATE
+                            SET user_id = EXCLUDED.user_id,
+                                search_vector = EXCLUDED.search_vector
+                            """
+                        ),
+                        params,
+                    )
+                else:
+                    db.execute(
+                        text(
+                            "INSERT OR IGNORE INTO chat_search_id (chat_id) VALUES (:chat_id)"
+                        ),
+                        params,
+                    )
+                    rowid = db.execute(
+                        text("SELECT id FROM chat_search_id WHERE chat_id = :chat_id"),
+                        params,
+                    ).scalar()
+                    db.execute(
+                        text("DELETE FROM chat_search WHERE rowid = :rowid"),
+                        {"rowid": rowid},
+                    )
+                    db.execute(
+                        text(
+                            """
+                            INSERT INTO chat_search (rowid, user_id, title, content, tags)
+                            VALUES (:rowid, :user_token, :title, :content, :tags)
+                            """
+                        ),
+                        {
+                            **params,
+                            "rowid": rowid,
+                            "user_token": get_chat_search_token("u", chat.user_id),
+                        },
+                    )
+        except Exception as e:
+            log.warning(f"Error updating search index of chat {chat.id}: {e}")
+
+    def _delete_chat_search_index(self, db, chat_ids):
+        """
+        Removes the search index entries of the chats whose ids are selected
+        in `chat_ids` (a list or a select of ids).
+        """
+        if not self._has_chat_search_index(db):
+            return
+
+        try:
+            # Drop the SQLite entries and their id mapping together
+            with db.begin_nested():
+                if db.bind.dialect.name == "postgresql":
+                    db.execute(
+                        delete(postgresql_chat_search_table).where(
+                            postgresql_chat_search_table.c.chat_id.in_(chat_ids)
+                        )
+                    )
+                else:
+                    db.execute(
+                        delete(sqlite_chat_search_table).where(
+                            sqlite_chat_search_table.c.rowid.in_(
+                                select(chat_search_id_table.c.id).where(
+                                    chat_search_id_table.c.chat_id.in_(chat_ids)
+                                )
+                            )
+                        )
+                    )
+                    db.execute(
+                        delete(chat_search_id_table).where(
+                            chat_search_id_table.c.chat_id.in_(chat_ids)
+                        )
+                    )
+        except Exception as e:
+            log.warning(f"Error deleting chat search index entries: {e}")
+
+    def _get_chat_messages_by_chat_id(self, db, chat_id: str) -> list[ChatMessageModel]:
+        chat_messages = db.query(ChatMessage).filter_by(chat_id=chat_id).all()
+        return [
+            ChatMessageModel.model_validate(chat_message)
+            for chat_message in chat_messages
+        ]
+
+    def _to_chat_model(self, db, chat: Chat) -> ChatModel:
+        chat_model = ChatModel.model_validate(chat)
+        chat_messages = self._get_chat_messages_by_chat_id(db, chat_model.id)
+        if chat_messages:
+            chat_model.chat = merge_chat_messages(chat_model.chat, chat_messages)
+        return chat_model
+
+    def _to_chat_models(self, db, chats) -> list[ChatModel]:
+        """
+        Converts a list of chats, merging their pending `chat_message` rows
+        loaded in batches instead of one query per chat.
+        """
+        chat_models = [ChatModel.model_validate(chat) for chat in chats]
+
+        chat_messages = {}
+        chat_ids = [chat_model.id for chat_model in chat_models]
+        for i in range(0, len(chat_ids), CHAT_MESSAGE_BATCH_SIZE):
+            batch_ids = chat_ids[i : i + CHAT_MESSAGE_BATCH_SIZE]
+            for chat_message in db.query(ChatMessage).filter(
+                ChatMessage.chat_id.in_(batch_ids)
+            ):
+                chat_messages.setdefault(chat_message.chat_id, []).append(
+                    ChatMessageModel.model_validate(chat_message)
+                )
+
+        for chat_model in chat_models:
+            if chat_model.id in chat_messages:
+                chat_model.chat = merge_chat_messages(
+                    chat_model.chat, chat_messages[chat_model.id]
+                )
+        return chat_models
+
+    async def _to_chat_model_async(self, db, chat: Chat) -> ChatModel:
+        chat_model = ChatModel.model_validate(chat)
+        result = await db.execute(select(ChatMessage).filter_by(chat_id=chat_model.id))
+        chat_messages = [
+            ChatMessageModel.model_validate(chat_message)
+            for chat_message in result.scalars()
+        ]
+        if chat_messages:
+            chat_model.chat = merge_chat_messages(chat_model.chat, chat_messages)
+        return chat_model
+
     def insert_new_chat(self, user_id: str, form_data: ChatForm) -> Optional[ChatModel]:
         with get_db() as db:
             id = str(uuid.uuid4())
@@ -125,6 +426,7 @@ class ChatTable:
 
             result = Chat(**chat.model_dump())
             db.add(result)
+            self._update_chat_search_index(db, result)
             db.commit()
             db.refresh(result)
             return ChatModel.model_validate(result) if result else None
@@ -154,6 +456,7 @@ class ChatTable:
 
             result = Chat(**chat.model_dump())
             db.add(result)
+            self._update_chat_search_index(db, result)
             db.commit()
             db.refresh(result)
             return ChatModel.model_validate(result) if result else None
@@ -165,6 +468,10 @@ class ChatTable:
                 chat_item.chat = chat
                 chat_item.title = chat["title"] if "title" in chat else "New Chat"
                 chat_item.updated_at = int(time.time())
+
+                # The full chat supersedes any pending message rows
+                db.query(ChatMessage).filter_by(chat_id=id).delete()
+                self._update_chat_search_index(db, chat_item)
                 db.commit()
                 db.refresh(chat_item)
 
@@ -172,6 +479,27 @@ class ChatTable:
         except Exception:
             return None
 
+    @async_db_method
+    async def update_chat_by_id_async(self, id: str, chat: dict) -> Optional[ChatModel]:
+        try:
+            async with get_async_db() as db:
+                chat_item = await db.get(Chat, id)
+                chat_item.chat = chat
+                chat_item.title = chat["title"] if "title" in chat else "New Chat"
+                chat_item.updated_at = int(time.time())
+
+                # The full chat supersedes any pending message rows
+                await db.execute(delete(ChatMessage).filter_by(chat_id=id))
+                await db.run_sync(
+                    lambda sync_db: self._update_chat_search_index(sync_db, chat_item)
+                )
+                await db.commit()
+                await db.refresh(chat_item)
+
+                return ChatModel.model_validate(chat_item)
+        except Exception:
+            return None
+
     def update_chat_title_by_id(self, id: str, title: str) -> Optional[ChatModel]:
         chat = self.get_chat_by_id(id)
         if chat is None:
@@ -182,6 +510,18 @@ class ChatTable:
 
         return self.update_chat_by_id(id, chat)
 
+    async def update_chat_title_by_id_async(
+        self, id: str, title: str
+    ) -> Optional[ChatModel]:
+        chat = await self.get_chat_by_id_async(id)
+        if chat is None:
+            return None
+
+        chat = chat.chat
+        chat["title"] = title
+
+        return await self.update_chat_by_id_async(id, chat)
+
     def update_chat_tags_by_id(
         self, id: str, tags: list[str], user
     ) -> Optional[ChatModel]:
@@ -209,6 +549,13 @@ class ChatTable:
 
         return chat.chat.get("title", "New Chat")
 
+    async def get_chat_title_by_id_async(self, id: str) -> Optional[str]:
+        chat = await self.get_chat_by_id_async(id)
+        if chat is None:
+            return None
+
+        return chat.chat.get("title", "New Chat")
+
     def get_messages_by_chat_id(self, id: str) -> Optional[dict]:
         chat = self.get_chat_by_id(id)
         if chat is None:
@@ -225,51 +572,233 @@ class ChatTable:
 
         return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
 
-    def upsert_message_to_chat_by_id_and_message_id(
-        self, id: str, message_id: str, message: dict
-    ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
+    async def get_message_by_id_and_message_id_async(
+        self, id: str, message_id: str
+    ) -> Optional[dict]:
+        chat = await self.get_chat_by_id_async(id)
         if chat is None:
             return None
 
-        chat = chat.chat
-        history = chat.get("history", {})
+        return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
 
-        if message_id in history.get("messages", {}):
-            history["messages"][message_id] = {
-                **history["messages"][message_id],
-                **message,
-            }
+    def _get_chat_message_values(
+        self,
+        id: str,
+        message_id: str,
+        data: Optional[dict] = None,
+        status: Optional[dict] = None,
+    ) -> dict:
+        ts = int(time.time_ns())
+        return {
+            "id": str(uuid.uuid4()),
+            "chat_id": id,
+            "message_id": message_id,
+            "data": data,
+            "status_history": [status] if status is not None else None,
+            "created_at": ts,
+            "updated_at": ts,
+            "data_updated_at": ts if data is not None else None,
+        }
+
+    def _insert_chat_message(self, dialect_name: str, values: dict):
+        """
+        Inserts a pending row unless the message already has one, so
+        concurrent first writes don't fail on the unique index. None on
+        databases without ON CONFLICT support.
+        """
+        if dialect_name == "postgresql":
+            stmt = postgresql.insert(ChatMessage)
+        elif dialect_name == "sqlite":
+            stmt = sqlite.insert(ChatMessage)
         else:
-            history["messages"][message_id] = message
+            return None
+
+        return stmt.values(**values).on_conflict_do_nothing(
+            index_elements=["chat_id", "message_id"]
+        )
+
+    def _update_chat_message(self, chat_message: ChatMessage, values: dict):
+        if values["data"] is not None:
+            chat_message.data = {**(chat_message.data or {}), **values["data"]}
+            chat_message.data_updated_at = values["data_updated_at"]
+        if values["status_history"] is not None:
+            chat_message.status_history = [
+                *(chat_message.status_history or []),
+                *values["status_history"],
+            ]
+        chat_message.updated_at = values["updated_at"]
 
-        history["currentId"] = message_id
+    def _upsert_chat_message(
+        self, id: str, message_id: str, values: dict
+    ) -> Optional[ChatMessageModel]:
+        try:
+            with get_db() as db:
+                if db.query(Chat.id).filter_by(id=id).first() is None:
+                    return None
 
-        chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+                stmt = self._insert_chat_message(db.bind.dialect.name, values)
+                if stmt is None or db.execute(stmt).rowcount == 0:
+                    chat_message = (
+                        db.query(ChatMessage)
+                        .filter_by(chat_id=id, message_id=message_id)
+                        .with_for_update()
+                        .first()
+                    )
+                    if chat_message:
+                        self._update_chat_message(chat_message, values)
+                    else:
+                        db.add(ChatMessage(**values))
+
+                db.commit()
+                chat_message = (
+                    db.query(ChatMessage)
+                    .filter_by(chat_id=id, message_id=message_id)
+                    .first()
+                )
+                return ChatMessageModel.model_validate(chat_message)
+        except Exception as e:
+            log.exception(e)
+            return None
+
+    @async_db_method
+    async def _upsert_chat_message_async(
+        self, id: str, message_id: str, values: dict
+    ) -> Optional[ChatMessageModel]:
+        try:
+            async with get_async_db() as db:
+                result = await db.execute(select(Chat.id).filter_by(id=id))
+                if result.first() is None:
+                    return None
+
+                stmt = self._insert_chat_message(db.bind.dialect.name, values)
+                if stmt is None or (await db.execute(stmt)).rowcount == 0:
+                    result = await db.execute(
+                        select(ChatMessage)
+                        .filter_by(chat_id=id, message_id=message_id)
+                        .with_for_update()
+                    )
+                    chat_message = result.scalars().first()
+                    if chat_message:
+                        self._update_chat_message(chat_message, values)
+                    else:
+                        db.add(ChatMessage(**values))
+
+                await db.commit()
+                result = await db.execute(
+                    select(ChatMessage).filter_by(chat_id=id, message_id=message_id)
+                )
+                return ChatMessageModel.model_validate(result.scalars().first())
+        except Exception as e:
+            log.exception(e)
+            return None
+
+    def upsert_message_to_chat_by_id_and_message_id(
+        self, id: str, message_id: str, message: dict
+    ) -> Optional[ChatMessageModel]:
+        """
+        Stores the message fields in a pending `chat_message` row instead of
+        rewriting the whole chat; they are merged into the chat on read and
+        folded into the chat blob by `compact_chat_messages_by_id`.
+        """
+        return self._upsert_chat_message(
+            id, message_id, self._get_chat_message_values(id, message_id, data=message)
+        )
+
+    async def upsert_message_to_chat_by_id_and_message_id_async(
+        self, id: str, message_id: str, message: dict
+    ) -> Optional[ChatMessageModel]:
+        return await self._upsert_chat_message_async(
+            id, message_id, self._get_chat_message_values(id, message_id, data=message)
+        )
 
     def add_message_status_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, status: dict
-    ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
+    ) -> Optional[ChatMessageModel]:
+        return self._upsert_chat_message(
+            id, message_id, self._get_chat_message_values(id, message_id, status=status)
+        )
+
+    def compact_chat_messages_by_id(self, id: str) -> Optional[ChatModel]:
+        """
+        Folds pending `chat_message` rows into the chat blob and removes them.
+        """
+        try:
+            with get_db() as db:
+                chat_item = db.get(Chat, id)
+                if chat_item is None:
+                    return None
+
+                # Locked so a concurrent write to a row isn't deleted unseen
+                chat_messages = [
+                    ChatMessageModel.model_validate(chat_message)
+                    for chat_message in db.query(ChatMessage)
+                    .filter_by(chat_id=id)
+                    .with_for_update()
+                    .all()
+                ]
+                if not chat_messages:
+                    return ChatModel.model_validate(chat_item)
+
+                chat_item.chat = merge_chat_messages(
+                    copy.deepcopy(chat_item.chat), chat_messages
+                )
+                db.query(ChatMessage).filter(
+                    ChatMessage.id.in_(
+                        [chat_message.id for chat_message in chat_messages]
+                    )
+                ).delete()
+                self._update_chat_search_index(db, chat_item)
+                db.commit()
+                db.refresh(chat_item)
+
+                return ChatModel.model_validate(chat_item)
+        except Exception as e:
+            log.exception(e)
             return None
 
-        chat = chat.chat
-        history = chat.get("history", {})
+    @async_db_method
+    async def compact_chat_messages_by_id_async(self, id: str) -> Optional[ChatModel]:
+        try:
+            async with get_async_db() as db:
+                chat_item = await db.get(Chat, id)
+                if chat_item is None:
+                    return None
 
-        if message_id in history.get("messages", {}):
-            status_history = history["messages"][message_id].get("statusHistory", [])
-            status_history.append(status)
-            history["messages"][message_id]["statusHistory"] = status_history
+                result = await db.execute(
+                    select(ChatMessage).filter_by(chat_id=id).with_for_update()
+                )
+                chat_messages = [
+                    ChatMessageModel.model_validate(chat_message)
+                    for chat_message in result.scalars()
+                ]
+                if not chat_messages:
+                    return ChatModel.model_validate(chat_item)
+
+                chat_item.chat = merge_chat_messages(
+                    copy.deepcopy(chat_item.chat), chat_messages
+                )
+                await db.execute(
+                    delete(ChatMessage).where(
+                        ChatMessage.id.in_(
+                            [chat_message.id for chat_message in chat_messages]
+                        )
+                    )
+                )
+                await db.run_sync(
+                    lambda sync_db: self._update_chat_search_index(sync_db, chat_item)
+                )
+                await db.commit()
+                await db.refresh(chat_item)
 
-        chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+                return ChatModel.model_validate(chat_item)
+        except Exception as e:
+            log.exception(e)
+            return None
 
     def insert_shared_chat_by_chat_id(self, chat_id: str) -> Optional[ChatModel]:
         with get_db() as db:
             # Get the existing chat to share
-            chat = db.get(Chat, chat_id)
+            chat = self._to_chat_model(db, db.get(Chat, chat_id))
             # Check if the chat is already shared
             if chat.share_id:
                 return self.get_chat_by_id_and_user_id(chat.share_id, "shared")
@@ -301,7 +830,7 @@ class ChatTable:
     def update_shared_chat_by_chat_id(self, chat_id: str) -> Optional[ChatModel]:
         try:
             with get_db() as db:
-                chat = db.get(Chat, chat_id)
+                chat = self._to_chat_model(db, db.get(Chat, chat_id))
                 shared_chat = (
                     db.query(Chat).filter_by(user_id=f"shared-{chat_id}").first()
                 )
@@ -411,7 +940,7 @@ class ChatTable:
                 query = query.limit(limit)
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_chat_list_by_user_id(
         self,
@@ -450,7 +979,7 @@ class ChatTable:
                 query = query.limit(limit)
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_chat_title_id_list_by_user_id(
         self,
@@ -501,13 +1030,22 @@ class ChatTable:
                 .order_by(Chat.updated_at.desc())
                 .all()
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_chat_by_id(self, id: str) -> Optional[ChatModel]:
         try:
             with get_db() as db:
                 chat = db.get(Chat, id)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(db, chat)
+        except Exception:
+            return None
+
+    @async_db_method
+    async def get_chat_by_id_async(self, id: str) -> Optional[ChatModel]:
+        try:
+            async with get_async_db() as db:
+                chat = await db.get(Chat, id)
+                return await self._to_chat_model_async(db, chat)
         except Exception:
             return None
 
@@ -529,7 +1067,7 @@ class ChatTable:
         try:
             with get_db() as db:
                 chat = db.query(Chat).filter_by(id=id, user_id=user_id).first()
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(db, chat)
         except Exception:
             return None
 
@@ -540,7 +1078,7 @@ class ChatTable:
                 # .limit(limit).offset(skip)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -549,7 +1087,7 @@ class ChatTable:
                 .filter_by(user_id=user_id)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_pinned_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -558,7 +1096,7 @@ class ChatTable:
                 .filter_by(user_id=user_id, pinned=True, archived=False)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_archived_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -567,7 +1105,96 @@ class ChatTable:
                 .filter_by(user_id=user_id, archived=True)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
+
+    def _search_chat_index(
+        self,
+        db,
+        user_id: str,
+        search_text: str,
+        tag_ids: list[str],
+        include_archived: bool,
+        skip: int,
+        limit: int,
+    ) -> Optional[list[Chat]]:
+        """
+        Searches chat titles and messages with the full-text index, ranking
+        title matches above content matches. Every word has to match a word
+        prefix in the chat, and the chat has to carry every tag in tag_ids.
+        Returns None when the index can't serve the search.
+        """
+        words = re.findall(r"\w+", search_text)
+        tag_ids = ["none"] if "none" in tag_ids else [t for t in tag_ids if t]
+        if not (words or tag_ids) or not self._has_chat_search_index(db):
+            return None
+
+        try:
+            if db.bind.dialect.name == "postgresql":
+                terms = [f"{word}:*AB" for word in words] + [
+                    f"{get_chat_search_token('t', tag_id)}:D" for tag_id in tag_ids
+                ]
+                query = (
+                    db.query(Chat)
+                    .join(
+                        postgresql_chat_search_table,
+                        postgresql_chat_search_table.c.chat_id == Chat.id,
+                    )
+                    .filter(
+                        text(
+                            "chat_search.user_id = :user_id AND "
+                            "chat_search.search_vector @@ to_tsquery('simple', :tsquery)"
+                        )
+                    )
+                    .order_by(
+                        text(
+                            "ts_rank(chat_search.search_vector, "
+                            "to_tsquery('simple', :tsquery)) DESC"
+                        ),
+                        Chat.updated_at.desc(),
+                    )
+                    .params(user_id=user_id, tsquery=" & ".join(terms))
+                )
+            elif db.bind.dialect.name == "sqlite":
+                terms = [f'user_id : "{get_chat_search_token("u", user_id)}"']
+                if words:
+                    terms.append(
+                        "{title content} : ("
+                        + " AND ".join(f'"{word}"*' for word in words)
+                        + ")"
+                    )
+                terms.extend(
+                    f'tags : "{get_chat_search_token("t", tag_id)}"'
+                    for tag_id in tag_ids
+                )
+                query = (
+                    db.query(Chat)
+                    .join(
+                        chat_search_id_table, chat_search_id_table.c.chat_id == Chat.id
+                    )
+                    .join(
+                        sqlite_chat_search_table,
+                        sqlite_chat_search_table.c.rowid == chat_search_id_table.c.id,
+                    )
+                    .filter(text("chat_search MATCH :match"))
+                    # bm25 weights of the user_id, title, content and tags columns
+                    .order_by(
+                        text("bm25(chat_search, 0.0, 10.0, 1.0, 0.0)"),
+                        Chat.updated_at.desc(),
+                    )
+                    .params(match=" AND ".join(terms))
+                )
+            else:
+                return None
+
+            query = query.filter(Chat.user_id == user_id)
+            if not include_archived:
+                query = query.filter(Chat.archived == False)
+
+            return query.offset(skip).limit(limit).all()
+        except Exception as e:
+            log.warning(f"Chat search index query failed: {e}")
+            db.rollback()
+            return None
 
     def get_chats_by_user_id_and_search_text(
         self,
@@ -603,6 +1230,13 @@ class ChatTable:
         search_text = " ".join(search_text_words)
 
         with get_db() as db:
+            chats = self._search_chat_index(
+                db, user_id, search_text, tag_ids, include_archived, skip, limit
+            )
+            if chats is not None:
+                return self._to_chat_models(db, chats)
+
+            # No search index, fall back to scanning the chat JSON
             query = db.query(Chat).filter(Chat.user_id == user_id)
 
             if not include_archived:
@@ -720,7 +1354,7 @@ class ChatTable:
             log.info(f"The number of chats: {len(all_chats)}")
 
             # Validate and return chats
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_chats_by_folder_id_and_user_id(
         self, folder_id: str, user_id: str
@@ -733,7 +1367,7 @@ class ChatTable:
             query = query.order_by(Chat.updated_at.desc())
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_chats_by_folder_ids_and_user_id(
         self, folder_ids: list[str], user_id: str
@@ -748,7 +1382,7 @@ class ChatTable:
             query = query.order_by(Chat.updated_at.desc())
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def update_chat_folder_id_by_id_and_user_id(
         self, id: str, user_id: str, folder_id: str
@@ -800,7 +1434,7 @@ class ChatTable:
 
             all_chats = query.all()
             log.debug(f"all_chats: {all_chats}")
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def add_chat_tag_by_id_and_user_id_and_tag_name(
         self, id: str, user_id: str, tag_name: str
@@ -818,6 +1452,7 @@ class ChatTable:
                         **chat.meta,
                         "tags": list(set(chat.meta.get("tags", []) + [tag_id])),
                     }
+                    self._update_chat_search_index(db, chat)
 
                 db.commit()
                 db.refresh(chat)
@@ -875,6 +1510,7 @@ class ChatTable:
                     **chat.meta,
                     "tags": list(set(tags)),
                 }
+                self._update_chat_search_index(db, chat)
                 db.commit()
                 return True
         except Exception:
@@ -888,6 +1524,7 @@ class ChatTable:
                     **chat.meta,
                     "tags": [],
                 }
+                self._update_chat_search_index(db, chat)
                 db.commit()
 
                 return True
@@ -897,7 +1534,9 @@ class ChatTable:
     def delete_chat_by_id(self, id: str) -> bool:
         try:
             with get_db() as db:
+                self._delete_chat_search_index(db, [id])
                 db.query(Chat).filter_by(id=id).delete()
+                db.query(ChatMessage).filter_by(chat_id=id).delete()
                 db.commit()
 
                 return True and self.delete_shared_chat_by_chat_id(id)
@@ -907,7 +1546,11 @@ class ChatTable:
     def delete_chat_by_id_and_user_id(self, id: str, user_id: str) -> bool:
         try:
             with get_db() as db:
+                self._delete_chat_search_index(
+                    db, select(Chat.id).where(Chat.id == id, Chat.user_id == user_id)
+                )
                 db.query(Chat).filter_by(id=id, user_id=user_id).delete()
+                db.query(ChatMessage).filter_by(chat_id=id).delete()
                 db.commit()
 
                 return True and self.delete_shared_chat_by_chat_id(id)
@@ -919,6 +1562,14 @@ class ChatTable:
             with get_db() as db:
                 self.delete_shared_chats_by_user_id(user_id)
 
+                self._delete_chat_search_index(
+                    db, select(Chat.id).where(Chat.user_id == user_id)
+                )
+                db.query(ChatMessage).filter(
+                    ChatMessage.chat_id.in_(
+                        select(Chat.id).where(Chat.user_id == user_id)
+                    )
+                ).delete(synchronize_session=False)
                 db.query(Chat).filter_by(user_id=user_id).delete()
                 db.commit()
 
@@ -931,6 +1582,19 @@ class ChatTable:
     ) -> bool:
         try:
             with get_db() as db:
+                self._delete_chat_search_index(
+                    db,
+                    select(Chat.id).where(
+                        Chat.user_id == user_id, Chat.folder_id == folder_id
+                    ),
+                )
+                db.query(ChatMessage).filter(
+                    ChatMessage.chat_id.in_(
+                        select(Chat.id).where(
+                            Chat.user_id == user_id, Chat.folder_id == folder_id
+                        )
+                    )
+                ).delete(synchronize_session=False)
                 db.query(Chat).filter_by(user_id=user_id, folder_id=folder_id).delete()
                 db.commit()
 
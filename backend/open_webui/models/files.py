@@ -2,7 +2,13 @@ import logging
 import time
 from typing import Optional
 
-from open_webui.internal.db import Base, JSONField, get_db
+from open_webui.internal.db import (
+    Base,
+    JSONField,
+    get_db,
+    get_async_db,
+    async_db_method,
+)
 from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, JSON
@@ -130,6 +136,15 @@ class FilesTable:
             except Exception:
                 return None
 
+    @async_db_method
+    async def get_file_by_id_async(self, id: str) -> Optional[FileModel]:
+        async with get_async_db() as db:
+            try:
+                file = await db.get(File, id)
+                return FileModel.model_validate(file)
+            except Exception:
+                return None
+
     def get_file_metadata_by_id(self, id: str) -> Optional[FileMetadataResponse]:
         with get_db() as db:
             try:
@@ -2,11 +2,17 @@ import logging
 import time
 from typing import Optional
 
-from open_webui.internal.db import Base, JSONField, get_db
+from open_webui.internal.db import (
+    Base,
+    JSONField,
+    get_db,
+    get_async_db,
+    async_db_method,
+)
 from open_webui.models.users import Users
 from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text
+from sqlalchemy import BigInteger, Boolean, Column, String, Text, select
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -164,6 +170,15 @@ class FunctionsTable:
         except Exception:
             return None
 
+    @async_db_method
+    async def get_function_by_id_async(self, id: str) -> Optional[FunctionModel]:
+        try:
+            async with get_async_db() as db:
+                function = await db.get(Function, id)
+                return FunctionModel.model_validate(function)
+        except Exception:
+            return None
+
     def get_functions(self, active_only=False) -> list[FunctionModel]:
         with get_db() as db:
             if active_only:
@@ -194,6 +209,20 @@ class FunctionsTable:
                     for function in db.query(Function).filter_by(type=type).all()
                 ]
 
+    @async_db_method
+    async def get_functions_by_type_async(
+        self, type: str, active_only=False
+    ) -> list[FunctionModel]:
+        query = select(Function).filter_by(type=type)
+        if active_only:
+            query = query.filter_by(is_active=True)
+
+        async with get_async_db() as db:
+            result = await db.execute(query)
+            return [
+                FunctionModel.model_validate(function) for function in result.scalars()
+            ]
+
     def get_global_filter_functions(self) -> list[FunctionModel]:
         with get_db() as db:
             return [
@@ -203,6 +232,18 @@ class FunctionsTable:
                 .all()
             ]
 
+    @async_db_method
+    async def get_global_filter_functions_async(self) -> list[FunctionModel]:
+        async with get_async_db() as db:
+            result = await db.execute(
+                select(Function).filter_by(
+                    type="filter", is_active=True, is_global=True
+                )
+            )
+            return [
+                FunctionModel.model_validate(function) for function in result.scalars()
+            ]
+
     def get_global_action_functions(self) -> list[FunctionModel]:
         with get_db() as db:
             return [
@@ -212,6 +253,18 @@ class FunctionsTable:
                 .all()
             ]
 
+    @async_db_method
+    async def get_global_action_functions_async(self) -> list[FunctionModel]:
+        async with get_async_db() as db:
+            result = await db.execute(
+                select(Function).filter_by(
+                    type="action", is_active=True, is_global=True
+                )
+            )
+            return [
+                FunctionModel.model_validate(function) for function in result.scalars()
+            ]
+
     def get_function_valves_by_id(self, id: str) -> Optional[dict]:
         with get_db() as db:
             try:
@@ -221,6 +274,16 @@ class FunctionsTable:
                 log.exception(f"Error getting function valves by id {id}: {e}")
                 return None
 
+    @async_db_method
+    async def get_function_valves_by_id_async(self, id: str) -> Optional[dict]:
+        async with get_async_db() as db:
+            try:
+                function = await db.get(Function, id)
+                return function.valves if function.valves else {}
+            except Exception as e:
+                log.exception(f"Error getting function valves by id {id}: {e}")
+                return None
+
     def update_function_valves_by_id(
         self, id: str, valves: dict
     ) -> Optional[FunctionValves]:
@@ -255,6 +318,21 @@ class FunctionsTable:
             )
             return None
 
+    @async_db_method
+    async def get_user_valves_by_id_and_user_id_async(
+        self, id: str, user_id: str
+    ) -> Optional[dict]:
+        try:
+            user = await Users.get_user_by_id_async(user_id)
+            user_settings = user.settings.model_dump() if user.settings else {}
+
+            return user_settings.get("functions", {}).get("valves", {}).get(id, {})
+        except Exception as e:
+            log.exception(
+                f"Error getting user values by id {id} and user id {user_id}: {e}"
+            )
+            return None
+
     def update_user_valves_by_id_and_user_id(
         self, id: str, user_id: str, valves: dict
     ) -> Optional[dict]:
@@ -4,14 +4,14 @@ import time
 from typing import Optional
 import uuid
 
-from open_webui.internal.db import Base, get_db
+from open_webui.internal.db import Base, get_db, get_async_db, async_db_method
 from open_webui.env import SRC_LOG_LEVELS
 
 from open_webui.models.files import FileMetadataResponse
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON, func
+from sqlalchemy import BigInteger, Column, String, Text, JSON, func, select
 
 
 log = logging.getLogger(__name__)
@@ -41,6 +41,16 @@ class Group(Base):
     updated_at = Column(BigInteger)
 
 
+class GroupMember(Base):
+    __tablename__ = "group_member"
+
+    id = Column(Text, primary_key=True)
+    group_id = Column(Text)
+    user_id = Column(Text)
+
+    created_at = Column(BigInteger)
+
+
 class GroupModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: str
@@ -88,6 +98,21 @@ class GroupUpdateForm(GroupForm):
 
 
 class GroupTable:
+    def _set_group_members(self, db, group_id: str, user_ids: list[str]):
+        # Keep the `group_member` index in sync with `Group.user_ids`
+        db.query(GroupMember).filter_by(group_id=group_id).delete()
+        db.add_all(
+            [
+                GroupMember(
+                    id=str(uuid.uuid4()),
+                    group_id=group_id,
+                    user_id=user_id,
+                    created_at=int(time.time()),
+                )
+                for user_id in set(user_ids or [])
+            ]
+        )
+
     def insert_new_group(
         self, user_id: str, form_data: GroupForm
     ) -> Optional[GroupModel]:
@@ -105,6 +130,7 @@ class GroupTable:
             try:
                 result = Group(**group.model_dump())
                 db.add(result)
+                self._set_group_members(db, group.id, group.user_ids)
                 db.commit()
                 db.refresh(result)
                 if result:
@@ -127,16 +153,40 @@ class GroupTable:
             return [
                 GroupModel.model_validate(group)
                 for group in db.query(Group)
-                .filter(
-                    func.json_array_length(Group.user_ids) > 0
-                )  # Ensure array exists
-                .filter(
-                    Group.user_ids.cast(String).like(f'%"{user_id}"%')
-                )  # String-based check
+                .join(GroupMember, GroupMember.group_id == Group.id)
+                .filter(GroupMember.user_id == user_id)
+                .order_by(Group.updated_at.desc())
+                .all()
+            ]
+
+    @async_db_method
+    async def get_groups_by_member_id_async(self, user_id: str) -> list[GroupModel]:
+        async with get_async_db() as db:
+            result = await db.execute(
+                select(Group)
+                .join(GroupMember, GroupMember.group_id == Group.id)
+                .filter(GroupMember.user_id == user_id)
                 .order_by(Group.updated_at.desc())
+            )
+            return [GroupModel.model_validate(group) for group in result.scalars()]
+
+    def get_group_ids_by_member_id(self, user_id: str) -> list[str]:
+        with get_db() as db:
+            return [
+                group_id
+                for (group_id,) in db.query(GroupMember.group_id)
+                .filter_by(user_id=user_id)
                 .all()
             ]
 
+    @async_db_method
+    async def get_group_ids_by_member_id_async(self, user_id: str) -> list[str]:
+        async with get_async_db() as db:
+            result = await db.execute(
+                select(GroupMember.group_id).filter_by(user_id=user_id)
+            )
+            return list(result.scalars())
+
     def get_group_by_id(self, id: str) -> Optional[GroupModel]:
         try:
             with get_db() as db:
@@ -163,6 +213,8 @@ class GroupTable:
                         "updated_at": int(time.time()),
                     }
                 )
+                if form_data.user_ids is not None:
+                    self._set_group_members(db, id, form_data.user_ids)
                 db.commit()
                 return self.get_group_by_id(id=id)
         except Exception as e:
@@ -173,6 +225,7 @@ class GroupTable:
         try:
             with get_db() as db:
                 db.query(Group).filter_by(id=id).delete()
+                db.query(GroupMember).filter_by(group_id=id).delete()
                 db.commit()
                 return True
         except Exception:
@@ -182,6 +235,7 @@ class GroupTable:
         with get_db() as db:
             try:
                 db.query(Group).delete()
+                db.query(GroupMember).delete()
                 db.commit()
 
                 return True
@@ -203,6 +257,9 @@ class GroupTable:
                     )
                     db.commit()
 
+                db.query(GroupMember).filter_by(user_id=user_id).delete()
+                db.commit()
+
                 return True
             except Exception:
                 return False
@@ -257,6 +314,9 @@ class GroupTable:
                                 "updated_at": int(time.time()),
                             }
                         )
+                        db.query(GroupMember).filter_by(
+                            group_id=group.id, user_id=user_id
+                        ).delete()
 
                 # Add user to new groups
                 for group in groups:
@@ -268,6 +328,14 @@ class GroupTable:
                                 "updated_at": int(time.time()),
                             }
                         )
+                        db.add(
+                            GroupMember(
+                                id=str(uuid.uuid4()),
+                                group_id=group.id,
+                                user_id=user_id,
+                                created_at=int(time.time()),
+                            )
+                        )
 
                 db.commit()
                 return True
@@ -157,22 +157,55 @@ class MessageTable:
                 for message in db.query(Message).filter_by(parent_id=id).all()
             ]
 
+    def _paginate(self, db, query, skip: int, limit: int, before: Optional[str]):
+        """
+        Orders messages newest first and pages through them. With `before`, the
+        id of the oldest message already loaded, the page starts right after
+        it (keyset pagination) instead of skipping `skip` rows; if that message
+        no longer exists the offset is used instead.
+        """
+        query = query.order_by(Message.created_at.desc(), Message.id.desc())
+
+        cursor = db.get(Message, before) if before else None
+        if cursor:
+            query = query.filter(
+                or_(
+                    Message.created_at < cursor.created_at,
+                    and_(
+                        Message.created_at == cursor.created_at,
+                        Message.id < cursor.id,
+                    ),
+                )
+            )
+        else:
+            query = query.offset(skip)
+
+        return query.limit(limit).all()
+
     def get_messages_by_channel_id(
-        self, channel_id: str, skip: int = 0, limit: int = 50
+        self,
+        channel_id: str,
+        skip: int = 0,
+        limit: int = 50,
+        before: Optional[str] = None,
     ) -> list[MessageModel]:
         with get_db() as db:
-            all_messages = (
-                db.query(Message)
-                .filter_by(channel_id=channel_id, parent_id=None)
-                .order_by(Message.created_at.desc())
-                .offset(skip)
-                .limit(limit)
-                .all()
+            all_messages = self._paginate(
+                db,
+                db.query(Message).filter_by(channel_id=channel_id, parent_id=None),
+                skip,
+                limit,
+                before,
             )
             return [MessageModel.model_validate(message) for message in all_messages]
 
     def get_messages_by_parent_id(
-        self, channel_id: str, parent_id: str, skip: int = 0, limit: int = 50
+        self,
+        channel_id: str,
+        parent_id: str,
+        skip: int = 0,
+        limit: int = 50,
+        before: Optional[str] = None,
     ) -> list[MessageModel]:
         with get_db() as db:
             message = db.get(Message, parent_id)
@@ -180,13 +213,12 @@ class MessageTable:
             if not message:
                 return []
 
-            all_messages = (
-                db.query(Message)
-                .filter_by(channel_id=channel_id, parent_id=parent_id)
-                .order_by(Message.created_at.desc())
-                .offset(skip)
-                .limit(limit)
-                .all()
+            all_messages = self._paginate(
+                db,
+                db.query(Message).filter_by(channel_id=channel_id, parent_id=parent_id),
+                skip,
+                limit,
+                before,
             )
 
             # If length of all_messages is less than limit, then add the parent message
@@ -243,6 +275,71 @@ class MessageTable:
 
             return [Reactions(**reaction) for reaction in reactions.values()]
 
+    def get_reactions_by_message_ids(
+        self, ids: list[str]
+    ) -> dict[str, list[Reactions]]:
+        with get_db() as db:
+            all_reactions = (
+                db.query(MessageReaction)
+                .filter(MessageReaction.message_id.in_(ids))
+                .all()
+            )
+
+            reactions = {id: {} for id in ids}
+            for reaction in all_reactions:
+                message_reactions = reactions[reaction.message_id]
+                if reaction.name not in message_reactions:
+                    message_reactions[reaction.name] = {
+                        "name": reaction.name,
+                        "user_ids": [],
+                        "count": 0,
+                    }
+                message_reactions[reaction.name]["user_ids"].append(reaction.user_id)
+                message_reactions[reaction.name]["count"] += 1
+
+            return {
+                id: [Reactions(**reaction) for reaction in message_reactions.values()]
+                for id, message_reactions in reactions.items()
+            }
+
+    def get_message_responses(
+        self, messages: list[MessageModel]
+    ) -> list[MessageResponse]:
+        """
+        Adds reply counts, latest reply times and reactions to a page of
+        messages with one query each, instead of two queries per message.
+        """
+        ids = [message.id for message in messages]
+        with get_db() as db:
+            replies = {
+                parent_id: (reply_count, latest_reply_at)
+                for parent_id, reply_count, latest_reply_at in db.query(
+                    Message.parent_id,
+                    func.count(Message.id),
+                    func.max(Message.created_at),
+                )
+                .filter(Message.parent_id.in_(ids))
+                .group_by(Message.parent_id)
+                .all()
+            }
+
+        reactions = self.get_reactions_by_message_ids(ids)
+
+        message_responses = []
+        for message in messages:
+            reply_count, latest_reply_at = replies.get(message.id, (0, None))
+            message_responses.append(
+                MessageResponse(
+                    **{
+                        **message.model_dump(),
+                        "reply_count": reply_count,
+                        "latest_reply_at": latest_reply_at,
+                        "reactions": reactions[message.id],
+                    }
+                )
+            )
+        return message_responses
+
     def remove_reaction_by_id_and_user_id_and_name(
         self, id: str, user_id: str, name: str
     ) -> bool:
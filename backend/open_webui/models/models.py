@@ -2,7 +2,13 @@ import logging
 import time
 from typing import Optional
 
-from open_webui.internal.db import Base, JSONField, get_db
+from open_webui.internal.db import (
+    Base,
+    JSONField,
+    get_db,
+    get_async_db,
+    async_db_method,
+)
 from open_webui.env import SRC_LOG_LEVELS
 
 from open_webui.models.users import Users, UserResponse
@@ -10,12 +16,12 @@ from open_webui.models.users import Users, UserResponse
 
 from pydantic import BaseModel, ConfigDict
 
-from sqlalchemy import or_, and_, func
+from sqlalchemy import or_, and_, func, select
 from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy import BigInteger, Column, Text, JSON, Boolean
 
 
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import has_access, get_user_group_ids
 
 
 log = logging.getLogger(__name__)
@@ -173,6 +179,12 @@ class ModelsTable:
         with get_db() as db:
             return [ModelModel.model_validate(model) for model in db.query(Model).all()]
 
+    @async_db_method
+    async def get_all_models_async(self) -> list[ModelModel]:
+        async with get_async_db() as db:
+            result = await db.execute(select(Model))
+            return [ModelModel.model_validate(model) for model in result.scalars()]
+
     def get_models(self) -> list[ModelUserResponse]:
         with get_db() as db:
             models = []
@@ -199,11 +211,12 @@ class ModelsTable:
         self, user_id: str, permission: str = "write"
     ) -> list[ModelUserResponse]:
         models = self.get_models()
+        user_group_ids = get_user_group_ids(user_id)
         return [
             model
             for model in models
             if model.user_id == user_id
-            or has_access(user_id, permission, model.access_control)
+            or has_access(user_id, permission, model.access_control, user_group_ids)
         ]
 
     def get_model_by_id(self, id: str) -> Optional[ModelModel]:
@@ -214,6 +227,28 @@ class ModelsTable:
         except Exception:
             return None
 
+    @async_db_method
+    async def get_model_by_id_async(self, id: str) -> Optional[ModelModel]:
+        try:
+            async with get_async_db() as db:
+                model = await db.get(Model, id)
+                return ModelModel.model_validate(model)
+        except Exception:
+            return None
+
+    def get_models_by_ids(self, ids: list[str]) -> list[ModelModel]:
+        with get_db() as db:
+            return [
+                ModelModel.model_validate(model)
+                for model in db.query(Model).filter(Model.id.in_(ids)).all()
+            ]
+
+    @async_db_method
+    async def get_models_by_ids_async(self, ids: list[str]) -> list[ModelModel]:
+        async with get_async_db() as db:
+            result = await db.execute(select(Model).filter(Model.id.in_(ids)))
+            return [ModelModel.model_validate(model) for model in result.scalars()]
+
     def toggle_model_by_id(self, id: str) -> Optional[ModelModel]:
         with get_db() as db:
             try:
@@ -7,7 +7,7 @@ from open_webui.models.users import Users, UserResponse
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, JSON
 
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import has_access, get_user_group_ids
 
 ####################
 # Prompts DB Schema
@@ -123,11 +123,12 @@ class PromptsTable:
     ) -> list[PromptUserResponse]:
         prompts = self.get_prompts()
 
+        user_group_ids = get_user_group_ids(user_id)
         return [
             prompt
             for prompt in prompts
             if prompt.user_id == user_id
-            or has_access(user_id, permission, prompt.access_control)
+            or has_access(user_id, permission, prompt.access_control, user_group_ids)
         ]
 
     def update_prompt_by_command(
@@ -1,7 +1,13 @@
 import time
 from typing import Optional
 
-from open_webui.internal.db import Base, JSONField, get_db
+from open_webui.internal.db import (
+    Base,
+    JSONField,
+    get_db,
+    get_async_db,
+    async_db_method,
+)
 
 
 from open_webui.models.chats import Chats
@@ -10,7 +16,7 @@ from open_webui.models.groups import Groups
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text
-from sqlalchemy import or_
+from sqlalchemy import or_, select, update
 
 
 ####################
@@ -143,6 +149,15 @@ class UsersTable:
         except Exception:
             return None
 
+    @async_db_method
+    async def get_user_by_id_async(self, id: str) -> Optional[UserModel]:
+        try:
+            async with get_async_db() as db:
+                user = await db.get(User, id)
+                return UserModel.model_validate(user)
+        except Exception:
+            return None
+
     def get_user_by_api_key(self, api_key: str) -> Optional[UserModel]:
         try:
             with get_db() as db:
@@ -151,6 +166,15 @@ class UsersTable:
         except Exception:
             return None
 
+    @async_db_method
+    async def get_user_by_api_key_async(self, api_key: str) -> Optional[UserModel]:
+        try:
+            async with get_async_db() as db:
+                result = await db.execute(select(User).filter_by(api_key=api_key))
+                return UserModel.model_validate(result.scalars().first())
+        except Exception:
+            return None
+
     def get_user_by_email(self, email: str) -> Optional[UserModel]:
         try:
             with get_db() as db:
@@ -270,6 +294,23 @@ class UsersTable:
         except Exception:
             return None
 
+    @async_db_method
+    async def get_user_webhook_url_by_id_async(self, id: str) -> Optional[str]:
+        try:
+            async with get_async_db() as db:
+                user = await db.get(User, id)
+
+                if user.settings is None:
+                    return None
+                else:
+                    return (
+                        user.settings.get("ui", {})
+                        .get("notifications", {})
+                        .get("webhook_url", None)
+                    )
+        except Exception:
+            return None
+
     def update_user_role_by_id(self, id: str, role: str) -> Optional[UserModel]:
         try:
             with get_db() as db:
@@ -308,6 +349,22 @@ class UsersTable:
         except Exception:
             return None
 
+    @async_db_method
+    async def update_user_last_active_by_id_async(self, id: str) -> Optional[UserModel]:
+        try:
+            async with get_async_db() as db:
+                await db.execute(
+                    update(User)
+                    .filter_by(id=id)
+                    .values(last_active_at=int(time.time()))
+                )
+                await db.commit()
+
+                user = await db.get(User, id)
+                return UserModel.model_validate(user)
+        except Exception:
+            return None
+
     def update_user_oauth_sub_by_id(
         self, id: str, oauth_sub: str
     ) -> Optional[UserModel]:
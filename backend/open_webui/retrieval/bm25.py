@@ -0,0 +1,395 @@
+import hashlib
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Any, Optional
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: only threads of the same worker are serialized
+    fcntl = None
+
+from langchain_core.documents import Document
+
+from open_webui.config import RAG_BM25_INDEX_DIR, RAG_BM25_INDEX_CACHE_SIZE
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+BM25_INDEX_DIR = RAG_BM25_INDEX_DIR
+BM25_INDEX_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def tokenize(text: str) -> list[str]:
+    # Same preprocessing as langchain's BM25Retriever so rankings stay comparable
+    return text.split()
+
+
+class BM25Index:
+    """
+    In-memory Okapi BM25 inverted index for a single collection.
+
+    Documents can be added and removed incrementally; term statistics are kept
+    up to date so queries never need to re-tokenize the whole corpus.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+        self.documents: dict[str, tuple[str, Any]] = {}
+        self.lengths: dict[str, int] = {}
+        self.postings: dict[str, dict[str, int]] = {}
+        self.total_length = 0
+        # Characters of document text, to bound the loaded indexes
+        self.size = 0
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add(self, id: str, text: str, metadata: Any = None):
+        if id in self.documents:
+            self.remove(id)
+
+        tokens = tokenize(text or "")
+        self.documents[id] = (text, metadata)
+        self.lengths[id] = len(tokens)
+        self.total_length += len(tokens)
+        self.size += len(text or "")
+
+        for term, frequency in Counter(tokens).items():
+            self.postings.setdefault(term, {})[id] = frequency
+
+    def remove(self, id: str):
+        if id not in self.documents:
+            return
+
+        text, _ = self.documents.pop(id)
+        self.total_length -= self.lengths.pop(id)
+        self.size -= len(text or "")
+
+        for term in set(tokenize(text or "")):
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(id, None)
+                if not postings:
+                    del self.postings[term]
+
+    def get_ids_by_filter(self, filter: dict) -> list[str]:
+        return [
+            id
+            for id, (_, metadata) in self.documents.items()
+            if isinstance(metadata, dict)
+            and all(metadata.get(key) == value for key, value in filter.items())
+        ]
+
+    def search(self, query: str, k: int) -> list[Document]:
+        if not self.documents:
+            return []
+
+        n = len(self.documents)
+        avg_length = self.total_length / n if n else 0
+
+        scores: dict[str, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+
+            df = len(postings)
+            idf = math.log((n - df + 0.5) / (df + 0.5) + 1)
+            for id, frequency in postings.items():
+                norm = self.k1 * (
+                    1 - self.b + self.b * self.lengths[id] / (avg_length or 1)
+                )
+                scores[id] = scores.get(id, 0.0) + idf * (
+                    frequency * (self.k1 + 1) / (frequency + norm)
+                )
+
+        results = []
+        for id, score in heapq.nlargest(k, scores.items(), key=lambda x: x[1]):
+            text, metadata = self.documents[id]
+            results.append(
+                Document(
+                    page_content=text,
+                    # Copy so callers (e.g. the reranker) can annotate freely
+                    metadata=dict(metadata) if isinstance(metadata, dict) else {},
+                )
+            )
+        return results
+
+
+class BM25IndexStore:
+    """
+    Persists one BM25 index per collection under RAG_BM25_INDEX_DIR.
+
+    Each index is an append-only JSON lines log of "add" and "delete"
+    operations. Workers keep the replayed index in memory and only read the
+    tail of the log written since their last access, so indexes stay in sync
+    across processes without re-reading the collection from the vector DB.
+    Writes to a log hold a file lock, so a worker never appends to a log that
+    another worker is replacing. The least recently used indexes are dropped
+    from memory once they hold more than max_size characters of text.
+    """
+
+    # Rewrite the log once it holds more dead entries than this
+    COMPACT_THRESHOLD = 1000
+
+    def __init__(self, path=BM25_INDEX_DIR, max_size=RAG_BM25_INDEX_CACHE_SIZE):
+        self.path = path
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.locks: dict[str, threading.RLock] = {}
+
+        # collection_name -> (inode, offset, dead, BM25Index), oldest access first
+        self.indexes: OrderedDict[str, tuple[int, int, int, BM25Index]] = OrderedDict()
+        # collection_name -> vector count an index was last rebuilt for
+        self.rebuilt_counts: dict[str, int] = {}
+
+    def _get_lock(self, collection_name: str) -> threading.RLock:
+        with self.lock:
+            return self.locks.setdefault(collection_name, threading.RLock())
+
+    def _get_file_path(self, collection_name: str) -> str:
+        if re.fullmatch(r"[A-Za-z0-9_.-]+", collection_name):
+            name = collection_name
+        else:
+            name = hashlib.sha256(collection_name.encode()).hexdigest()
+        return os.path.join(self.path, f"{name}.jsonl")
+
+    @contextmanager
+    def _write_lock(self, collection_name: str):
+        """
+        Serializes writes to a collection's log across threads and worker
+        processes. The lock file is kept, as removing it would let a waiter
+        and a new writer lock different files.
+        """
+        with self._get_lock(collection_name):
+            if fcntl is None:
+                yield
+                return
+
+            with open(f"{self._get_file_path(collection_name)}.lock", "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _set_index(self, collection_name: str, entry: tuple):
+        with self.lock:
+            self.indexes[collection_name] = entry
+            self.indexes.move_to_end(collection_name)
+
+            # Drop the least recently used indexes, always keeping this one
+            size = sum(index.size for _, _, _, index in self.indexes.values())
+            while size > self.max_size and len(self.indexes) > 1:
+                _, (_, _, _, index) = self.indexes.popitem(last=False)
+                size -= index.size
+
+    def _apply(self, index: BM25Index, line: str) -> int:
+        # Returns the number of log entries made obsolete by this one
+        entry = json.loads(line)
+        if entry["op"] == "add":
+            dead = 1 if entry["id"] in index.documents else 0
+            index.add(entry["id"], entry["text"], entry.get("metadata"))
+            return dead
+        elif entry["op"] == "delete":
+            ids = [id for id in entry["ids"] if id in index.documents]
+            for id in ids:
+                index.remove(id)
+            return len(ids) + 1
+        return 0
+
+    def _load(self, collection_name: str) -> Optional[BM25Index]:
+        file_path = self._get_file_path(collection_name)
+
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            with self.lock:
+                self.indexes.pop(collection_name, None)
+            return None
+
+        inode, offset, dead, index = self.indexes.get(
+            collection_name, (None, 0, 0, None)
+        )
+
+        # The log was rewritten (compacted or rebuilt) by another worker
+        if index is None or inode != stat.st_ino or stat.st_size < offset:
+            offset, dead, index = 0, 0, BM25Index()
+
+        if stat.st_size > offset:
+            with open(file_path, "r", encoding="utf-8") as f:
+                f.seek(offset)
+                while True:
+                    line = f.readline()
+                    # Stop at a partially written trailing line
+                    if not line or not line.endswith("\n"):
+                        break
+                    dead += self._apply(index, line)
+                    offset = f.tell()
+
+        self._set_index(collection_name, (stat.st_ino, offset, dead, index))
+        return index
+
+    def _append(self, collection_name: str, entries: list[dict]):
+        if not entries:
+            return
+
+        data = "".join(json.dumps(entry) + "\n" for entry in entries)
+        with open(self._get_file_path(collection_name), "a", encoding="utf-8") as f:
+            f.write(data)
+
+    def _write(self, collection_name: str, index: BM25Index):
+        file_path = self._get_file_path(collection_name)
+        tmp_path = f"{file_path}.{os.getpid()}.tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for id, (text, metadata) in index.documents.items():
+                f.write(
+                    json.dumps(
+                        {"op": "add", "id": id, "text": text, "metadata": metadata}
+                    )
+                    + "\n"
+                )
+        os.replace(tmp_path, file_path)
+
+        stat = os.stat(file_path)
+        self._set_index(collection_name, (stat.st_ino, stat.st_size, 0, index))
+
+    def _build(self, collection_name: str) -> Optional[BM25Index]:
+        # Backfill collections that were created before indexes were persisted
+        log.info(f"Building BM25 index for collection {collection_name}")
+        result = VECTOR_DB_CLIENT.get(collection_name=collection_name)
+        if result is None:
+            return None
+
+        index = BM25Index()
+        for id, text, metadata in zip(
+            result.ids[0], result.documents[0], result.metadatas[0]
+        ):
+            index.add(id, text, metadata)
+
+        self._write(collection_name, index)
+        return index
+
+    def _is_stale(self, collection_name: str, index: BM25Index, count) -> bool:
+        # A rebuild that still doesn't match (e.g. a backend whose get() is
+        # capped) isn't retried until the collection changes
+        return (
+            count is not None
+            and count != len(index)
+            and count != self.rebuilt_counts.get(collection_name)
+        )
+
+    def get(self, collection_name: str) -> Optional[BM25Index]:
+        # The collection may have been deleted by another node whose index
+        # directory isn't shared with this one
+        if not VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
+            self.delete_collection(collection_name)
+            return None
+
+        # Documents added or removed by such a node leave the index with a
+        # different number of documents than the collection
+        try:
+            count = VECTOR_DB_CLIENT.count(collection_name=collection_name)
+        except Exception as e:
+            log.warning(f"Error counting collection {collection_name}: {e}")
+            count = None
+
+        with self._get_lock(collection_name):
+            index = self._load(collection_name)
+            if index is not None and not self._is_stale(collection_name, index, count):
+                return index
+
+        with self._write_lock(collection_name):
+            # Built by another worker while waiting for the lock
+            index = self._load(collection_name)
+            if index is None or self._is_stale(collection_name, index, count):
+                if index is not None:
+                    log.info(
+                        f"BM25 index for collection {collection_name} has {len(index)} documents, the collection {count}"
+                    )
+                index = self._build(collection_name)
+                if count is not None:
+                    self.rebuilt_counts[collection_name] = count
+            return index
+
+    def insert(self, collection_name: str, items: list[dict], backfill: bool = True):
+        """
+        Add vector items to the collection's index. With backfill, a missing
+        index is rebuilt from the vector DB, which already holds the new items.
+        """
+        with self._write_lock(collection_name):
+            if self._load(collection_name) is None and backfill:
+                self._build(collection_name)
+                return
+
+            self._append(
+                collection_name,
+                [
+                    {
+                        "op": "add",
+                        "id": item["id"],
+                        "text": item["text"],
+                        "metadata": item.get("metadata"),
+                    }
+                    for item in items
+                ],
+            )
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        with self._write_lock(collection_name):
+            index = self._load(collection_name)
+            if index is None:
+                return
+
+            ids = set(ids or [])
+            if filter:
+                ids.update(index.get_ids_by_filter(filter))
+            if not ids:
+                return
+
+            self._append(collection_name, [{"op": "delete", "ids": list(ids)}])
+
+            index = self._load(collection_name)
+            _, _, dead, _ = self.indexes.get(collection_name, (None, 0, 0, None))
+            if dead > self.COMPACT_THRESHOLD and dead > len(index):
+                self._write(collection_name, index)
+
+    def delete_collection(self, collection_name: str):
+        with self._write_lock(collection_name):
+            with self.lock:
+                self.indexes.pop(collection_name, None)
+                self.rebuilt_counts.pop(collection_name, None)
+            try:
+                os.remove(self._get_file_path(collection_name))
+            except FileNotFoundError:
+                pass
+
+    def reset(self):
+        with self.lock:
+            self.indexes.clear()
+            self.rebuilt_counts.clear()
+            shutil.rmtree(self.path, ignore_errors=True)
+            os.makedirs(self.path, exist_ok=True)
+
+
+BM25_INDEXES = BM25IndexStore()
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import Any, Callable, Iterator, Optional
+
+from open_webui.config import (
+    CACHE_DIR,
+    ENABLE_RAG_CHUNK_STORE,
+    RAG_CHUNK_STORE_MAX_SIZE,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+CHUNK_STORE_DIR = CACHE_DIR / "chunks"
+CHUNK_STORE_DIR.mkdir(parents=True, exist_ok=True)
+
+
+class ChunkStore:
+    """
+    Content-addressed store of split and embedded documents.
+
+    Entries are keyed by the content hash, the text splitter settings and the
+    embedding model, so adding the same content to another collection can copy
+    its chunks and vectors instead of splitting and embedding it again.
+
+    Entries hold document text in plain form, so they are grouped by content
+    hash to be purged with the files they came from, and the least recently
+    used ones are evicted once the store grows past max_size bytes.
+    """
+
+    def __init__(
+        self,
+        path=CHUNK_STORE_DIR,
+        enabled: bool = ENABLE_RAG_CHUNK_STORE,
+        max_size: int = RAG_CHUNK_STORE_MAX_SIZE,
+    ):
+        self.path = path
+        self.enabled = enabled
+        self.max_size = max_size
+
+    @staticmethod
+    def _get_hash_dir(content_hash: str) -> str:
+        return hashlib.sha256(content_hash.encode()).hexdigest()
+
+    @staticmethod
+    def get_key(
+        content_hash: str,
+        splitter: Optional[dict],
+        engine: str,
+        model: str,
+        prefix: Optional[str] = None,
+    ) -> str:
+        settings = hashlib.sha256(
+            json.dumps(
+                {
+                    "hash": content_hash,
+                    "splitter": splitter,
+                    "engine": engine,
+                    "model": model,
+                    "prefix": prefix,
+                },
+                sort_keys=True,
+            ).encode()
+        ).hexdigest()
+        return f"{ChunkStore._get_hash_dir(content_hash)}/{settings}"
+
+    def _get_file_path(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.jsonl")
+
+    def get(self, key: str) -> Optional[Iterator[dict[str, Any]]]:
+        """
+        Returns an iterator over the stored {"text", "metadata", "vector"}
+        chunks, or None if the content is not in the store.
+        """
+        if not self.enabled:
+            return None
+
+        file_path = self._get_file_path(key)
+        try:
+            # Mark the entry as recently used for eviction
+            os.utime(file_path)
+        except OSError:
+            return None
+
+        def iter_chunks():
+            try:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        yield json.loads(line)
+            except (OSError, ValueError) as e:
+                log.warning(f"Discarding unreadable chunk store entry {key}: {e}")
+                self.delete(key)
+                raise
+
+        return iter_chunks()
+
+    def writer(self, key: str) -> Optional["ChunkStoreWriter"]:
+        if not self.enabled:
+            return None
+
+        try:
+            return ChunkStoreWriter(self._get_file_path(key), on_commit=self.evict)
+        except Exception as e:
+            log.warning(f"Error creating chunk store entry {key}: {e}")
+            return None
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._get_file_path(key))
+        except FileNotFoundError:
+            pass
+
+    def delete_by_hash(self, content_hash: Optional[str]):
+        """
+        Removes every entry of the content, whatever settings it was split and
+        embedded with.
+        """
+        if content_hash:
+            shutil.rmtree(
+                os.path.join(self.path, self._get_hash_dir(content_hash)),
+                ignore_errors=True,
+            )
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the store fits max_size.
+        """
+        if self.max_size <= 0:
+            return
+
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.path):
+            for name in files:
+                if not name.endswith(".jsonl"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+                total += stat.st_size
+
+        for _, size, file_path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def reset(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path, exist_ok=True)
+
+
+class ChunkStoreWriter:
+    """
+    Appends chunks to a temporary file that only becomes visible to readers
+    once commit() is called, so a failed ingestion never leaves a partial entry.
+    """
+
+    def __init__(self, file_path: str, on_commit: Optional[Callable[[], None]] = None):
+        self.file_path = file_path
+        self.on_commit = on_commit
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+        fd, self.tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path))
+        self.file = os.fdopen(fd, "w", encoding="utf-8")
+
+    def write(self, chunks: list[dict[str, Any]]):
+        for chunk in chunks:
+            self.file.write(json.dumps(chunk, default=str) + "\n")
+
+    def commit(self):
+        self.file.close()
+        os.replace(self.tmp_path, self.file_path)
+
+        if self.on_commit:
+            try:
+                self.on_commit()
+            except Exception as e:
+                log.warning(f"Error evicting chunk store entries: {e}")
+
+    def abort(self):
+        self.file.close()
+        try:
+            os.unlink(self.tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+CHUNK_STORE = ChunkStore()
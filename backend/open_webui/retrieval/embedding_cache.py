@@ -0,0 +1,146 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from open_webui.config import (
+    RAG_EMBEDDING_CACHE_SIZE,
+    ENABLE_RAG_EMBEDDING_CACHE_REDIS,
+    RAG_EMBEDDING_CACHE_REDIS_TTL,
+)
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+class EmbeddingCache:
+    """
+    Content-hash keyed embedding cache shared by all retrieval calls.
+
+    Embeddings are keyed by engine, URL, model, prefix and text, held in an
+    in-process LRU and optionally mirrored to Redis so other workers can
+    reuse them.
+    """
+
+    def __init__(
+        self,
+        max_size: int = RAG_EMBEDDING_CACHE_SIZE,
+        redis_url: Optional[str] = None,
+        redis_sentinels: Optional[list] = [],
+        redis_ttl: int = RAG_EMBEDDING_CACHE_REDIS_TTL,
+    ):
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.entries: OrderedDict[str, list[float]] = OrderedDict()
+
+        self.redis = None
+        self.redis_ttl = redis_ttl
+        if redis_url:
+            try:
+                self.redis = get_redis_connection(
+                    redis_url, redis_sentinels, decode_responses=True
+                )
+            except Exception as e:
+                log.warning(f"Embedding cache falling back to memory only: {e}")
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def get_key(
+        engine: str, url: str, model: str, prefix: Optional[str], text: str
+    ) -> str:
+        digest = hashlib.sha256(
+            "\0".join(
+                [engine or "", url or "", model or "", prefix or "", text]
+            ).encode()
+        ).hexdigest()
+        return f"open-webui:embedding:{digest}"
+
+    def get_many(self, keys: list[str]) -> list[Optional[list[float]]]:
+        results = [None] * len(keys)
+        missing = []
+
+        with self.lock:
+            for i, key in enumerate(keys):
+                embedding = self.entries.get(key)
+                if embedding is not None:
+                    self.entries.move_to_end(key)
+                    results[i] = embedding
+                else:
+                    missing.append(i)
+
+        if missing and self.redis:
+            try:
+                values = self.redis.mget([keys[i] for i in missing])
+                remote = {}
+                for i, value in zip(missing, values):
+                    if value is not None:
+                        results[i] = remote[keys[i]] = json.loads(value)
+                self._put_local(remote)
+            except Exception as e:
+                log.debug(f"Embedding cache Redis lookup failed: {e}")
+
+        hits = sum(1 for result in results if result is not None)
+        with self.lock:
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return results
+
+    def set_many(self, items: dict[str, list[float]]):
+        if not items:
+            return
+
+        self._put_local(items)
+
+        if self.redis:
+            try:
+                pipe = self.redis.pipeline()
+                for key, embedding in items.items():
+                    pipe.set(key, json.dumps(embedding), ex=self.redis_ttl)
+                pipe.execute()
+            except Exception as e:
+                log.debug(f"Embedding cache Redis write failed: {e}")
+
+    def _put_local(self, items: dict[str, list[float]]):
+        with self.lock:
+            for key, embedding in items.items():
+                self.entries[key] = embedding
+                self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "redis": self.redis is not None,
+            }
+
+
+EMBEDDING_CACHE = EmbeddingCache(
+    redis_url=REDIS_URL if ENABLE_RAG_EMBEDDING_CACHE_REDIS else None,
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+)
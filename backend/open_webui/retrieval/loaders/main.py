@@ -3,6 +3,7 @@ import logging
 import ftfy
 import sys
 import json
+from typing import Iterator
 
 from langchain_community.document_loaders import (
     AzureAIDocumentIntelligenceLoader,
@@ -26,6 +27,7 @@ from open_webui.retrieval.loaders.external_document import ExternalDocumentLoade
 
 from open_webui.retrieval.loaders.mistral import MistralLoader
 from open_webui.retrieval.loaders.datalab_marker import DatalabMarkerLoader
+from open_webui.retrieval.loaders.pool import DOCUMENT_EXTRACTION_POOL
 
 
 from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
@@ -34,6 +36,21 @@ logging.basicConfig(stream=sys.stdout, level=GLOBAL_LOG_LEVEL)
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
+# Loaders that parse files in-process and are worth moving to the extraction
+# pool; plain text and CSV files are read faster than a task is dispatched
+LOCAL_LOADERS = (
+    BSHTMLLoader,
+    Docx2txtLoader,
+    OutlookMessageLoader,
+    PyPDFLoader,
+    UnstructuredEPubLoader,
+    UnstructuredExcelLoader,
+    UnstructuredMarkdownLoader,
+    UnstructuredPowerPointLoader,
+    UnstructuredRSTLoader,
+    UnstructuredXMLLoader,
+)
+
 known_source_ext = [
     "go",
     "py",
@@ -214,15 +231,29 @@ class Loader:
     def load(
         self, filename: str, file_content_type: str, file_path: str
     ) -> list[Document]:
+        return list(self.lazy_load(filename, file_content_type, file_path))
+
+    def lazy_load(
+        self, filename: str, file_content_type: str, file_path: str
+    ) -> Iterator[Document]:
         loader = self._get_loader(filename, file_content_type, file_path)
-        docs = loader.load()
 
-        return [
-            Document(
+        if DOCUMENT_EXTRACTION_POOL.enabled and isinstance(loader, LOCAL_LOADERS):
+            yield from DOCUMENT_EXTRACTION_POOL.lazy_load(
+                self.engine,
+                self.kwargs,
+                filename,
+                file_content_type,
+                file_path,
+                split_pages=isinstance(loader, PyPDFLoader)
+                and not self.kwargs.get("PDF_EXTRACT_IMAGES"),
+            )
+            return
+
+        for doc in loader.load():
+            yield Document(
                 page_content=ftfy.fix_text(doc.page_content), metadata=doc.metadata
             )
-            for doc in docs
-        ]
 
     def _is_text_file(self, file_ext: str, file_content_type: str) -> bool:
         return file_ext in known_source_ext or (
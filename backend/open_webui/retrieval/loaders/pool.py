@@ -0,0 +1,227 @@
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, Optional
+
+import ftfy
+from langchain_core.documents import Document
+from pypdf import PdfReader
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    DOCUMENT_EXTRACTION_PROCESS_POOL_SIZE,
+    DOCUMENT_EXTRACTION_TIMEOUT,
+    DOCUMENT_EXTRACTION_MEMORY_LIMIT,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+# Number of PDF pages extracted by a single worker task
+PDF_PAGES_PER_TASK = 16
+
+
+def _init_worker(memory_limit: int):
+    if memory_limit > 0:
+        try:
+            import resource
+
+            limit = memory_limit * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except Exception as e:
+            log.warning(f"Unable to limit extraction worker memory: {e}")
+
+
+def _load_file(
+    engine: str, kwargs: dict, filename: str, file_content_type: str, file_path: str
+) -> list[Document]:
+    from open_webui.retrieval.loaders.main import Loader
+
+    loader = Loader(engine, **kwargs)._get_loader(
+        filename, file_content_type, file_path
+    )
+    return [
+        Document(page_content=ftfy.fix_text(doc.page_content), metadata=doc.metadata)
+        for doc in loader.load()
+    ]
+
+
+def _load_pdf_pages(file_path: str, start: int, end: int) -> list[Document]:
+    reader = PdfReader(file_path)
+    total_pages = len(reader.pages)
+
+    docs = []
+    for page in range(start, min(end, total_pages)):
+        docs.append(
+            Document(
+                page_content=ftfy.fix_text(reader.pages[page].extract_text() or ""),
+                metadata={
+                    "source": file_path,
+                    "total_pages": total_pages,
+                    "page": page,
+                    "page_label": reader.page_labels[page],
+                },
+            )
+        )
+    return docs
+
+
+class DocumentExtractionPool:
+    """
+    Runs local (CPU-bound) document loaders in worker processes so parsing
+    large files never holds the API process's GIL.
+
+    The worker processes are started on first use and kept for later files;
+    PDFs are extracted in page ranges spread over them. Every file has a
+    deadline and the workers an optional address space limit. A timed out
+    extraction stops the workers, and the executor is replaced after that or
+    after a worker crash. As the crash can't be attributed to a file, every
+    file that was running on it retries its remaining page ranges once in
+    processes of its own, where only the file that caused it fails again.
+    """
+
+    def __init__(
+        self,
+        size: int = DOCUMENT_EXTRACTION_PROCESS_POOL_SIZE,
+        timeout: float = DOCUMENT_EXTRACTION_TIMEOUT,
+        memory_limit: int = DOCUMENT_EXTRACTION_MEMORY_LIMIT,
+    ):
+        self.size = size
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+
+        self.lock = threading.Lock()
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def _create_executor(self, workers: int) -> ProcessPoolExecutor:
+        # Forking a threaded server process is unsafe, always spawn
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.memory_limit,),
+        )
+
+    def _stop_executor(self, executor: ProcessPoolExecutor):
+        # Running tasks can't be cancelled, stop their processes instead
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                self.executor = self._create_executor(self.size)
+            return self.executor
+
+    def _replace_executor(self, executor: ProcessPoolExecutor):
+        """
+        Stops a broken or stuck executor so the next file starts a new one,
+        unless another file already replaced it.
+        """
+        with self.lock:
+            if self.executor is not executor:
+                return
+            self.executor = None
+        self._stop_executor(executor)
+
+    def _submit(self, tasks: list[tuple]) -> tuple[ProcessPoolExecutor, list]:
+        while True:
+            executor = self._get_executor()
+            futures = []
+            try:
+                for task in tasks:
+                    futures.append(executor.submit(*task))
+                return executor, futures
+            except RuntimeError:
+                # Broken, or shut down by another file since it was handed out
+                for future in futures:
+                    future.cancel()
+                self._replace_executor(executor)
+
+    def lazy_load(
+        self,
+        engine: str,
+        kwargs: dict,
+        filename: str,
+        file_content_type: str,
+        file_path: str,
+        split_pages: bool = False,
+    ) -> Iterator[Document]:
+        deadline = time.monotonic() + self.timeout if self.timeout > 0 else None
+
+        total_pages = None
+        if split_pages:
+            try:
+                total_pages = len(PdfReader(file_path).pages)
+            except Exception as e:
+                log.debug(f"Unable to read page count of {filename}: {e}")
+
+        if total_pages:
+            tasks = [
+                (_load_pdf_pages, file_path, start, start + PDF_PAGES_PER_TASK)
+                for start in range(0, total_pages, PDF_PAGES_PER_TASK)
+            ]
+        else:
+            tasks = [
+                (_load_file, engine, kwargs, filename, file_content_type, file_path)
+            ]
+
+        executor, futures = self._submit(tasks)
+        isolated = None
+        done = 0
+        try:
+            # Yield pages in order as soon as their range is extracted
+            while done < len(futures):
+                try:
+                    docs = futures[done].result(
+                        timeout=(
+                            max(deadline - time.monotonic(), 0)
+                            if deadline is not None
+                            else None
+                        )
+                    )
+                except BrokenProcessPool:
+                    if isolated is not None:
+                        raise
+
+                    # The crash may have been another file's, retry once alone
+                    self._replace_executor(executor)
+                    isolated = self._create_executor(min(len(tasks) - done, self.size))
+                    futures[done:] = [isolated.submit(*task) for task in tasks[done:]]
+                    continue
+
+                done += 1
+                yield from docs
+        except TimeoutError:
+            if isolated is None:
+                self._replace_executor(executor)
+            raise TimeoutError(
+                f"Extracting {filename} took longer than {self.timeout} seconds"
+            )
+        except BrokenProcessPool:
+            raise Exception(
+                f"Extraction process for {filename} exited unexpectedly, the file may exceed the memory limit"
+            )
+        finally:
+            for future in futures[done:]:
+                future.cancel()
+            if isolated is not None:
+                self._stop_executor(isolated)
+
+    def shutdown(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            self._stop_executor(executor)
+
+
+DOCUMENT_EXTRACTION_POOL = DocumentExtractionPool()
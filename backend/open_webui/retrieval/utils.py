@@ -4,16 +4,21 @@ from typing import Optional, Union
 
 import requests
 import hashlib
+import random
+import threading
 from concurrent.futures import ThreadPoolExecutor
 import time
 
+from requests.adapters import HTTPAdapter
+
 from huggingface_hub import snapshot_download
 from langchain.retrievers import ContextualCompressionRetriever, EnsembleRetriever
-from langchain_community.retrievers import BM25Retriever
 from langchain_core.documents import Document
 
 from open_webui.config import VECTOR_DB
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25Index, BM25_INDEXES
+from open_webui.retrieval.embedding_cache import EMBEDDING_CACHE
 
 from open_webui.models.users import UserModel
 from open_webui.models.files import Files
@@ -30,6 +35,8 @@ from open_webui.config import (
     RAG_EMBEDDING_QUERY_PREFIX,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_PREFIX_FIELD_NAME,
+    RAG_EMBEDDING_CONCURRENT_REQUESTS,
+    RAG_EMBEDDING_TIMEOUT,
 )
 
 log = logging.getLogger(__name__)
@@ -74,6 +81,19 @@ class VectorSearchRetriever(BaseRetriever):
         return results
 
 
+class BM25IndexRetriever(BaseRetriever):
+    bm25_index: Any
+    top_k: int
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+    ) -> list[Document]:
+        return self.bm25_index.search(query, self.top_k)
+
+
 def query_doc(
     collection_name: str, query_embedding: list[float], k: int, user: UserModel = None
 ):
@@ -110,7 +130,7 @@ def get_doc(collection_name: str, user: UserModel = None):
 
 def query_doc_with_hybrid_search(
     collection_name: str,
-    collection_result: GetResult,
+    bm25_index: Optional[BM25Index],
     query: str,
     embedding_function,
     k: int,
@@ -121,11 +141,7 @@ def query_doc_with_hybrid_search(
 ) -> dict:
     try:
         log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
-        bm25_retriever = BM25Retriever.from_texts(
-            texts=collection_result.documents[0],
-            metadatas=collection_result.metadatas[0],
-        )
-        bm25_retriever.k = k
+        bm25_retriever = BM25IndexRetriever(bm25_index=bm25_index, top_k=k)
 
         vector_search_retriever = VectorSearchRetriever(
             collection_name=collection_name,
@@ -272,47 +288,28 @@ def query_collection(
     embedding_function,
     k: int,
 ) -> dict:
-    results = []
-    error = False
-
-    def process_query_collection(collection_name, query_embedding):
-        try:
-            if collection_name:
-                result = query_doc(
-                    collection_name=collection_name,
-                    k=k,
-                    query_embedding=query_embedding,
-                )
-                if result is not None:
-                    return result.model_dump(), None
-            return None, None
-        except Exception as e:
-            log.exception(f"Error when querying the collection: {e}")
-            return None, e
-
     # Generate all query embeddings (in one call)
     query_embeddings = embedding_function(queries, prefix=RAG_EMBEDDING_QUERY_PREFIX)
     log.debug(
         f"query_collection: processing {len(queries)} queries across {len(collection_names)} collections"
     )
 
-    with ThreadPoolExecutor() as executor:
-        future_results = []
-        for query_embedding in query_embeddings:
-            for collection_name in collection_names:
-                result = executor.submit(
-                    process_query_collection, collection_name, query_embedding
-                )
-                future_results.append(result)
-        task_results = [future.result() for future in future_results]
-
-    for result, err in task_results:
-        if err is not None:
-            error = True
-        elif result is not None:
-            results.append(result)
+    # Search every query against every collection in as few round trips as
+    # the vector db allows
+    try:
+        results = [
+            result.model_dump()
+            for result in VECTOR_DB_CLIENT.search_many(
+                collection_names=[name for name in collection_names if name],
+                vectors=query_embeddings,
+                limit=k,
+            )
+        ]
+    except Exception as e:
+        log.exception(f"Error when querying the collections: {e}")
+        results = []
 
-    if error and not results:
+    if not results:
         log.warning("All collection queries failed. No results returned.")
 
     return merge_and_sort_query_results(results, k=k)
@@ -330,20 +327,28 @@ def query_collection_with_hybrid_search(
 ) -> dict:
     results = []
     error = False
-    # Fetch collection data once per collection sequentially
-    # Avoid fetching the same data multiple times later
-    collection_results = {}
+    # Load the persisted BM25 index once per collection sequentially
+    # The vector-only ensemble does not need it at all
+    bm25_indexes = {}
     for collection_name in collection_names:
         try:
+            if hybrid_bm25_weight <= 0:
+                bm25_indexes[collection_name] = (
+                    BM25Index()
+                    if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name)
+                    else None
+                )
+                continue
+
             log.debug(
-                f"query_collection_with_hybrid_search:VECTOR_DB_CLIENT.get:collection {collection_name}"
+                f"query_collection_with_hybrid_search:BM25_INDEXES.get:collection {collection_name}"
             )
-            collection_results[collection_name] = VECTOR_DB_CLIENT.get(
+            bm25_indexes[collection_name] = BM25_INDEXES.get(
                 collection_name=collection_name
             )
         except Exception as e:
-            log.exception(f"Failed to fetch collection {collection_name}: {e}")
-            collection_results[collection_name] = None
+            log.exception(f"Failed to load BM25 index for {collection_name}: {e}")
+            bm25_indexes[collection_name] = None
 
     log.info(
         f"Starting hybrid search for {len(queries)} queries in {len(collection_names)} collections..."
@@ -353,7 +358,7 @@ def query_collection_with_hybrid_search(
         try:
             result = query_doc_with_hybrid_search(
                 collection_name=collection_name,
-                collection_result=collection_results[collection_name],
+                bm25_index=bm25_indexes[collection_name],
                 query=query,
                 embedding_function=embedding_function,
                 k=k,
@@ -368,11 +373,11 @@ def query_collection_with_hybrid_search(
             return None, e
 
     # Prepare tasks for all collections and queries
-    # Avoid running any tasks for collections that failed to fetch data (have assigned None)
+    # Avoid running any tasks for collections that failed to load an index (have assigned None)
     tasks = [
         (cn, q)
         for cn in collection_names
-        if collection_results[cn] is not None
+        if bm25_indexes[cn] is not None
         for q in queries
     ]
 
@@ -404,11 +409,14 @@ def get_embedding_function(
     azure_api_version=None,
 ):
     if embedding_engine == "":
-        return lambda query, prefix=None, user=None: embedding_function.encode(
-            query, **({"prompt": prefix} if prefix else {})
-        ).tolist()
+
+        def func(query, prefix=None, user=None):
+            return embedding_function.encode(
+                query, **({"prompt": prefix} if prefix else {})
+            ).tolist()
+
     elif embedding_engine in ["ollama", "openai", "azure_openai"]:
-        func = lambda query, prefix=None, user=None: generate_embeddings(
+        generate = lambda query, prefix=None, user=None: generate_embeddings(
             engine=embedding_engine,
             model=embedding_model,
             text=query,
@@ -419,27 +427,97 @@ def get_embedding_function(
             azure_api_version=azure_api_version,
         )
 
+        def generate_batch(batch, prefix, user, func):
+            try:
+                return func(batch, prefix=prefix, user=user)
+            except EmbeddingBatchTooLargeError as e:
+                # Adapt to upstream payload/token limits by splitting the batch
+                log.warning(
+                    f"Embedding batch of {len(batch)} too large, retrying in halves: {e}"
+                )
+                half = len(batch) // 2
+                first = generate_batch(batch[:half], prefix, user, func)
+                second = generate_batch(batch[half:], prefix, user, func)
+                if first is None or second is None:
+                    return None
+                return first + second
+
         def generate_multiple(query, prefix, user, func):
             if isinstance(query, list):
-                embeddings = []
-                for i in range(0, len(query), embedding_batch_size):
-                    embeddings.extend(
-                        func(
-                            query[i : i + embedding_batch_size],
-                            prefix=prefix,
-                            user=user,
+                batches = [
+                    query[i : i + embedding_batch_size]
+                    for i in range(0, len(query), embedding_batch_size)
+                ]
+                if len(batches) <= 1 or RAG_EMBEDDING_CONCURRENT_REQUESTS <= 1:
+                    results = [
+                        generate_batch(batch, prefix, user, func) for batch in batches
+                    ]
+                else:
+                    with ThreadPoolExecutor(
+                        max_workers=min(RAG_EMBEDDING_CONCURRENT_REQUESTS, len(batches))
+                    ) as executor:
+                        results = list(
+                            executor.map(
+                                lambda batch: generate_batch(batch, prefix, user, func),
+                                batches,
+                            )
                         )
-                    )
+
+                if any(result is None for result in results):
+                    return None
+
+                embeddings = []
+                for result in results:
+                    embeddings.extend(result)
                 return embeddings
             else:
                 return func(query, prefix, user)
 
-        return lambda query, prefix=None, user=None: generate_multiple(
-            query, prefix, user, func
-        )
+        def func(query, prefix=None, user=None):
+            return generate_multiple(query, prefix, user, generate)
+
     else:
         raise ValueError(f"Unknown embedding engine: {embedding_engine}")
 
+    if not EMBEDDING_CACHE.enabled:
+        return func
+
+    def generate_cached(query, prefix=None, user=None):
+        texts = query if isinstance(query, list) else [query]
+        keys = [
+            EMBEDDING_CACHE.get_key(
+                embedding_engine,
+                # Connections may serve different weights under the same name
+                url if embedding_engine else "",
+                embedding_model,
+                prefix,
+                text,
+            )
+            for text in texts
+        ]
+        embeddings = EMBEDDING_CACHE.get_many(keys)
+
+        # Only embed texts that are not cached yet, each distinct text once
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        missing_keys = {}
+        for i in missing:
+            missing_keys.setdefault(keys[i], texts[i])
+
+        if missing_keys:
+            generated = func(list(missing_keys.values()), prefix, user)
+            if generated is None or len(generated) != len(missing_keys):
+                return None
+
+            generated = dict(zip(missing_keys.keys(), generated))
+            EMBEDDING_CACHE.set_many(generated)
+            for i in missing:
+                embeddings[i] = generated[keys[i]]
+
+        log.debug(f"get_embedding_function:cache {EMBEDDING_CACHE.stats()}")
+        return embeddings if isinstance(query, list) else embeddings[0]
+
+    return generate_cached
+
 
 def get_sources_from_files(
     request,
@@ -589,8 +667,8 @@ def get_sources_from_files(
             extracted_collections.extend(collection_names)
 
         if context:
-            if "data" in file:
-                del file["data"]
+            # The same files may be retrieved from concurrently
+            file.pop("data", None)
 
             relevant_contexts.append({**context, "file": file})
 
@@ -614,6 +692,53 @@ def get_sources_from_files(
     return sources
 
 
+def merge_sources(files: list[dict], sources: list[list[dict]], k: int) -> list[dict]:
+    """
+    Merges the sources retrieved from the same files with different queries
+    into those a single retrieval with all the queries returns, keeping the
+    top k documents of each file.
+    """
+    merged_sources = []
+    for file in files:
+        file_sources = [
+            source
+            for result in sources
+            for source in result
+            if source["source"] is file
+        ]
+        if not file_sources:
+            continue
+
+        # Sources without distances don't depend on the queries
+        if len(file_sources) == 1 or any(
+            "distances" not in source for source in file_sources
+        ):
+            merged_sources.append(file_sources[0])
+            continue
+
+        result = merge_and_sort_query_results(
+            [
+                {
+                    "distances": [source["distances"]],
+                    "documents": [source["document"]],
+                    "metadatas": [source["metadata"]],
+                }
+                for source in file_sources
+            ],
+            k=k,
+        )
+        merged_sources.append(
+            {
+                "source": file,
+                "document": result["documents"][0],
+                "metadata": result["metadatas"][0],
+                "distances": result["distances"][0],
+            }
+        )
+
+    return merged_sources
+
+
 def get_model_path(model: str, update_model: bool = False):
     # Construct huggingface_hub kwargs with local_files_only to return the snapshot path
     cache_dir = os.getenv("SENTENCE_TRANSFORMERS_HOME")
@@ -655,6 +780,112 @@ def get_model_path(model: str, update_model: bool = False):
         return model
 
 
+# Pooled HTTP session shared by every embedding request
+EMBEDDING_SESSION = requests.Session()
+EMBEDDING_SESSION.mount(
+    "http://",
+    HTTPAdapter(pool_maxsize=max(RAG_EMBEDDING_CONCURRENT_REQUESTS, 10)),
+)
+EMBEDDING_SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_maxsize=max(RAG_EMBEDDING_CONCURRENT_REQUESTS, 10)),
+)
+
+EMBEDDING_MAX_RETRIES = 5
+
+# Time until which all embedding requests back off after a 429
+embedding_backoff_lock = threading.Lock()
+embedding_backoff_until = 0.0
+
+
+def get_embedding_headers(headers: dict, user: UserModel = None) -> dict:
+    return {
+        "Content-Type": "application/json",
+        **headers,
+        **(
+            {
+                "X-OpenWebUI-User-Name": user.name,
+                "X-OpenWebUI-User-Id": user.id,
+                "X-OpenWebUI-User-Email": user.email,
+                "X-OpenWebUI-User-Role": user.role,
+            }
+            if ENABLE_FORWARD_USER_INFO_HEADERS and user
+            else {}
+        ),
+    }
+
+
+class EmbeddingBatchTooLargeError(Exception):
+    """
+    An upstream rejected a batch of several texts for its size; smaller
+    batches may still succeed.
+    """
+
+
+def is_embedding_batch_too_large(r: requests.Response) -> bool:
+    # Other errors, e.g. a 400 for an unknown model or malformed input, only
+    # count when the body names a size or token limit
+    if r.status_code == 413:
+        return True
+
+    text = r.text.lower()
+    return any(
+        subject in text for subject in ("token", "batch", "input", "payload")
+    ) and any(
+        limit in text
+        for limit in (
+            "limit",
+            "maximum",
+            "too long",
+            "too large",
+            "too many",
+            "context length",
+            "exceed",
+        )
+    )
+
+
+def post_embedding_request(url: str, headers: dict, json_data: dict) -> dict:
+    """
+    POST an embedding request on the pooled session. A 429 makes every
+    concurrent embedding request wait for Retry-After (or an exponential
+    backoff) before trying again. A batch of several texts rejected for its
+    size raises EmbeddingBatchTooLargeError so the caller can split it.
+    """
+    global embedding_backoff_until
+
+    for attempt in range(EMBEDDING_MAX_RETRIES):
+        wait = embedding_backoff_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+        r = EMBEDDING_SESSION.post(
+            url, headers=headers, json=json_data, timeout=RAG_EMBEDDING_TIMEOUT
+        )
+        if r.status_code == 429 and attempt < EMBEDDING_MAX_RETRIES - 1:
+            try:
+                retry = float(r.headers.get("Retry-After", ""))
+            except ValueError:
+                retry = 2**attempt + random.random()
+            log.warning(f"Embedding request rate limited, retrying in {retry}s")
+
+            with embedding_backoff_lock:
+                embedding_backoff_until = max(
+                    embedding_backoff_until, time.monotonic() + retry
+                )
+            continue
+
+        if (
+            r.status_code >= 400
+            and len(json_data.get("input", [])) > 1
+            and is_embedding_batch_too_large(r)
+        ):
+            raise EmbeddingBatchTooLargeError(f"{r.status_code}: {r.text[:200]}")
+
+        r.raise_for_status()
+        return r.json()
+
+
 def generate_openai_batch_embeddings(
     model: str,
     texts: list[str],
@@ -671,30 +902,17 @@ def generate_openai_batch_embeddings(
         if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
             json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
 
-        r = requests.post(
+        data = post_embedding_request(
             f"{url}/embeddings",
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {key}",
-                **(
-                    {
-                        "X-OpenWebUI-User-Name": user.name,
-                        "X-OpenWebUI-User-Id": user.id,
-                        "X-OpenWebUI-User-Email": user.email,
-                        "X-OpenWebUI-User-Role": user.role,
-                    }
-                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                    else {}
-                ),
-            },
-            json=json_data,
+            get_embedding_headers({"Authorization": f"Bearer {key}"}, user),
+            json_data,
         )
-        r.raise_for_status()
-        data = r.json()
         if "data" in data:
             return [elem["embedding"] for elem in data["data"]]
         else:
-            raise "Something went wrong :/"
+            raise Exception("Something went wrong :/")
+    except EmbeddingBatchTooLargeError:
+        raise
     except Exception as e:
         log.exception(f"Error generating openai batch embeddings: {e}")
         return None
@@ -717,38 +935,17 @@ def generate_azure_openai_batch_embeddings(
         if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
             json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
 
-        url = f"{url}/openai/deployments/{model}/embeddings?api-version={version}"
-
-        for _ in range(5):
-            r = requests.post(
-                url,
-                headers={
-                    "Content-Type": "application/json",
-                    "api-key": key,
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": user.name,
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-                json=json_data,
-            )
-            if r.status_code == 429:
-                retry = float(r.headers.get("Retry-After", "1"))
-                time.sleep(retry)
-                continue
-            r.raise_for_status()
-            data = r.json()
-            if "data" in data:
-                return [elem["embedding"] for elem in data["data"]]
-            else:
-                raise Exception("Something went wrong :/")
-        return None
+        data = post_embedding_request(
+            f"{url}/openai/deployments/{model}/embeddings?api-version={version}",
+            get_embedding_headers({"api-key": key}, user),
+            json_data,
+        )
+        if "data" in data:
+            return [elem["embedding"] for elem in data["data"]]
+        else:
+            raise Exception("Something went wrong :/")
+    except EmbeddingBatchTooLargeError:
+        raise
     except Exception as e:
         log.exception(f"Error generating azure openai batch embeddings: {e}")
         return None
@@ -770,31 +967,18 @@ def generate_ollama_batch_embeddings(
         if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
             json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
 
-        r = requests.post(
+        data = post_embedding_request(
             f"{url}/api/embed",
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {key}",
-                **(
-                    {
-                        "X-OpenWebUI-User-Name": user.name,
-                        "X-OpenWebUI-User-Id": user.id,
-                        "X-OpenWebUI-User-Email": user.email,
-                        "X-OpenWebUI-User-Role": user.role,
-                    }
-                    if ENABLE_FORWARD_USER_INFO_HEADERS
-                    else {}
-                ),
-            },
-            json=json_data,
+            get_embedding_headers({"Authorization": f"Bearer {key}"}, user),
+            json_data,
         )
-        r.raise_for_status()
-        data = r.json()
 
         if "embeddings" in data:
             return data["embeddings"]
         else:
-            raise "Something went wrong :/"
+            raise Exception("Something went wrong :/")
+    except EmbeddingBatchTooLargeError:
+        raise
     except Exception as e:
         log.exception(f"Error generating ollama batch embeddings: {e}")
         return None
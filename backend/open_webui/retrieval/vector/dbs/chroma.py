@@ -135,6 +135,13 @@ class ChromaClient(VectorDBBase):
             )
         return None
 
+    def count(self, collection_name: str) -> Optional[int]:
+        # Count the items in the collection.
+        collection = self.client.get_collection(name=collection_name)
+        if collection:
+            return collection.count()
+        return None
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         # Insert the items into the collection, if the collection does not exist, it will be created.
         collection = self.client.get_or_create_collection(
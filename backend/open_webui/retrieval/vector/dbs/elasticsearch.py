@@ -177,6 +177,59 @@ class ElasticsearchClient(VectorDBBase):
 
         return self._result_to_search_result(result)
 
+    def search_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float]],
+        limit: int,
+    ) -> list[SearchResult]:
+        # Send every (collection, vector) pair in a single msearch round trip
+        body = []
+        for collection_name in collection_names:
+            for vector in vectors:
+                body.append(
+                    {
+                        "index": self._get_index_name(len(vector)),
+                        "ignore_unavailable": True,
+                    }
+                )
+                body.append(
+                    {
+                        "size": limit,
+                        "_source": ["text", "metadata"],
+                        "query": {
+                            "script_score": {
+                                "query": {
+                                    "bool": {
+                                        "filter": [
+                                            {"term": {"collection": collection_name}}
+                                        ]
+                                    }
+                                },
+                                "script": {
+                                    "source": "cosineSimilarity(params.vector, 'vector') + 1.0",
+                                    "params": {"vector": vector},
+                                },
+                            }
+                        },
+                    }
+                )
+
+        if not body:
+            return []
+
+        try:
+            result = self.client.msearch(body=body)
+        except Exception:
+            return super().search_many(collection_names, vectors, limit)
+
+        results = []
+        for response in result.get("responses", []):
+            if "error" in response or not response.get("hits", {}).get("hits"):
+                continue
+            results.append(self._result_to_search_result(response))
+        return results
+
     # Status: only tested halfwat
     def query(
         self, collection_name: str, filter: dict, limit: Optional[int] = None
@@ -229,6 +282,13 @@ class ElasticsearchClient(VectorDBBase):
 
         return self._scan_result_to_get_result(results)
 
+    def count(self, collection_name: str) -> Optional[int]:
+        query = {
+            "query": {"bool": {"filter": [{"term": {"collection": collection_name}}]}}
+        }
+        result = self.client.count(index=f"{self.index_prefix}*", body=query)
+        return result.body["count"]
+
     # Status: works
     def insert(self, collection_name: str, items: list[VectorItem]):
         if not self._has_index(dimension=len(items[0]["vector"])):
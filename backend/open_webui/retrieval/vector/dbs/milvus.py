@@ -7,6 +7,7 @@ from open_webui.retrieval.vector.main import (
     VectorDBBase,
     VectorItem,
     SearchResult,
+    split_search_result,
     GetResult,
 )
 from open_webui.config import (
@@ -185,6 +186,23 @@ class MilvusClient(VectorDBBase):
         )
         return self._result_to_search_result(result)
 
+    def search_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        limit: int,
+    ) -> list[SearchResult]:
+        # Milvus answers all query vectors of a collection in one search request
+        results = []
+        for collection_name in collection_names:
+            try:
+                results.extend(
+                    split_search_result(self.search(collection_name, vectors, limit))
+                )
+            except Exception as e:
+                log.exception(f"Error searching collection {collection_name}: {e}")
+        return results
+
     def query(self, collection_name: str, filter: dict, limit: Optional[int] = None):
         # Construct the filter string for querying
         collection_name = collection_name.replace("-", "_")
@@ -281,6 +299,16 @@ class MilvusClient(VectorDBBase):
         # This will use the paginated query logic.
         return self.query(collection_name=collection_name, filter={}, limit=None)
 
+    def count(self, collection_name: str) -> Optional[int]:
+        # Count the items in the collection.
+        collection_name = collection_name.replace("-", "_")
+        result = self.client.query(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            filter="",
+            output_fields=["count(*)"],
+        )
+        return result[0]["count(*)"] if result else None
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         # Insert the items into the collection, if the collection does not exist, it will be created.
         collection_name = collection_name.replace("-", "_")
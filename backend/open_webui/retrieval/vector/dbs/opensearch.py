@@ -144,6 +144,58 @@ class OpenSearchClient(VectorDBBase):
         except Exception as e:
             return None
 
+    def search_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        limit: int,
+    ) -> list[SearchResult]:
+        # Send every (collection, vector) pair in a single msearch round trip
+        body = []
+        for collection_name in collection_names:
+            for vector in vectors:
+                body.append(
+                    {
+                        "index": self._get_index_name(collection_name),
+                        "ignore_unavailable": True,
+                    }
+                )
+                body.append(
+                    {
+                        "size": limit,
+                        "_source": ["text", "metadata"],
+                        "query": {
+                            "script_score": {
+                                "query": {"match_all": {}},
+                                "script": {
+                                    "source": "(cosineSimilarity(params.query_value, doc[params.field]) + 1.0) / 2.0",
+                                    "params": {
+                                        "field": "vector",
+                                        "query_value": vector,
+                                    },
+                                },
+                            }
+                        },
+                    }
+                )
+
+        if not body:
+            return []
+
+        try:
+            result = self.client.msearch(body=body)
+        except Exception:
+            return super().search_many(collection_names, vectors, limit)
+
+        results = []
+        for response in result.get("responses", []):
+            if "error" in response or "hits" not in response:
+                continue
+            search_result = self._result_to_search_result(response)
+            if search_result is not None:
+                results.append(search_result)
+        return results
+
     def query(
         self, collection_name: str, filter: dict, limit: Optional[int] = None
     ) -> Optional[GetResult]:
@@ -404,6 +404,118 @@ class PgvectorClient(VectorDBBase):
             log.exception(f"Error during search: {e}")
             return None
 
+    def search_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float]],
+        limit: Optional[int] = None,
+    ) -> List[SearchResult]:
+        try:
+            if not vectors or not collection_names:
+                return []
+
+            # Adjust query vectors to VECTOR_LENGTH
+            vectors = [self.adjust_vector_length(vector) for vector in vectors]
+            pairs = [
+                (collection_name, vector)
+                for vector in vectors
+                for collection_name in collection_names
+            ]
+
+            def vector_expr(vector):
+                return cast(array(vector), Vector(VECTOR_LENGTH))
+
+            # One row per (collection, query vector) pair, answered by a single lateral join
+            qid_col = column("qid", Integer)
+            q_collection_col = column("q_collection", Text)
+            q_vector_col = column("q_vector", Vector(VECTOR_LENGTH))
+            query_vectors = (
+                values(qid_col, q_collection_col, q_vector_col)
+                .data(
+                    [
+                        (idx, collection_name, vector_expr(vector))
+                        for idx, (collection_name, vector) in enumerate(pairs)
+                    ]
+                )
+                .alias("query_vectors")
+            )
+
+            result_fields = [
+                DocumentChunk.id,
+            ]
+            if PGVECTOR_PGCRYPTO:
+                result_fields.append(
+                    pgcrypto_decrypt(
+                        DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text
+                    ).label("text")
+                )
+                result_fields.append(
+                    pgcrypto_decrypt(
+                        DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
+                    ).label("vmetadata")
+                )
+            else:
+                result_fields.append(DocumentChunk.text)
+                result_fields.append(DocumentChunk.vmetadata)
+            result_fields.append(
+                (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector)).label(
+                    "distance"
+                )
+            )
+
+            subq = (
+                select(*result_fields)
+                .where(DocumentChunk.collection_name == query_vectors.c.q_collection)
+                .order_by(
+                    (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector))
+                )
+            )
+            if limit is not None:
+                subq = subq.limit(limit)
+            subq = subq.lateral("result")
+
+            stmt = (
+                select(
+                    query_vectors.c.qid,
+                    subq.c.id,
+                    subq.c.text,
+                    subq.c.vmetadata,
+                    subq.c.distance,
+                )
+                .select_from(query_vectors)
+                .join(subq, true())
+                .order_by(query_vectors.c.qid, subq.c.distance)
+            )
+
+            results = self.session.execute(stmt).all()
+
+            ids = [[] for _ in pairs]
+            distances = [[] for _ in pairs]
+            documents = [[] for _ in pairs]
+            metadatas = [[] for _ in pairs]
+
+            for row in results:
+                qid = int(row.qid)
+                ids[qid].append(row.id)
+                # normalize and re-orders pgvec distance from [2, 0] to [0, 1] score range
+                distances[qid].append((2.0 - row.distance) / 2.0)
+                documents[qid].append(row.text)
+                metadatas[qid].append(row.vmetadata)
+
+            return [
+                SearchResult(
+                    ids=[ids[qid]],
+                    distances=[distances[qid]],
+                    documents=[documents[qid]],
+                    metadatas=[metadatas[qid]],
+                )
+                for qid in range(len(pairs))
+            ]
+        except Exception as e:
+            log.exception(f"Error during batched search: {e}")
+            self.session.rollback()
+            return super().search_many(collection_names, vectors, limit)
+
     def query(
         self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
     ) -> Optional[GetResult]:
@@ -573,6 +685,18 @@ class PgvectorClient(VectorDBBase):
             log.exception(f"Error checking collection existence: {e}")
             return False
 
+    def count(self, collection_name: str) -> Optional[int]:
+        try:
+            return (
+                self.session.query(func.count(DocumentChunk.id))
+                .filter(DocumentChunk.collection_name == collection_name)
+                .scalar()
+            )
+        except Exception as e:
+            self.session.rollback()
+            log.exception(f"Error counting collection: {e}")
+            return None
+
     def delete_collection(self, collection_name: str) -> None:
         self.delete(collection_name)
         log.info(f"Collection '{collection_name}' deleted.")
@@ -135,6 +135,50 @@ class QdrantClient(VectorDBBase):
             distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
         )
 
+    def search_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        limit: int,
+    ) -> list[SearchResult]:
+        if limit is None:
+            limit = NO_LIMIT  # otherwise qdrant would set limit to 10!
+
+        # Send all query vectors of a collection as one batch request
+        results = []
+        for collection_name in collection_names:
+            try:
+                query_responses = self.client.query_batch_points(
+                    collection_name=f"{self.collection_prefix}_{collection_name}",
+                    requests=[
+                        models.QueryRequest(
+                            query=vector, limit=limit, with_payload=True
+                        )
+                        for vector in vectors
+                    ],
+                )
+            except Exception as e:
+                log.exception(f"Error searching collection {collection_name}: {e}")
+                continue
+
+            for query_response in query_responses:
+                get_result = self._result_to_get_result(query_response.points)
+                results.append(
+                    SearchResult(
+                        ids=get_result.ids,
+                        documents=get_result.documents,
+                        metadatas=get_result.metadatas,
+                        # qdrant distance is [-1, 1], normalize to [0, 1]
+                        distances=[
+                            [
+                                (point.score + 1.0) / 2.0
+                                for point in query_response.points
+                            ]
+                        ],
+                    )
+                )
+        return results
+
     def query(self, collection_name: str, filter: dict, limit: Optional[int] = None):
         # Construct the filter string for querying
         if not self.has_collection(collection_name):
@@ -169,6 +213,12 @@ class QdrantClient(VectorDBBase):
         )
         return self._result_to_get_result(points.points)
 
+    def count(self, collection_name: str) -> Optional[int]:
+        # Count the items in the collection.
+        return self.client.count(
+            collection_name=f"{self.collection_prefix}_{collection_name}", exact=True
+        ).count
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         # Insert the items into the collection, if the collection does not exist, it will be created.
         self._create_collection_if_not_exists(collection_name, len(items[0]["vector"]))
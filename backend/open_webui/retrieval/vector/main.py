@@ -1,7 +1,14 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from pydantic import BaseModel
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional, Union
 
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
 
 class VectorItem(BaseModel):
     id: str
@@ -20,6 +27,21 @@ class SearchResult(GetResult):
     distances: Optional[List[List[float | int]]]
 
 
+def split_search_result(result: SearchResult) -> List[SearchResult]:
+    """Split a multi-vector SearchResult into one SearchResult per query vector."""
+    return [
+        SearchResult(
+            ids=[ids],
+            documents=[documents],
+            metadatas=[metadatas],
+            distances=[distances],
+        )
+        for ids, documents, metadatas, distances in zip(
+            result.ids, result.documents, result.metadatas, result.distances
+        )
+    ]
+
+
 class VectorDBBase(ABC):
     """
     Abstract base class for all vector database backends.
@@ -58,6 +80,42 @@ class VectorDBBase(ABC):
         """Search for similar vectors in a collection."""
         pass
 
+    def search_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[Union[float, int]]],
+        limit: int,
+    ) -> List[SearchResult]:
+        """
+        Search several collections with several query vectors.
+
+        Returns a single-vector SearchResult for every (collection, vector)
+        pair that could be searched. Backends that can answer many searches in
+        one request override this; the default runs the searches concurrently.
+        """
+
+        def search_one(collection_name, vector):
+            try:
+                return self.search(
+                    collection_name=collection_name, vectors=[vector], limit=limit
+                )
+            except Exception as e:
+                log.exception(f"Error searching collection {collection_name}: {e}")
+                return None
+
+        with ThreadPoolExecutor() as executor:
+            results = list(
+                executor.map(
+                    lambda pair: search_one(*pair),
+                    [
+                        (collection_name, vector)
+                        for vector in vectors
+                        for collection_name in collection_names
+                    ],
+                )
+            )
+        return [result for result in results if result is not None]
+
     @abstractmethod
     def query(
         self, collection_name: str, filter: Dict, limit: Optional[int] = None
@@ -70,6 +128,13 @@ class VectorDBBase(ABC):
         """Retrieve all vectors from a collection."""
         pass
 
+    def count(self, collection_name: str) -> Optional[int]:
+        """
+        Count the vectors in a collection, or None if the backend can't count
+        them cheaply.
+        """
+        return None
+
     @abstractmethod
     def delete(
         self,
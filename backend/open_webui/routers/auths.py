@@ -50,6 +50,7 @@ from open_webui.utils.auth import (
 )
 from open_webui.utils.webhook import post_webhook
 from open_webui.utils.access_control import get_permissions
+from open_webui.utils.model_access import MODEL_ACCESS_CACHE
 
 from typing import Optional, List
 
@@ -419,9 +420,11 @@ async def ldap_auth(request: Request, response: Response, form_data: LdapForm):
                 ):
                     if ENABLE_LDAP_GROUP_CREATION:
                         Groups.create_groups_by_group_names(user.id, user_groups)
+                        MODEL_ACCESS_CACHE.invalidate()
 
                     try:
                         Groups.sync_groups_by_group_names(user.id, user_groups)
+                        MODEL_ACCESS_CACHE.invalidate()
                         log.info(
                             f"Successfully synced groups for user {user.id}: {user_groups}"
                         )
@@ -481,6 +484,7 @@ async def signin(request: Request, response: Response, form_data: SigninForm):
 
             if group_names:
                 Groups.sync_groups_by_group_names(user.id, group_names)
+                MODEL_ACCESS_CACHE.invalidate()
 
     elif WEBUI_AUTH == False:
         admin_email = "admin@localhost"
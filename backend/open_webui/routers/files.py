@@ -32,10 +32,12 @@ from open_webui.models.files import (
 from open_webui.models.knowledge import Knowledges
 
 from open_webui.routers.knowledge import get_knowledge, get_knowledge_list
+from open_webui.retrieval.chunk_store import CHUNK_STORE
 from open_webui.routers.retrieval import ProcessFileForm, process_file
 from open_webui.routers.audio import transcribe
 from open_webui.storage.provider import Storage
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.ingestion import INGESTION_QUEUE
 from pydantic import BaseModel
 
 log = logging.getLogger(__name__)
@@ -82,6 +84,45 @@ def has_access_to_file(
 ############################
 
 
+@INGESTION_QUEUE.register("upload")
+def process_uploaded_file(
+    request: Request, user, file_id: str, file_metadata: Optional[dict] = None
+):
+    file = Files.get_file_by_id(id=file_id)
+    content_type = file.meta.get("content_type")
+
+    if content_type:
+        stt_supported_content_types = (
+            request.app.state.config.STT_SUPPORTED_CONTENT_TYPES
+            or [
+                "audio/*",
+                "video/webm",
+            ]
+        )
+
+        if any(
+            fnmatch(content_type, stt_content_type)
+            for stt_content_type in stt_supported_content_types
+        ):
+            file_path = Storage.get_file(file.path)
+            result = transcribe(request, file_path, file_metadata or {})
+
+            process_file(
+                request,
+                ProcessFileForm(file_id=file_id, content=result.get("text", "")),
+                user=user,
+            )
+        elif (not content_type.startswith(("image/", "video/"))) or (
+            request.app.state.config.CONTENT_EXTRACTION_ENGINE == "external"
+        ):
+            process_file(request, ProcessFileForm(file_id=file_id), user=user)
+    else:
+        log.info(
+            f"File type {content_type} is not provided, but trying to process anyway"
+        )
+        process_file(request, ProcessFileForm(file_id=file_id), user=user)
+
+
 @router.post("/", response_model=FileModelResponse)
 def upload_file(
     request: Request,
@@ -153,48 +194,28 @@ def upload_file(
             ),
         )
         if process:
-            try:
-                if file.content_type:
-                    stt_supported_content_types = (
-                        request.app.state.config.STT_SUPPORTED_CONTENT_TYPES
-                        or [
-                            "audio/*",
-                            "video/webm",
-                        ]
-                    )
-
-                    if any(
-                        fnmatch(file.content_type, content_type)
-                        for content_type in stt_supported_content_types
-                    ):
-                        file_path = Storage.get_file(file_path)
-                        result = transcribe(request, file_path, file_metadata)
-
-                        process_file(
-                            request,
-                            ProcessFileForm(file_id=id, content=result.get("text", "")),
-                            user=user,
-                        )
-                    elif (not file.content_type.startswith(("image/", "video/"))) or (
-                        request.app.state.config.CONTENT_EXTRACTION_ENGINE == "external"
-                    ):
-                        process_file(request, ProcessFileForm(file_id=id), user=user)
-                else:
-                    log.info(
-                        f"File type {file.content_type} is not provided, but trying to process anyway"
-                    )
-                    process_file(request, ProcessFileForm(file_id=id), user=user)
-
-                file_item = Files.get_file_by_id(id=id)
-            except Exception as e:
-                log.exception(e)
-                log.error(f"Error processing file: {file_item.id}")
-                file_item = FileModelResponse(
-                    **{
-                        **file_item.model_dump(),
-                        "error": str(e.detail) if hasattr(e, "detail") else str(e),
-                    }
+            if INGESTION_QUEUE.enabled and not internal:
+                INGESTION_QUEUE.enqueue(
+                    "upload",
+                    {"file_id": id, "file_metadata": file_metadata},
+                    user_id=user.id,
+                    file_id=id,
+                    job_id=f"upload:{id}",
                 )
+                file_item = Files.get_file_by_id(id=id)
+            else:
+                try:
+                    process_uploaded_file(request, user, id, file_metadata)
+                    file_item = Files.get_file_by_id(id=id)
+                except Exception as e:
+                    log.exception(e)
+                    log.error(f"Error processing file: {file_item.id}")
+                    file_item = FileModelResponse(
+                        **{
+                            **file_item.model_dump(),
+                            "error": str(e.detail) if hasattr(e, "detail") else str(e),
+                        }
+                    )
 
         if file_item:
             return file_item
@@ -283,6 +304,7 @@ async def search_files(
 async def delete_all_files(user=Depends(get_admin_user)):
     result = Files.delete_all_files()
     if result:
+        CHUNK_STORE.reset()
         try:
             Storage.delete_all_files()
         except Exception as e:
@@ -356,6 +378,42 @@ async def get_file_data_content_by_id(id: str, user=Depends(get_verified_user)):
         )
 
 
+############################
+# Get File Process Status By Id
+############################
+
+
+@router.get("/{id}/process/status")
+async def get_file_process_status_by_id(id: str, user=Depends(get_verified_user)):
+    file = Files.get_file_by_id(id)
+
+    if not file:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+    if (
+        file.user_id == user.id
+        or user.role == "admin"
+        or has_access_to_file(id, "read", user)
+    ):
+        data = file.data or {}
+        job = (
+            INGESTION_QUEUE.get_job(f"upload:{id}") if INGESTION_QUEUE.enabled else None
+        )
+        return {
+            "status": data.get("status", "completed"),
+            "progress": job.get("progress") if job else None,
+            "error": data.get("error"),
+        }
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+
 ############################
 # Update File Data Content By Id
 ############################
@@ -606,6 +664,7 @@ async def delete_file_by_id(id: str, user=Depends(get_verified_user)):
 
         result = Files.delete_file_by_id(id)
         if result:
+            CHUNK_STORE.delete_by_hash(file.hash)
             try:
                 Storage.delete_file(file.path)
             except Exception as e:
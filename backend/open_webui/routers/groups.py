@@ -16,6 +16,7 @@ from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.model_access import MODEL_ACCESS_CACHE
 from open_webui.env import SRC_LOG_LEVELS
 
 
@@ -46,6 +47,7 @@ async def get_groups(user=Depends(get_verified_user)):
 async def create_new_group(form_data: GroupForm, user=Depends(get_admin_user)):
     try:
         group = Groups.insert_new_group(user.id, form_data)
+        MODEL_ACCESS_CACHE.invalidate()
         if group:
             return group
         else:
@@ -92,6 +94,7 @@ async def update_group_by_id(
             form_data.user_ids = Users.get_valid_user_ids(form_data.user_ids)
 
         group = Groups.update_group_by_id(id, form_data)
+        MODEL_ACCESS_CACHE.invalidate()
         if group:
             return group
         else:
@@ -116,6 +119,7 @@ async def update_group_by_id(
 async def delete_group_by_id(id: str, user=Depends(get_admin_user)):
     try:
         result = Groups.delete_group_by_id(id)
+        MODEL_ACCESS_CACHE.invalidate()
         if result:
             return result
         else:
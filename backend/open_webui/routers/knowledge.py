@@ -11,6 +11,8 @@ from open_webui.models.knowledge import (
 )
 from open_webui.models.files import Files, FileModel, FileMetadataResponse
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEXES
+from open_webui.retrieval.chunk_store import CHUNK_STORE
 from open_webui.routers.retrieval import (
     process_file,
     ProcessFileForm,
@@ -22,6 +24,8 @@ from open_webui.storage.provider import Storage
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.utils.auth import get_verified_user
 from open_webui.utils.access_control import has_access, has_permission
+from open_webui.utils.ingestion import INGESTION_QUEUE
+from open_webui.utils.model_access import MODEL_ACCESS_CACHE
 
 
 from open_webui.env import SRC_LOG_LEVELS
@@ -174,6 +178,14 @@ async def reindex_knowledge_files(request: Request, user=Depends(get_verified_us
             detail=ERROR_MESSAGES.UNAUTHORIZED,
         )
 
+    if INGESTION_QUEUE.enabled and any(
+        job["status"] in ["pending", "processing"]
+        for job in INGESTION_QUEUE.get_jobs("reindex:")
+    ):
+        # The queued jobs of the previous run carry on (also across restarts)
+        log.info("Reindexing already in progress, resuming queued files")
+        return True
+
     knowledge_bases = Knowledges.get_knowledge_bases()
 
     log.info(f"Starting reindexing for {len(knowledge_bases)} knowledge bases")
@@ -203,12 +215,23 @@ async def reindex_knowledge_files(request: Request, user=Depends(get_verified_us
                     VECTOR_DB_CLIENT.delete_collection(
                         collection_name=knowledge_base.id
                     )
+                BM25_INDEXES.delete_collection(collection_name=knowledge_base.id)
             except Exception as e:
                 log.error(f"Error deleting collection {knowledge_base.id}: {str(e)}")
                 continue  # Skip, don't raise
 
             failed_files = []
             for file in files:
+                if INGESTION_QUEUE.enabled:
+                    INGESTION_QUEUE.enqueue(
+                        "reindex",
+                        {"knowledge_id": knowledge_base.id, "file_id": file.id},
+                        user_id=user.id,
+                        file_id=file.id,
+                        job_id=f"reindex:{knowledge_base.id}:{file.id}",
+                    )
+                    continue
+
                 try:
                     process_file(
                         request,
@@ -242,6 +265,57 @@ async def reindex_knowledge_files(request: Request, user=Depends(get_verified_us
     return True
 
 
+def remove_failed_knowledge_file(
+    request: Request, user, knowledge_id: str, file_id: str
+):
+    # Files added while their upload was queued are listed right away, take
+    # the file out again if its content couldn't be added
+    knowledge = Knowledges.get_knowledge_by_id(id=knowledge_id)
+    if knowledge:
+        data = knowledge.data or {}
+        file_ids = data.get("file_ids", [])
+
+        if file_id in file_ids:
+            file_ids.remove(file_id)
+            data["file_ids"] = file_ids
+            Knowledges.update_knowledge_data_by_id(id=knowledge_id, data=data)
+
+
+@INGESTION_QUEUE.register("knowledge", on_failure=remove_failed_knowledge_file)
+@INGESTION_QUEUE.register("reindex")
+def reindex_knowledge_file(request: Request, user, knowledge_id: str, file_id: str):
+    process_file(
+        request,
+        ProcessFileForm(file_id=file_id, collection_name=knowledge_id),
+        user=user,
+    )
+
+
+@router.get("/reindex/status")
+async def get_reindex_knowledge_files_status(user=Depends(get_verified_user)):
+    if user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=ERROR_MESSAGES.UNAUTHORIZED,
+        )
+
+    jobs = INGESTION_QUEUE.get_jobs("reindex:") if INGESTION_QUEUE.enabled else []
+
+    counts = {"pending": 0, "processing": 0, "completed": 0, "failed": 0}
+    for job in jobs:
+        counts[job["status"]] = counts.get(job["status"], 0) + 1
+
+    return {
+        **counts,
+        "total": len(jobs),
+        "failed_files": [
+            {"file_id": job["file_id"], "error": job["error"]}
+            for job in jobs
+            if job["status"] == "failed"
+        ],
+    }
+
+
 ############################
 # GetKnowledgeById
 ############################
@@ -367,19 +441,34 @@ def add_file_to_knowledge_by_id(
             detail=ERROR_MESSAGES.FILE_NOT_PROCESSED,
         )
 
-    # Add content to the vector database
-    try:
-        process_file(
-            request,
-            ProcessFileForm(file_id=form_data.file_id, collection_name=id),
-            user=user,
-        )
-    except Exception as e:
-        log.debug(e)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e),
+    if INGESTION_QUEUE.enabled and file.data.get("status") in [
+        "pending",
+        "processing",
+    ]:
+        # The upload is still queued, add the content once it's processed.
+        # The file is listed now and removed again if that fails.
+        INGESTION_QUEUE.enqueue(
+            "knowledge",
+            {"knowledge_id": id, "file_id": form_data.file_id},
+            user_id=user.id,
+            file_id=form_data.file_id,
+            job_id=f"knowledge:{id}:{form_data.file_id}",
+            after=f"upload:{form_data.file_id}",
         )
+    else:
+        # Add content to the vector database
+        try:
+            process_file(
+                request,
+                ProcessFileForm(file_id=form_data.file_id, collection_name=id),
+                user=user,
+            )
+        except Exception as e:
+            log.debug(e)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
 
     if knowledge:
         data = knowledge.data or {}
@@ -451,6 +540,9 @@ def update_file_from_knowledge_by_id(
     VECTOR_DB_CLIENT.delete(
         collection_name=knowledge.id, filter={"file_id": form_data.file_id}
     )
+    BM25_INDEXES.delete(
+        collection_name=knowledge.id, filter={"file_id": form_data.file_id}
+    )
 
     # Add content to the vector database
     try:
@@ -522,6 +614,9 @@ def remove_file_from_knowledge_by_id(
         VECTOR_DB_CLIENT.delete(
             collection_name=knowledge.id, filter={"file_id": form_data.file_id}
         )
+        BM25_INDEXES.delete(
+            collection_name=knowledge.id, filter={"file_id": form_data.file_id}
+        )
     except Exception as e:
         log.debug("This was most likely caused by bypassing embedding processing")
         log.debug(e)
@@ -532,6 +627,7 @@ def remove_file_from_knowledge_by_id(
         file_collection = f"file-{form_data.file_id}"
         if VECTOR_DB_CLIENT.has_collection(collection_name=file_collection):
             VECTOR_DB_CLIENT.delete_collection(collection_name=file_collection)
+        BM25_INDEXES.delete_collection(collection_name=file_collection)
     except Exception as e:
         log.debug("This was most likely caused by bypassing embedding processing")
         log.debug(e)
@@ -539,6 +635,7 @@ def remove_file_from_knowledge_by_id(
 
     # Delete file from database
     Files.delete_file_by_id(form_data.file_id)
+    CHUNK_STORE.delete_by_hash(file.hash)
 
     if knowledge:
         data = knowledge.data or {}
@@ -626,13 +723,20 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
                     is_active=model.is_active,
                 )
                 Models.update_model_by_id(model.id, model_form)
+                MODEL_ACCESS_CACHE.invalidate()
 
     # Clean up vector DB
     try:
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        BM25_INDEXES.delete_collection(collection_name=id)
     except Exception as e:
         log.debug(e)
         pass
+
+    # Clean up the stored chunks of the knowledge base's files
+    for file in Files.get_files_by_ids((knowledge.data or {}).get("file_ids", [])):
+        CHUNK_STORE.delete_by_hash(file.hash)
+
     result = Knowledges.delete_knowledge_by_id(id=id)
     return result
 
@@ -663,6 +767,7 @@ async def reset_knowledge_by_id(id: str, user=Depends(get_verified_user)):
 
     try:
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        BM25_INDEXES.delete_collection(collection_name=id)
     except Exception as e:
         log.debug(e)
         pass
@@ -13,6 +13,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request, status
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access, has_permission
+from open_webui.utils.model_access import MODEL_ACCESS_CACHE
 
 
 router = APIRouter()
@@ -69,6 +70,7 @@ async def create_new_model(
 
     else:
         model = Models.insert_new_model(form_data, user.id)
+        MODEL_ACCESS_CACHE.invalidate()
         if model:
             return model
         else:
@@ -116,6 +118,7 @@ async def toggle_model_by_id(id: str, user=Depends(get_verified_user)):
             or has_access(user.id, "write", model.access_control)
         ):
             model = Models.toggle_model_by_id(id)
+            MODEL_ACCESS_CACHE.invalidate()
 
             if model:
                 return model
@@ -166,6 +169,7 @@ async def update_model_by_id(
         )
 
     model = Models.update_model_by_id(id, form_data)
+    MODEL_ACCESS_CACHE.invalidate()
     return model
 
 
@@ -194,10 +198,12 @@ async def delete_model_by_id(id: str, user=Depends(get_verified_user)):
         )
 
     result = Models.delete_model_by_id(id)
+    MODEL_ACCESS_CACHE.invalidate()
     return result
 
 
 @router.delete("/delete/all", response_model=bool)
 async def delete_all_models(user=Depends(get_admin_user)):
     result = Models.delete_all_models()
+    MODEL_ACCESS_CACHE.invalidate()
     return result
@@ -4,6 +4,9 @@ import mimetypes
 import os
 import shutil
 import asyncio
+import itertools
+import queue
+import threading
 
 
 import uuid
@@ -37,6 +40,9 @@ from open_webui.storage.provider import Storage
 
 
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEXES
+from open_webui.retrieval.embedding_cache import EMBEDDING_CACHE
+from open_webui.retrieval.chunk_store import CHUNK_STORE
 
 # Document loaders
 from open_webui.retrieval.loaders.main import Loader
@@ -79,6 +85,7 @@ from open_webui.utils.misc import (
     calculate_sha256_string,
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.ingestion import INGESTION_QUEUE
 
 from open_webui.config import (
     ENV,
@@ -89,6 +96,9 @@ from open_webui.config import (
     UPLOAD_DIR,
     DEFAULT_LOCALE,
     RAG_EMBEDDING_CONTENT_PREFIX,
+    RAG_INGESTION_EMBEDDING_BATCH_SIZE,
+    RAG_INGESTION_INSERT_BATCH_SIZE,
+    RAG_INGESTION_MAX_PENDING_BATCHES,
     RAG_EMBEDDING_QUERY_PREFIX,
 )
 from open_webui.env import (
@@ -247,6 +257,18 @@ async def get_embedding_config(request: Request, user=Depends(get_admin_user)):
     }
 
 
+@router.get("/embedding/cache")
+async def get_embedding_cache_stats(user=Depends(get_admin_user)):
+    return {"status": True, **EMBEDDING_CACHE.stats()}
+
+
+@router.post("/embedding/cache/reset")
+async def reset_embedding_cache(user=Depends(get_admin_user)):
+    EMBEDDING_CACHE.clear()
+    CHUNK_STORE.reset()
+    return {"status": True}
+
+
 class OpenAIConfigForm(BaseModel):
     url: str
     key: str
@@ -1139,65 +1161,135 @@ def save_docs_to_vector_db(
                 log.info(f"Document with hash {metadata['hash']} already exists")
                 raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
 
-    if split:
-        if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-        elif request.app.state.config.TEXT_SPLITTER == "token":
-            log.info(
-                f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
+    # Reuse the chunks and vectors of identical content that was already
+    # split and embedded with the same settings, e.g. for another collection
+    chunk_key = None
+    stored_chunks = None
+    if metadata and "hash" in metadata and CHUNK_STORE.enabled:
+        chunk_key = CHUNK_STORE.get_key(
+            metadata["hash"],
+            (
+                {
+                    "splitter": request.app.state.config.TEXT_SPLITTER,
+                    "chunk_size": request.app.state.config.CHUNK_SIZE,
+                    "chunk_overlap": request.app.state.config.CHUNK_OVERLAP,
+                    "encoding_name": (
+                        request.app.state.config.TIKTOKEN_ENCODING_NAME
+                        if request.app.state.config.TEXT_SPLITTER == "token"
+                        else None
+                    ),
+                }
+                if split
+                else None
+            ),
+            request.app.state.config.RAG_EMBEDDING_ENGINE,
+            request.app.state.config.RAG_EMBEDDING_MODEL,
+            RAG_EMBEDDING_CONTENT_PREFIX,
+        )
+        stored_chunks = CHUNK_STORE.get(chunk_key)
+
+    # (chunk, vector) pairs, vector is None when it still has to be embedded.
+    # Chunks are produced lazily so only one batch is held in memory.
+    split_progress = {"docs": 0}
+    if stored_chunks is not None:
+        log.info(f"reusing stored chunks for hash {metadata['hash']}")
+
+        # Stored chunks may come from another file with the same content
+        file_metadata = {
+            key: value
+            for key, value in (docs[0].metadata if docs else {}).items()
+            if key in ["name", "source", "created_by", "file_id"]
+        }
+        chunks = (
+            (
+                Document(
+                    page_content=chunk["text"],
+                    metadata={**chunk["metadata"], **file_metadata},
+                ),
+                chunk["vector"],
             )
+            for chunk in stored_chunks
+        )
+    else:
+        text_splitter = None
+        if split:
+            if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
+                text_splitter = RecursiveCharacterTextSplitter(
+                    chunk_size=request.app.state.config.CHUNK_SIZE,
+                    chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+                    add_start_index=True,
+                )
+            elif request.app.state.config.TEXT_SPLITTER == "token":
+                log.info(
+                    f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
+                )
 
-            tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
-            text_splitter = TokenTextSplitter(
-                encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-        else:
-            raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
+                tiktoken.get_encoding(
+                    str(request.app.state.config.TIKTOKEN_ENCODING_NAME)
+                )
+                text_splitter = TokenTextSplitter(
+                    encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
+                    chunk_size=request.app.state.config.CHUNK_SIZE,
+                    chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+                    add_start_index=True,
+                )
+            else:
+                raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
+
+        def split_docs():
+            for idx, doc in enumerate(docs):
+                for chunk in (
+                    text_splitter.split_documents([doc]) if text_splitter else [doc]
+                ):
+                    yield chunk, None
+                split_progress["docs"] = idx + 1
 
-        docs = text_splitter.split_documents(docs)
+        chunks = split_docs()
 
-    if len(docs) == 0:
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
         raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    chunks = itertools.chain([first_chunk], chunks)
 
-    texts = [doc.page_content for doc in docs]
-    metadatas = [
+    embedding_config = json.dumps(
         {
+            "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
+            "model": request.app.state.config.RAG_EMBEDDING_MODEL,
+        }
+    )
+
+    def get_item_metadata(doc: Document) -> dict:
+        item_metadata = {
             **doc.metadata,
             **(metadata if metadata else {}),
-            "embedding_config": json.dumps(
-                {
-                    "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
-                    "model": request.app.state.config.RAG_EMBEDDING_MODEL,
-                }
-            ),
+            "embedding_config": embedding_config,
         }
-        for doc in docs
-    ]
 
-    # ChromaDB does not like datetime formats
-    # for meta-data so convert them to string.
-    for metadata in metadatas:
-        for key, value in metadata.items():
+        # ChromaDB does not like datetime formats
+        # for meta-data so convert them to string.
+        for key, value in item_metadata.items():
             if (
                 isinstance(value, datetime)
                 or isinstance(value, list)
                 or isinstance(value, dict)
             ):
-                metadata[key] = str(value)
+                item_metadata[key] = str(value)
+        return item_metadata
+
+    chunk_writer = None
+    inserted_ids = []
 
     try:
-        if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
+        has_collection = VECTOR_DB_CLIENT.has_collection(
+            collection_name=collection_name
+        )
+        if has_collection:
             log.info(f"collection {collection_name} already exists")
 
             if overwrite:
                 VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+                BM25_INDEXES.delete_collection(collection_name=collection_name)
+                has_collection = False
                 log.info(f"deleting existing collection {collection_name}")
             elif add is False:
                 log.info(
@@ -1206,60 +1298,163 @@ def save_docs_to_vector_db(
                 return True
 
         log.info(f"adding to collection {collection_name}")
-        embedding_function = get_embedding_function(
-            request.app.state.config.RAG_EMBEDDING_ENGINE,
-            request.app.state.config.RAG_EMBEDDING_MODEL,
-            request.app.state.ef,
-            (
-                request.app.state.config.RAG_OPENAI_API_BASE_URL
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-                else (
-                    request.app.state.config.RAG_OLLAMA_BASE_URL
-                    if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
-                    else request.app.state.config.RAG_AZURE_OPENAI_BASE_URL
-                )
-            ),
-            (
-                request.app.state.config.RAG_OPENAI_API_KEY
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-                else (
-                    request.app.state.config.RAG_OLLAMA_API_KEY
-                    if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
-                    else request.app.state.config.RAG_AZURE_OPENAI_API_KEY
-                )
-            ),
-            request.app.state.config.RAG_EMBEDDING_BATCH_SIZE,
-            azure_api_version=(
-                request.app.state.config.RAG_AZURE_OPENAI_API_VERSION
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "azure_openai"
-                else None
-            ),
-        )
+        embedding_function = None
+        if stored_chunks is None:
+            embedding_function = get_embedding_function(
+                request.app.state.config.RAG_EMBEDDING_ENGINE,
+                request.app.state.config.RAG_EMBEDDING_MODEL,
+                request.app.state.ef,
+                (
+                    request.app.state.config.RAG_OPENAI_API_BASE_URL
+                    if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
+                    else (
+                        request.app.state.config.RAG_OLLAMA_BASE_URL
+                        if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
+                        else request.app.state.config.RAG_AZURE_OPENAI_BASE_URL
+                    )
+                ),
+                (
+                    request.app.state.config.RAG_OPENAI_API_KEY
+                    if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
+                    else (
+                        request.app.state.config.RAG_OLLAMA_API_KEY
+                        if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
+                        else request.app.state.config.RAG_AZURE_OPENAI_API_KEY
+                    )
+                ),
+                request.app.state.config.RAG_EMBEDDING_BATCH_SIZE,
+                azure_api_version=(
+                    request.app.state.config.RAG_AZURE_OPENAI_API_VERSION
+                    if request.app.state.config.RAG_EMBEDDING_ENGINE == "azure_openai"
+                    else None
+                ),
+            )
 
-        embeddings = embedding_function(
-            list(map(lambda x: x.replace("\n", " "), texts)),
-            prefix=RAG_EMBEDDING_CONTENT_PREFIX,
-            user=user,
-        )
+            if chunk_key:
+                chunk_writer = CHUNK_STORE.writer(chunk_key)
 
-        items = [
-            {
-                "id": str(uuid.uuid4()),
-                "text": text,
-                "vector": embeddings[idx],
-                "metadata": metadatas[idx],
-            }
-            for idx, text in enumerate(texts)
-        ]
+        # Embedded batches are inserted on a separate thread while the next
+        # batch is embedded; the bounded queue pauses embedding when inserts
+        # fall behind
+        insert_queue = queue.Queue(maxsize=max(RAG_INGESTION_MAX_PENDING_BATCHES, 1))
+        insert_errors = []
 
-        VECTOR_DB_CLIENT.insert(
-            collection_name=collection_name,
-            items=items,
-        )
+        def insert_items():
+            update_bm25 = True
+            while (items := insert_queue.get()) is not None:
+                if insert_errors:
+                    continue
+
+                try:
+                    VECTOR_DB_CLIENT.insert(
+                        collection_name=collection_name,
+                        items=items,
+                    )
+                except Exception as e:
+                    insert_errors.append(e)
+                    continue
+
+                first_batch = not inserted_ids
+                inserted_ids.extend(item["id"] for item in items)
+
+                # Keep the collection's keyword index in step with the vector DB so
+                # hybrid search never has to re-read and re-tokenize the collection
+                if update_bm25:
+                    try:
+                        BM25_INDEXES.insert(
+                            collection_name=collection_name,
+                            items=items,
+                            backfill=has_collection and first_batch,
+                        )
+                    except Exception as e:
+                        log.exception(
+                            f"Error updating BM25 index for {collection_name}: {e}"
+                        )
+                        BM25_INDEXES.delete_collection(collection_name=collection_name)
+                        update_bm25 = False
+
+        def put_items(items: list[dict]):
+            insert_queue.put(items)
+            if insert_errors:
+                raise insert_errors[0]
+
+        inserter = threading.Thread(target=insert_items, daemon=True)
+        inserter.start()
+
+        try:
+            items = []
+            while batch := list(
+                itertools.islice(chunks, RAG_INGESTION_EMBEDDING_BATCH_SIZE)
+            ):
+                if embedding_function is not None:
+                    embeddings = embedding_function(
+                        [doc.page_content.replace("\n", " ") for doc, _ in batch],
+                        prefix=RAG_EMBEDDING_CONTENT_PREFIX,
+                        user=user,
+                    )
+
+                    if chunk_writer:
+                        chunk_writer.write(
+                            [
+                                {
+                                    "text": doc.page_content,
+                                    "metadata": doc.metadata,
+                                    "vector": embeddings[idx],
+                                }
+                                for idx, (doc, _) in enumerate(batch)
+                            ]
+                        )
+                else:
+                    embeddings = [vector for _, vector in batch]
+
+                for idx, (doc, _) in enumerate(batch):
+                    items.append(
+                        {
+                            "id": str(uuid.uuid4()),
+                            "text": doc.page_content,
+                            "vector": embeddings[idx],
+                            "metadata": get_item_metadata(doc),
+                        }
+                    )
+
+                    if len(items) >= RAG_INGESTION_INSERT_BATCH_SIZE:
+                        put_items(items)
+                        items = []
+
+                # Queued ingestion jobs report the share of documents embedded
+                if docs and split_progress["docs"]:
+                    INGESTION_QUEUE.report_progress(split_progress["docs"] / len(docs))
+
+            if items:
+                put_items(items)
+        finally:
+            insert_queue.put(None)
+            inserter.join()
+
+        if insert_errors:
+            raise insert_errors[0]
+
+        if chunk_writer:
+            chunk_writer.commit()
 
         return True
     except Exception as e:
         log.exception(e)
+
+        if chunk_writer:
+            chunk_writer.abort()
+
+        # Don't leave a partially saved document behind
+        if inserted_ids:
+            try:
+                VECTOR_DB_CLIENT.delete(
+                    collection_name=collection_name, ids=inserted_ids
+                )
+                BM25_INDEXES.delete(collection_name=collection_name, ids=inserted_ids)
+            except Exception as cleanup_error:
+                log.exception(
+                    f"Error removing partially saved document: {cleanup_error}"
+                )
         raise e
 
 
@@ -1290,6 +1485,7 @@ def process_file(
             try:
                 # /files/{file_id}/data/content/update
                 VECTOR_DB_CLIENT.delete_collection(collection_name=f"file-{file.id}")
+                BM25_INDEXES.delete_collection(collection_name=f"file-{file.id}")
             except:
                 # Audio file upload pipeline
                 pass
@@ -1373,10 +1569,8 @@ def process_file(
                     DOCUMENT_INTELLIGENCE_KEY=request.app.state.config.DOCUMENT_INTELLIGENCE_KEY,
                     MISTRAL_OCR_API_KEY=request.app.state.config.MISTRAL_OCR_API_KEY,
                 )
-                docs = loader.load(
-                    file.filename, file.meta.get("content_type"), file_path
-                )
-
+                # The full text is stored on the file and hashed before it is
+                # embedded, so every page is collected here before splitting
                 docs = [
                     Document(
                         page_content=doc.page_content,
@@ -1388,7 +1582,9 @@ def process_file(
                             "source": file.filename,
                         },
                     )
-                    for doc in docs
+                    for doc in loader.lazy_load(
+                        file.filename, file.meta.get("content_type"), file_path
+                    )
                 ]
             else:
                 docs = [
@@ -1966,13 +2162,9 @@ def query_doc_handler(
 ):
     try:
         if request.app.state.config.ENABLE_RAG_HYBRID_SEARCH:
-            collection_results = {}
-            collection_results[form_data.collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=form_data.collection_name
-            )
             return query_doc_with_hybrid_search(
                 collection_name=form_data.collection_name,
-                collection_result=collection_results[form_data.collection_name],
+                bm25_index=BM25_INDEXES.get(collection_name=form_data.collection_name),
                 query=form_data.query,
                 embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
                     query, prefix=prefix, user=user
@@ -2090,6 +2282,10 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
                 collection_name=form_data.collection_name,
                 metadata={"hash": hash},
             )
+            BM25_INDEXES.delete(
+                collection_name=form_data.collection_name,
+                filter={"hash": hash},
+            )
             return {"status": True}
         else:
             return {"status": False}
@@ -2101,6 +2297,8 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
 @router.post("/reset/db")
 def reset_vector_db(user=Depends(get_admin_user)):
     VECTOR_DB_CLIENT.reset()
+    BM25_INDEXES.reset()
+    CHUNK_STORE.reset()
     Knowledges.delete_all_knowledge()
 
 
@@ -20,9 +20,13 @@ from open_webui.env import (
     WEBSOCKET_REDIS_LOCK_TIMEOUT,
     WEBSOCKET_SENTINEL_PORT,
     WEBSOCKET_SENTINEL_HOSTS,
+    CHAT_EVENT_WRITE_BUFFER_INTERVAL,
+    CHAT_EVENT_WRITE_BUFFER_MAX_SIZE,
+    CHAT_RESPONSE_STREAM_FRAME_INTERVAL,
+    CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL,
 )
 from open_webui.utils.auth import decode_token
-from open_webui.socket.utils import RedisDict, RedisLock
+from open_webui.socket.utils import RedisDict, RedisLock, SessionRegistry
 
 from open_webui.env import (
     GLOBAL_LOG_LEVEL,
@@ -72,13 +76,7 @@ if WEBSOCKET_MANAGER == "redis":
     redis_sentinels = get_sentinels_from_env(
         WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT
     )
-    SESSION_POOL = RedisDict(
-        "open-webui:session_pool",
-        redis_url=WEBSOCKET_REDIS_URL,
-        redis_sentinels=redis_sentinels,
-    )
-    USER_POOL = RedisDict(
-        "open-webui:user_pool",
+    SESSIONS = SessionRegistry(
         redis_url=WEBSOCKET_REDIS_URL,
         redis_sentinels=redis_sentinels,
     )
@@ -98,8 +96,7 @@ if WEBSOCKET_MANAGER == "redis":
     renew_func = clean_up_lock.renew_lock
     release_func = clean_up_lock.release_lock
 else:
-    SESSION_POOL = {}
-    USER_POOL = {}
+    SESSIONS = SessionRegistry()
     USAGE_POOL = {}
     aquire_func = release_func = renew_func = lambda: True
 
@@ -152,46 +149,43 @@ def get_models_in_use():
     return models_in_use
 
 
-def get_active_user_ids():
+async def get_active_user_ids():
     """Get the list of active user IDs."""
-    return list(USER_POOL.keys())
+    return await SESSIONS.get_user_ids()
 
 
-def get_user_active_status(user_id):
+async def get_user_active_status(user_id):
     """Check if a user is currently active."""
-    return user_id in USER_POOL
+    return await SESSIONS.is_user_active(user_id)
 
 
-def get_user_id_from_session_pool(sid):
-    user = SESSION_POOL.get(sid)
+async def get_user_id_from_session_pool(sid):
+    user = await SESSIONS.get_session(sid)
     if user:
         return user["id"]
     return None
 
 
-def get_user_ids_from_room(room):
+async def get_user_ids_from_room(room):
     active_session_ids = sio.manager.get_participants(
         namespace="/",
         room=room,
     )
 
-    active_user_ids = list(
-        set(
-            [SESSION_POOL.get(session_id[0])["id"] for session_id in active_session_ids]
-        )
+    users = await SESSIONS.get_sessions(
+        [session_id[0] for session_id in active_session_ids]
     )
+    active_user_ids = list(set([user["id"] for user in users if user]))
     return active_user_ids
 
 
-def get_active_status_by_user_id(user_id):
-    if user_id in USER_POOL:
-        return True
-    return False
+async def get_active_status_by_user_id(user_id):
+    return await SESSIONS.is_user_active(user_id)
 
 
 @sio.on("usage")
 async def usage(sid, data):
-    if sid in SESSION_POOL:
+    if await SESSIONS.get_session(sid) is not None:
         model_id = data["model"]
         # Record the timestamp for the last update
         current_time = int(time.time())
@@ -210,14 +204,10 @@ async def connect(sid, environ, auth):
         data = decode_token(auth["token"])
 
         if data is not None and "id" in data:
-            user = Users.get_user_by_id(data["id"])
+            user = await Users.get_user_by_id_async(data["id"])
 
         if user:
-            SESSION_POOL[sid] = user.model_dump()
-            if user.id in USER_POOL:
-                USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-            else:
-                USER_POOL[user.id] = [sid]
+            await SESSIONS.add_session(sid, user.model_dump())
 
 
 @sio.on("user-join")
@@ -231,15 +221,11 @@ async def user_join(sid, data):
     if data is None or "id" not in data:
         return
 
-    user = Users.get_user_by_id(data["id"])
+    user = await Users.get_user_by_id_async(data["id"])
     if not user:
         return
 
-    SESSION_POOL[sid] = user.model_dump()
-    if user.id in USER_POOL:
-        USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-    else:
-        USER_POOL[user.id] = [sid]
+    await SESSIONS.add_session(sid, user.model_dump())
 
     # Join all the channels
     channels = Channels.get_channels_by_user_id(user.id)
@@ -259,7 +245,7 @@ async def join_channel(sid, data):
     if data is None or "id" not in data:
         return
 
-    user = Users.get_user_by_id(data["id"])
+    user = await Users.get_user_by_id_async(data["id"])
     if not user:
         return
 
@@ -292,7 +278,9 @@ async def channel_events(sid, data):
                 "channel_id": data["channel_id"],
                 "message_id": data.get("message_id", None),
                 "data": event_data,
-                "user": UserNameResponse(**SESSION_POOL[sid]).model_dump(),
+                "user": UserNameResponse(
+                    **(await SESSIONS.get_session(sid))
+                ).model_dump(),
             },
             room=room,
         )
@@ -300,18 +288,233 @@ async def channel_events(sid, data):
 
 @sio.event
 async def disconnect(sid):
-    if sid in SESSION_POOL:
-        user = SESSION_POOL[sid]
-        del SESSION_POOL[sid]
+    await SESSIONS.remove_session(sid)
+
+
+class ChatEventWriteBuffer:
+    """
+    Write-behind buffer for chat message events, coalesced per message and
+    flushed on an interval, on a size threshold, or explicitly on completion.
+
+    The response task flushes its message when it ends, also when it fails or
+    is cancelled, and all messages are written on a clean shutdown; the
+    interval flush is only a backstop. Buffered events only live in memory,
+    so a worker that is killed outright (SIGKILL, out of memory) loses up to
+    `interval` seconds of them.
+    """
+
+    def __init__(self, interval: float, max_size: int):
+        self.interval = interval
+        self.max_size = max_size
+        self.buffers = {}
+        self.locks = {}
+        # Flushes holding or waiting for each lock, to drop it with the last
+        self.lock_users = {}
+        self.tasks = {}
+
+    def _get_buffer(self, key):
+        if key not in self.buffers:
+            self.buffers[key] = {"content": None, "delta": "", "statuses": []}
+        return self.buffers[key]
+
+    async def add_status(self, chat_id, message_id, status):
+        self._get_buffer((chat_id, message_id))["statuses"].append(status)
+        await self._schedule_flush(chat_id, message_id)
+
+    async def append_content(self, chat_id, message_id, content):
+        buffer = self._get_buffer((chat_id, message_id))
+        buffer["delta"] += content
+        await self._schedule_flush(chat_id, message_id)
+
+    async def replace_content(self, chat_id, message_id, content):
+        buffer = self._get_buffer((chat_id, message_id))
+        buffer["content"] = content
+        buffer["delta"] = ""
+        await self._schedule_flush(chat_id, message_id)
+
+    async def _schedule_flush(self, chat_id, message_id):
+        key = (chat_id, message_id)
+        buffer = self.buffers.get(key)
+
+        if (
+            self.interval <= 0
+            or buffer is None
+            or len(buffer["delta"]) >= self.max_size
+        ):
+            await self.flush(chat_id, message_id)
+            return
+
+        task = self.tasks.get(key)
+        if task is None or task.done():
+            self.tasks[key] = asyncio.create_task(
+                self._delayed_flush(chat_id, message_id)
+            )
+
+    async def _delayed_flush(self, chat_id, message_id):
+        await asyncio.sleep(self.interval)
+
+        # Detach before flushing so an explicit flush won't cancel an in-flight write
+        key = (chat_id, message_id)
+        if self.tasks.get(key) is asyncio.current_task():
+            del self.tasks[key]
+        await self.flush(chat_id, message_id)
+
+    async def flush(self, chat_id, message_id):
+        key = (chat_id, message_id)
+
+        task = self.tasks.pop(key, None)
+        if task and not task.done():
+            task.cancel()
+
+        lock = self.locks.setdefault(key, asyncio.Lock())
+        self.lock_users[key] = self.lock_users.get(key, 0) + 1
+        try:
+            async with lock:
+                buffer = self.buffers.pop(key, None)
+                if buffer:
+                    try:
+                        await asyncio.to_thread(
+                            self._write, chat_id, message_id, buffer
+                        )
+                    except Exception as e:
+                        log.exception(f"Error writing chat events for {key}: {e}")
+        finally:
+            self.lock_users[key] -= 1
+            if self.lock_users[key] == 0:
+                del self.lock_users[key]
+                del self.locks[key]
+
+    async def flush_all(self):
+        for chat_id, message_id in list(self.buffers.keys()):
+            await self.flush(chat_id, message_id)
+
+    def _write(self, chat_id, message_id, buffer):
+        for status in buffer["statuses"]:
+            Chats.add_message_status_to_chat_by_id_and_message_id(
+                chat_id, message_id, status
+            )
+
+        if buffer["content"] is None and not buffer["delta"]:
+            return
+
+        content = buffer["content"]
+        if content is None:
+            message = Chats.get_message_by_id_and_message_id(chat_id, message_id)
+            if not message:
+                return
+            content = message.get("content", "")
+
+        Chats.upsert_message_to_chat_by_id_and_message_id(
+            chat_id,
+            message_id,
+            {
+                "content": content + buffer["delta"],
+            },
+        )
+
+
+CHAT_EVENT_WRITE_BUFFER = ChatEventWriteBuffer(
+    interval=CHAT_EVENT_WRITE_BUFFER_INTERVAL,
+    max_size=CHAT_EVENT_WRITE_BUFFER_MAX_SIZE,
+)
 
-        user_id = user["id"]
-        USER_POOL[user_id] = [_sid for _sid in USER_POOL[user_id] if _sid != sid]
 
-        if len(USER_POOL[user_id]) == 0:
-            del USER_POOL[user_id]
+async def flush_chat_event_writes(chat_id=None, message_id=None):
+    """Write any buffered chat events to the database (all messages if no ids)."""
+    if chat_id and message_id:
+        await CHAT_EVENT_WRITE_BUFFER.flush(chat_id, message_id)
     else:
-        pass
-        # print(f"Unknown session ID {sid} disconnected")
+        await CHAT_EVENT_WRITE_BUFFER.flush_all()
+
+
+class ChatContentStream:
+    """
+    Streams the content of a message being generated as chat:completion
+    events. Updates are coalesced into one event per interval, and each event
+    carries only what changed since the previous one as
+    {"content_delta": {"offset", "text"}}: the client keeps its content up to
+    offset and appends text. Full {"content"} snapshots are sent first and
+    every snapshot_interval seconds, so clients that missed events resync.
+    """
+
+    def __init__(
+        self,
+        event_emitter,
+        get_content,
+        interval: float = CHAT_RESPONSE_STREAM_FRAME_INTERVAL,
+        snapshot_interval: float = CHAT_RESPONSE_STREAM_SNAPSHOT_INTERVAL,
+    ):
+        self.event_emitter = event_emitter
+        self.get_content = get_content
+        self.interval = interval
+        self.snapshot_interval = snapshot_interval
+
+        # Content the client has, None until the first snapshot
+        self.sent = None
+        self.sent_at = 0.0
+        self.snapshot_at = 0.0
+        self.dirty = False
+        self.task = None
+        self.lock = asyncio.Lock()
+
+    async def update(self):
+        """Marks the content as changed, to be sent within the interval."""
+        self.dirty = True
+
+        if self.interval <= 0:
+            await self.flush()
+        elif self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(max(self.sent_at + self.interval - time.monotonic(), 0))
+
+        # Detach before flushing so an explicit flush won't cancel an in-flight emit
+        if self.task is asyncio.current_task():
+            self.task = None
+        await self.flush()
+
+    async def flush(self):
+        """Sends any pending change right away."""
+        if self.task and not self.task.done():
+            self.task.cancel()
+        self.task = None
+
+        # Events must reach the client in order for the offsets to apply
+        async with self.lock:
+            await self._send()
+
+    async def _send(self):
+        if not self.dirty:
+            return
+        self.dirty = False
+
+        content = self.get_content()
+        now = time.monotonic()
+        self.sent_at = now
+
+        if self.sent is None or now - self.snapshot_at >= self.snapshot_interval:
+            data = {"content": content}
+            self.snapshot_at = now
+        else:
+            # Length of the common prefix with what the client has
+            if content.startswith(self.sent):
+                offset = len(self.sent)
+            else:
+                offset, high = 0, min(len(self.sent), len(content))
+                while offset < high:
+                    middle = (offset + high + 1) // 2
+                    if content[:middle] == self.sent[:middle]:
+                        offset = middle
+                    else:
+                        high = middle - 1
+
+            if offset == len(content) == len(self.sent):
+                return
+            data = {"content_delta": {"offset": offset, "text": content[offset:]}}
+
+        self.sent = content
+        await self.event_emitter({"type": "chat:completion", "data": data})
 
 
 def get_event_emitter(request_info, update_db=True):
@@ -320,7 +523,7 @@ def get_event_emitter(request_info, update_db=True):
 
         session_ids = list(
             set(
-                USER_POOL.get(user_id, [])
+                await SESSIONS.get_user_session_ids(user_id)
                 + (
                     [request_info.get("session_id")]
                     if request_info.get("session_id")
@@ -346,39 +549,24 @@ def get_event_emitter(request_info, update_db=True):
 
         if update_db:
             if "type" in event_data and event_data["type"] == "status":
-                Chats.add_message_status_to_chat_by_id_and_message_id(
+                await CHAT_EVENT_WRITE_BUFFER.add_status(
                     request_info["chat_id"],
                     request_info["message_id"],
                     event_data.get("data", {}),
                 )
 
             if "type" in event_data and event_data["type"] == "message":
-                message = Chats.get_message_by_id_and_message_id(
+                await CHAT_EVENT_WRITE_BUFFER.append_content(
                     request_info["chat_id"],
                     request_info["message_id"],
+                    event_data.get("data", {}).get("content", ""),
                 )
 
-                if message:
-                    content = message.get("content", "")
-                    content += event_data.get("data", {}).get("content", "")
-
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        request_info["chat_id"],
-                        request_info["message_id"],
-                        {
-                            "content": content,
-                        },
-                    )
-
             if "type" in event_data and event_data["type"] == "replace":
-                content = event_data.get("data", {}).get("content", "")
-
-                Chats.upsert_message_to_chat_by_id_and_message_id(
+                await CHAT_EVENT_WRITE_BUFFER.replace_content(
                     request_info["chat_id"],
                     request_info["message_id"],
-                    {
-                        "content": content,
-                    },
+                    event_data.get("data", {}).get("content", ""),
                 )
 
     return __event_emitter__
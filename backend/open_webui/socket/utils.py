@@ -1,4 +1,5 @@
 import json
+import time
 import uuid
 from open_webui.utils.redis import get_redis_connection
 
@@ -89,3 +90,120 @@ class RedisDict:
         if key not in self:
             self[key] = default
         return self[key]
+
+
+class SessionRegistry:
+    """
+    Tracks socket sessions and the sessions of each user.
+
+    With Redis, sessions live in a hash and each user's session ids in their
+    own set, so joins and disconnects are single SADD/SREM round-trips instead
+    of read-modify-write of JSON lists. All operations are async, and session
+    id lookups are cached locally for a short time since they run for every
+    emitted chat event.
+    """
+
+    # Seconds a looked-up user's session ids are served from memory
+    LOCAL_CACHE_TTL = 1.0
+
+    # Drop the user's set and active flag once their last session is removed
+    REMOVE_SESSION_SCRIPT = """
+    redis.call("SREM", KEYS[1], ARGV[1])
+    if redis.call("SCARD", KEYS[1]) == 0 then
+        redis.call("SREM", KEYS[2], ARGV[2])
+    end
+    """
+
+    def __init__(self, prefix="open-webui", redis_url=None, redis_sentinels=[]):
+        self.redis = None
+        if redis_url:
+            self.redis = get_redis_connection(
+                redis_url, redis_sentinels, async_mode=True, decode_responses=True
+            )
+            self.remove_session_script = self.redis.register_script(
+                self.REMOVE_SESSION_SCRIPT
+            )
+
+        self.session_key = f"{prefix}:session_pool"
+        self.users_key = f"{prefix}:active_users"
+        self.user_sessions_prefix = f"{prefix}:user_sessions"
+
+        # Local state without Redis, and the lookup cache with it
+        self.sessions = {}
+        self.user_sessions = {}
+        self.cache = {}
+
+    def _get_user_sessions_key(self, user_id):
+        return f"{self.user_sessions_prefix}:{user_id}"
+
+    async def add_session(self, sid, user):
+        user_id = user["id"]
+        self.cache.pop(user_id, None)
+
+        if self.redis:
+            pipe = self.redis.pipeline()
+            pipe.hset(self.session_key, sid, json.dumps(user))
+            pipe.sadd(self._get_user_sessions_key(user_id), sid)
+            pipe.sadd(self.users_key, user_id)
+            await pipe.execute()
+        else:
+            self.sessions[sid] = user
+            self.user_sessions.setdefault(user_id, set()).add(sid)
+
+    async def remove_session(self, sid):
+        user = await self.get_session(sid)
+        if user is None:
+            return None
+
+        user_id = user["id"]
+        self.cache.pop(user_id, None)
+
+        if self.redis:
+            await self.redis.hdel(self.session_key, sid)
+            await self.remove_session_script(
+                keys=[self._get_user_sessions_key(user_id), self.users_key],
+                args=[sid, user_id],
+            )
+        else:
+            self.sessions.pop(sid, None)
+            sids = self.user_sessions.get(user_id, set())
+            sids.discard(sid)
+            if not sids:
+                self.user_sessions.pop(user_id, None)
+        return user
+
+    async def get_session(self, sid):
+        if self.redis:
+            value = await self.redis.hget(self.session_key, sid)
+            return json.loads(value) if value is not None else None
+        return self.sessions.get(sid)
+
+    async def get_sessions(self, sids):
+        if not sids:
+            return []
+        if self.redis:
+            values = await self.redis.hmget(self.session_key, sids)
+            return [json.loads(value) if value else None for value in values]
+        return [self.sessions.get(sid) for sid in sids]
+
+    async def get_user_session_ids(self, user_id):
+        if not self.redis:
+            return list(self.user_sessions.get(user_id, []))
+
+        cached = self.cache.get(user_id)
+        if cached and time.monotonic() - cached[0] < self.LOCAL_CACHE_TTL:
+            return cached[1]
+
+        sids = list(await self.redis.smembers(self._get_user_sessions_key(user_id)))
+        self.cache[user_id] = (time.monotonic(), sids)
+        return sids
+
+    async def get_user_ids(self):
+        if self.redis:
+            return list(await self.redis.smembers(self.users_key))
+        return list(self.user_sessions.keys())
+
+    async def is_user_active(self, user_id):
+        if self.redis:
+            return bool(await self.redis.sismember(self.users_key, user_id))
+        return user_id in self.user_sessions
@@ -0,0 +1,122 @@
+import asyncio
+import time
+import uuid
+
+from open_webui.internal.db import get_async_database_config
+
+
+def test_sqlite_uses_aiosqlite():
+    assert get_async_database_config("sqlite:///data/webui.db") == (
+        "sqlite+aiosqlite:///data/webui.db",
+        {},
+    )
+
+
+def test_unsupported_database_has_no_async_driver():
+    assert get_async_database_config("mysql://user:pw@localhost/webui") is None
+
+
+def test_libpq_parameters_are_translated_for_asyncpg():
+    url, connect_args = get_async_database_config(
+        "postgresql://user:p%40ss@db:5432/webui"
+        "?sslmode=require&connect_timeout=10&application_name=open-webui"
+        "&options=-c%20search_path%3Dapp%20-c%20statement_timeout%3D5000"
+    )
+    assert url == "postgresql+asyncpg://user:p%40ss@db:5432/webui"
+    assert connect_args == {
+        "ssl": "require",
+        "timeout": 10.0,
+        "server_settings": {
+            "application_name": "open-webui",
+            "search_path": "app",
+            "statement_timeout": "5000",
+        },
+    }
+
+
+def test_unknown_libpq_parameters_are_dropped():
+    url, connect_args = get_async_database_config(
+        "postgresql://user@db/webui?target_session_attrs=read-write&host=/run/pg"
+    )
+    assert url == "postgresql+asyncpg://user@db/webui?host=%2Frun%2Fpg"
+    assert connect_args == {}
+
+
+def benchmark(streams: int = 50, tokens: int = 200, write_every: int = 10):
+    """
+    Streams chat completions concurrently, each saving its message every
+    write_every tokens, once with the blocking table methods called on the
+    event loop and once with the *_async methods. Tokens arrive every 5ms per
+    stream. Run against the configured DATABASE_URL with
+    `python -m open_webui.test.apps.webui.internal.test_db`.
+    """
+    from open_webui.internal import db
+    from open_webui.models.chats import ChatForm, Chats
+
+    async def stream(chat_id: str, message_id: str, use_async: bool) -> int:
+        content = ""
+        for token in range(tokens):
+            await asyncio.sleep(0.005)
+            content += f"token{token} "
+            if token % write_every == 0:
+                message = {"role": "assistant", "content": content}
+                if use_async:
+                    await Chats.upsert_message_to_chat_by_id_and_message_id_async(
+                        chat_id, message_id, message
+                    )
+                else:
+                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                        chat_id, message_id, message
+                    )
+        return tokens
+
+    async def measure_lag(stop: asyncio.Event) -> float:
+        lag = 0.0
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag = max(lag, time.perf_counter() - start - 0.001)
+        return lag
+
+    async def run(use_async: bool) -> tuple[float, float]:
+        chat_ids = [
+            Chats.insert_new_chat(
+                str(uuid.uuid4()), ChatForm(chat={"title": "Benchmark"})
+            ).id
+            for _ in range(streams)
+        ]
+
+        stop = asyncio.Event()
+        lag = asyncio.create_task(measure_lag(stop))
+        start = time.perf_counter()
+        total = sum(
+            await asyncio.gather(
+                *[stream(chat_id, str(uuid.uuid4()), use_async) for chat_id in chat_ids]
+            )
+        )
+        elapsed = time.perf_counter() - start
+        stop.set()
+
+        for chat_id in chat_ids:
+            Chats.delete_chat_by_id(chat_id)
+        return total / elapsed, await lag
+
+    async def main():
+        # One event loop, as async engine connections belong to the loop
+        for name, use_async in [("blocking", False), ("async", True)]:
+            throughput, lag = await run(use_async)
+            print(
+                f"{name}: {streams} streams, {throughput:.0f} tokens/s, max event loop lag {lag * 1000:.1f}ms"
+            )
+
+        if db.async_engine is not None:
+            print(f"async driver: {db.async_engine.url.drivername}")
+            await db.async_engine.dispose()
+        else:
+            print("async driver: none, async methods ran in threads")
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,156 @@
+import asyncio
+import random
+
+from open_webui.socket.main import ChatContentStream
+
+
+class Client:
+    """Applies chat:completion events the way the chat page does."""
+
+    def __init__(self):
+        self.content = None
+        self.events = []
+
+    async def __call__(self, event):
+        assert event["type"] == "chat:completion"
+        data = event["data"]
+        self.events.append(data)
+
+        if "content" in data:
+            self.content = data["content"]
+        else:
+            delta = data["content_delta"]
+            assert self.content is not None
+            assert delta["offset"] <= len(self.content)
+            self.content = self.content[: delta["offset"]] + delta["text"]
+
+
+def test_first_event_is_a_snapshot_then_deltas():
+    async def run():
+        client = Client()
+        content = {"value": "Hello"}
+        stream = ChatContentStream(
+            client, lambda: content["value"], interval=0, snapshot_interval=60
+        )
+
+        await stream.update()
+        content["value"] = "Hello, world"
+        await stream.update()
+
+        return client
+
+    client = asyncio.run(run())
+    assert client.events == [
+        {"content": "Hello"},
+        {"content_delta": {"offset": 5, "text": ", world"}},
+    ]
+    assert client.content == "Hello, world"
+
+
+def test_rewritten_content_resumes_from_common_prefix():
+    async def run():
+        client = Client()
+        content = {"value": "<details>running</details>"}
+        stream = ChatContentStream(
+            client, lambda: content["value"], interval=0, snapshot_interval=60
+        )
+
+        await stream.update()
+        content["value"] = "<details>done</details>\nresult"
+        await stream.update()
+
+        return client
+
+    client = asyncio.run(run())
+    assert client.events[-1] == {
+        "content_delta": {"offset": 9, "text": "done</details>\nresult"}
+    }
+    assert client.content == "<details>done</details>\nresult"
+
+
+def test_client_follows_random_edits():
+    async def run():
+        rng = random.Random(0)
+        client = Client()
+        content = {"value": ""}
+        stream = ChatContentStream(
+            client, lambda: content["value"], interval=0, snapshot_interval=60
+        )
+
+        for _ in range(500):
+            value = content["value"]
+            if value and rng.random() < 0.2:
+                # Rewrite part of what was already sent
+                cut = rng.randint(0, len(value))
+                value = value[:cut] + rng.choice(["x", "yz", ""])
+            content["value"] = value + "".join(
+                rng.choice("abc <>") for _ in range(rng.randint(0, 3))
+            )
+            await stream.update()
+            assert client.content == content["value"]
+
+        return client
+
+    client = asyncio.run(run())
+    assert sum("content" in event for event in client.events) == 1
+
+
+def test_updates_are_coalesced_within_the_interval():
+    async def run():
+        client = Client()
+        content = {"value": ""}
+        stream = ChatContentStream(
+            client, lambda: content["value"], interval=0.05, snapshot_interval=60
+        )
+
+        for token in ["a", "b", "c", "d"]:
+            content["value"] += token
+            await stream.update()
+        await asyncio.sleep(0.1)
+
+        content["value"] += "e"
+        await stream.update()
+        await stream.flush()
+
+        return client
+
+    client = asyncio.run(run())
+    assert client.events == [
+        {"content": "abcd"},
+        {"content_delta": {"offset": 4, "text": "e"}},
+    ]
+
+
+def test_unchanged_content_sends_nothing():
+    async def run():
+        client = Client()
+        stream = ChatContentStream(
+            client, lambda: "same", interval=0, snapshot_interval=60
+        )
+
+        await stream.update()
+        await stream.update()
+        await stream.flush()
+
+        return client
+
+    client = asyncio.run(run())
+    assert client.events == [{"content": "same"}]
+
+
+def test_snapshots_are_resent_after_the_snapshot_interval():
+    async def run():
+        client = Client()
+        content = {"value": "a"}
+        stream = ChatContentStream(
+            client, lambda: content["value"], interval=0, snapshot_interval=0
+        )
+
+        await stream.update()
+        content["value"] = "ab"
+        await stream.update()
+
+        return client
+
+    client = asyncio.run(run())
+    assert client.events == [{"content": "a"}, {"content": "ab"}]
@@ -0,0 +1,261 @@
+import random
+import re
+import time
+
+import pytest
+
+from open_webui.utils.content_tags import ContentTagParser
+
+
+REASONING_TAGS = [
+    ("think", "/think"),
+    ("thinking", "/thinking"),
+    ("reason", "/reason"),
+    ("reasoning", "/reasoning"),
+    ("thought", "/thought"),
+    ("Thought", "/Thought"),
+    ("|begin_of_thought|", "|end_of_thought|"),
+]
+CODE_INTERPRETER_TAGS = [("code_interpreter", "/code_interpreter")]
+SOLUTION_TAGS = [("|begin_of_solution|", "|end_of_solution|")]
+
+TAG_GROUPS = [
+    ("reasoning", REASONING_TAGS),
+    ("code_interpreter", CODE_INTERPRETER_TAGS),
+    ("solution", SOLUTION_TAGS),
+]
+
+SAMPLE_RESPONSES = [
+    "<think>let me think\nabout it</think>The answer is 42.",
+    "Hi <reasoning>r</reasoning> there",
+    '<think foo="bar">x</think>y<code_interpreter type="code" lang="python">print(1)</code_interpreter>after',
+    "a < b and <thi nope> <|begin_of_solution|>sol<|end_of_solution|> end",
+    "<thinking>deep</thinking>\n\nok",
+    "<think></think>empty reasoning",
+]
+
+
+def legacy_tag_content_handler(content_type, tags, content, content_blocks):
+    """
+    The regex handler ContentTagParser replaced, which re-scanned the whole
+    content on every delta. Kept as the reference the parser must agree with.
+    """
+    end_flag = False
+
+    def extract_attributes(tag_content):
+        attributes = {}
+        if not tag_content:
+            return attributes
+        for key, value in re.findall(r'(\w+)\s*=\s*"([^"]+)"', tag_content):
+            attributes[key] = value
+        return attributes
+
+    if content_blocks[-1]["type"] == "text":
+        for start_tag, end_tag in tags:
+            start_tag_pattern = rf"<{re.escape(start_tag)}(\s.*?)?>"
+            match = re.search(start_tag_pattern, content)
+            if match:
+                attributes = extract_attributes(match.group(1) or "")
+
+                before_tag = content[: match.start()]
+                after_tag = content[match.end() :]
+
+                content_blocks[-1]["content"] = content_blocks[-1]["content"].replace(
+                    match.group(0) + after_tag, ""
+                )
+
+                if before_tag:
+                    content_blocks[-1]["content"] = before_tag
+
+                if not content_blocks[-1]["content"]:
+                    content_blocks.pop()
+
+                content_blocks.append(
+                    {
+                        "type": content_type,
+                        "start_tag": start_tag,
+                        "end_tag": end_tag,
+                        "attributes": attributes,
+                        "content": "",
+                        "started_at": time.time(),
+                    }
+                )
+
+                if after_tag:
+                    content_blocks[-1]["content"] = after_tag
+                    legacy_tag_content_handler(
+                        content_type, tags, after_tag, content_blocks
+                    )
+
+                break
+    elif content_blocks[-1]["type"] == content_type:
+        start_tag = content_blocks[-1]["start_tag"]
+        end_tag = content_blocks[-1]["end_tag"]
+        end_tag_pattern = rf"<{re.escape(end_tag)}>"
+
+        if re.search(end_tag_pattern, content):
+            end_flag = True
+
+            block_content = re.sub(
+                rf"<{re.escape(start_tag)}(.*?)>", "", content_blocks[-1]["content"]
+            ).strip()
+            split_content = re.compile(end_tag_pattern, re.DOTALL).split(
+                block_content, maxsplit=1
+            )
+
+            block_content = split_content[0].strip() if split_content else ""
+            leftover_content = (
+                split_content[1].strip() if len(split_content) > 1 else ""
+            )
+
+            if block_content:
+                content_blocks[-1]["content"] = block_content
+                content_blocks[-1]["ended_at"] = time.time()
+                content_blocks[-1]["duration"] = int(
+                    content_blocks[-1]["ended_at"] - content_blocks[-1]["started_at"]
+                )
+
+                if content_type != "code_interpreter":
+                    content_blocks.append({"type": "text", "content": leftover_content})
+            else:
+                content_blocks.pop()
+                content_blocks.append({"type": "text", "content": leftover_content})
+
+            content = re.sub(
+                rf"<{re.escape(start_tag)}(.*?)>(.|\n)*?<{re.escape(end_tag)}>",
+                "",
+                content,
+                flags=re.DOTALL,
+            )
+
+    return content, content_blocks, end_flag
+
+
+def run_legacy(deltas: list[str]) -> list[dict]:
+    content = ""
+    content_blocks = [{"type": "text", "content": ""}]
+    for delta in deltas:
+        content += delta
+        content_blocks[-1]["content"] += delta
+
+        for content_type, tags in TAG_GROUPS:
+            content, content_blocks, end = legacy_tag_content_handler(
+                content_type, tags, content, content_blocks
+            )
+            if end and content_type == "code_interpreter":
+                return content_blocks
+    return content_blocks
+
+
+def run_parser(deltas: list[str]) -> list[dict]:
+    content_blocks = [{"type": "text", "content": ""}]
+    parser = ContentTagParser(content_blocks, TAG_GROUPS)
+    for delta in deltas:
+        content_blocks[-1]["content"] += delta
+        if parser.parse() == "code_interpreter":
+            break
+    return content_blocks
+
+
+def summarize(content_blocks: list[dict]) -> list[tuple]:
+    return [
+        (block["type"], block["content"], block.get("attributes"))
+        for block in content_blocks
+    ]
+
+
+def split_randomly(text: str, rng: random.Random, max_size: int) -> list[str]:
+    deltas = []
+    index = 0
+    while index < len(text):
+        size = rng.randint(1, max_size)
+        deltas.append(text[index : index + size])
+        index += size
+    return deltas
+
+
+@pytest.mark.parametrize("text", SAMPLE_RESPONSES)
+def test_matches_legacy_handler_under_random_chunking(text):
+    # Deltas shorter than any tag never open and close a tag at once, where
+    # the legacy handler duplicated blocks
+    rng = random.Random(0)
+    for _ in range(200):
+        deltas = split_randomly(text, rng, 3)
+        assert summarize(run_parser(deltas)) == summarize(run_legacy(deltas))
+
+
+def test_start_tag_split_across_deltas():
+    content_blocks = run_parser(["ok <th", "ink", ">abc</th", "ink>done"])
+    assert summarize(content_blocks) == [
+        ("text", "ok ", None),
+        ("reasoning", "abc", {}),
+        ("text", "done", None),
+    ]
+
+
+def test_partial_start_tag_that_is_not_a_tag_stays_text():
+    content_blocks = run_parser(["a <thi", "s is text"])
+    assert summarize(content_blocks) == [("text", "a <this is text", None)]
+
+
+def test_tag_opened_and_closed_in_one_delta():
+    content_blocks = run_parser(
+        ["Before <think>quick</think>after", " and <reason>more</reason>end"]
+    )
+    assert summarize(content_blocks) == [
+        ("text", "Before ", None),
+        ("reasoning", "quick", {}),
+        ("text", "after and ", None),
+        ("reasoning", "more", {}),
+        ("text", "end", None),
+    ]
+
+
+def test_code_interpreter_stops_parsing():
+    text = '<think>plan</think><code_interpreter type="code" lang="python">print(1)</code_interpreter>ignored'
+    rng = random.Random(1)
+    for _ in range(50):
+        content_blocks = run_parser(split_randomly(text, rng, 3))
+        assert summarize(content_blocks) == [
+            ("reasoning", "plan", {}),
+            (
+                "code_interpreter",
+                "print(1)",
+                {"type": "code", "lang": "python"},
+            ),
+        ]
+
+
+def test_remove_tagged_content():
+    parser = ContentTagParser([], TAG_GROUPS)
+    assert (
+        parser.remove_tagged_content("<think>a\nb</think>Answer <reason>c</reason>!")
+        == "Answer !"
+    )
+
+
+def benchmark(length: int = 4000, delta_size: int = 4):
+    """
+    Times a long reasoning trace streamed in small deltas through the parser
+    and the legacy handler. Run with
+    `python -m open_webui.test.apps.webui.utils.test_content_tags`.
+    """
+    trace = (
+        "<think>"
+        + "".join(
+            f"step {i}: consider x<{i} and more words here. " for i in range(length)
+        )
+        + "</think>Final answer."
+    )
+    deltas = [trace[i : i + delta_size] for i in range(0, len(trace), delta_size)]
+
+    for name, run in [("parser", run_parser), ("legacy", run_legacy)]:
+        start = time.perf_counter()
+        run(deltas)
+        print(
+            f"{name}: {len(trace)} characters in {len(deltas)} deltas, {time.perf_counter() - start:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,72 @@
+import asyncio
+
+from open_webui.utils.tools import execute_tool_calls
+
+
+def test_results_are_in_call_order():
+    async def run():
+        completed = []
+
+        async def execute(tool_call):
+            await asyncio.sleep(tool_call["delay"])
+            return tool_call["name"]
+
+        async def on_complete(index, result):
+            completed.append((index, result))
+
+        tool_calls = [
+            {"name": "slow", "delay": 0.05},
+            {"name": "fast", "delay": 0},
+            {"name": "medium", "delay": 0.02},
+        ]
+        results = await execute_tool_calls(
+            tool_calls, execute, on_complete, max_concurrency=0, timeout=None
+        )
+        return results, completed
+
+    results, completed = asyncio.run(run())
+    assert results == ["slow", "fast", "medium"]
+    assert completed == [(1, "fast"), (2, "medium"), (0, "slow")]
+
+
+def test_timeout_and_errors_become_results():
+    async def run():
+        async def execute(tool_call):
+            if tool_call == "hang":
+                await asyncio.sleep(10)
+            if tool_call == "fail":
+                raise ValueError("tool failed")
+            return "ok"
+
+        return await execute_tool_calls(
+            ["hang", "fail", "ok"], execute, max_concurrency=0, timeout=0.05
+        )
+
+    assert asyncio.run(run()) == [
+        "Tool call timed out after 0.05 seconds",
+        "tool failed",
+        "ok",
+    ]
+
+
+def test_concurrency_is_capped():
+    async def run():
+        running = 0
+        peak = 0
+
+        async def execute(tool_call):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return tool_call
+
+        results = await execute_tool_calls(
+            list(range(6)), execute, max_concurrency=2, timeout=None
+        )
+        return results, peak
+
+    results, peak = asyncio.run(run())
+    assert results == list(range(6))
+    assert peak == 2
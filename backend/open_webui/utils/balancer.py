@@ -0,0 +1,206 @@
+import logging
+import random
+import time
+import uuid
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    UPSTREAM_LOAD_BALANCING_STRATEGY,
+    UPSTREAM_HEALTH_CHECK_MAX_FAILURES,
+    UPSTREAM_HEALTH_CHECK_COOLDOWN,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class UpstreamBalancer:
+    """
+    Picks one of several upstream base URLs serving the same model.
+
+    Every request holds a lease on its URL until it is released (in Redis
+    when available so all workers see the same load). Leases expire on their
+    own, so requests whose release never runs stop counting as in flight.
+    Time to first byte is tracked as an exponentially weighted moving
+    average, and URLs that fail repeatedly are ejected for a cooldown period.
+    """
+
+    # Smoothing factor for the latency moving average
+    EWMA_ALPHA = 0.3
+
+    # Seconds before a lease that was never released stops counting
+    LEASE_TTL = 300
+
+    def __init__(
+        self,
+        name: str,
+        strategy: str = UPSTREAM_LOAD_BALANCING_STRATEGY,
+        redis_url: Optional[str] = None,
+        redis_sentinels: Optional[list] = [],
+    ):
+        self.name = name
+        self.strategy = strategy
+
+        self.leases: dict[str, dict[str, float]] = {}
+        self.latency: dict[str, float] = {}
+        self.failures: dict[str, int] = {}
+        self.ejected_until: dict[str, float] = {}
+
+        self.redis = None
+        self.redis_key = f"open-webui:upstream:{name}:in_flight"
+        if redis_url:
+            try:
+                self.redis = get_redis_connection(
+                    redis_url, redis_sentinels, async_mode=True
+                )
+            except Exception as e:
+                log.warning(f"Upstream balancer {name} using local counts only: {e}")
+
+    def _get_lease_key(self, url: str) -> str:
+        return f"{self.redis_key}:{url}"
+
+    def _get_local_in_flight(self, url: str) -> int:
+        now = time.time()
+        leases = self.leases.get(url, {})
+        for lease in [lease for lease, expires in leases.items() if expires <= now]:
+            del leases[lease]
+        return len(leases)
+
+    async def _get_in_flight(self, urls: list[str]) -> list[int]:
+        if self.redis:
+            try:
+                pipe = self.redis.pipeline()
+                for url in urls:
+                    pipe.zcount(self._get_lease_key(url), time.time(), "+inf")
+                return [int(value or 0) for value in await pipe.execute()]
+            except Exception as e:
+                log.debug(f"Upstream balancer Redis read failed: {e}")
+        return [self._get_local_in_flight(url) for url in urls]
+
+    async def select(self, urls: list[str]) -> int:
+        """
+        Returns the index into urls of the upstream to send the request to.
+        """
+        if len(urls) <= 1:
+            return 0
+
+        now = time.monotonic()
+        candidates = [
+            i for i, url in enumerate(urls) if self.ejected_until.get(url, 0) <= now
+        ]
+        # Everything is ejected, fall back to trying all of them
+        if not candidates:
+            candidates = list(range(len(urls)))
+
+        if self.strategy == "random":
+            return random.choice(candidates)
+
+        in_flight = await self._get_in_flight([urls[i] for i in candidates])
+
+        if self.strategy == "ewma":
+            # Unmeasured upstreams score as fast so they get probed
+            scores = [
+                self.latency.get(urls[i], 0.0) * (count + 1)
+                for i, count in zip(candidates, in_flight)
+            ]
+        else:
+            scores = in_flight
+
+        best = min(scores)
+        return random.choice(
+            [i for i, score in zip(candidates, scores) if score == best]
+        )
+
+    async def acquire(self, url: str) -> str:
+        """
+        Counts a request against url and returns its lease id.
+        """
+        lease = str(uuid.uuid4())
+        expires = time.time() + self.LEASE_TTL
+
+        self._get_local_in_flight(url)
+        self.leases.setdefault(url, {})[lease] = expires
+        if self.redis:
+            try:
+                key = self._get_lease_key(url)
+                pipe = self.redis.pipeline()
+                pipe.zremrangebyscore(key, "-inf", time.time())
+                pipe.zadd(key, {lease: expires})
+                pipe.expire(key, self.LEASE_TTL)
+                await pipe.execute()
+            except Exception as e:
+                log.debug(f"Upstream balancer Redis write failed: {e}")
+        return lease
+
+    async def release(self, url: str, lease: str, error: bool = False):
+        self.leases.get(url, {}).pop(lease, None)
+        if self.redis:
+            try:
+                await self.redis.zrem(self._get_lease_key(url), lease)
+            except Exception as e:
+                log.debug(f"Upstream balancer Redis write failed: {e}")
+
+        if error:
+            self.failures[url] = self.failures.get(url, 0) + 1
+            if self.failures[url] >= UPSTREAM_HEALTH_CHECK_MAX_FAILURES:
+                log.warning(
+                    f"Ejecting {self.name} upstream {url} for {UPSTREAM_HEALTH_CHECK_COOLDOWN}s after {self.failures[url]} failures"
+                )
+                self.ejected_until[url] = (
+                    time.monotonic() + UPSTREAM_HEALTH_CHECK_COOLDOWN
+                )
+                self.failures[url] = 0
+            return
+
+        self.failures[url] = 0
+        self.ejected_until.pop(url, None)
+
+    def record_latency(self, url: str, elapsed: float):
+        """
+        Records the time to first byte of a request to url.
+        """
+        latency = self.latency.get(url)
+        self.latency[url] = (
+            elapsed
+            if latency is None
+            else self.EWMA_ALPHA * elapsed + (1 - self.EWMA_ALPHA) * latency
+        )
+
+    async def track_stream(
+        self,
+        url: str,
+        stream: AsyncIterator[bytes],
+        start: float,
+        release: Callable[[], Awaitable[None]],
+    ) -> AsyncIterator[bytes]:
+        """
+        Yields stream, recording the time to its first chunk, and releases the
+        request however the stream ends, including client disconnects.
+        """
+        try:
+            first = True
+            async for chunk in stream:
+                if first:
+                    first = False
+                    self.record_latency(url, time.monotonic() - start)
+                yield chunk
+        finally:
+            await release()
+
+
+OLLAMA_BALANCER = UpstreamBalancer(
+    "ollama",
+    redis_url=REDIS_URL,
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+)
+
+OPENAI_BALANCER = UpstreamBalancer(
+    "openai",
+    redis_url=REDIS_URL,
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+)
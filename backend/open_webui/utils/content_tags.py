@@ -0,0 +1,180 @@
+import re
+import time
+from typing import Optional
+
+
+class ContentTagParser:
+    """
+    Splits streamed message content into blocks at tags such as
+    <think>...</think>, for the content block list of a streamed response.
+
+    Call parse() after appending each delta to the last block. Only the new
+    text is scanned, and a tag cut off at the end of a delta is kept pending
+    until the next one, so the total work is linear in the response length.
+
+    tag_groups is a list of (block type, [(start tag, end tag), ...]); an
+    opening tag starts a block of its group's type and the block's matching
+    closing tag ends it.
+    """
+
+    def __init__(self, content_blocks: list[dict], tag_groups: list[tuple]):
+        self.content_blocks = content_blocks
+        self.tags = [
+            (
+                content_type,
+                start_tag,
+                end_tag,
+                # e.g. <tag> or <tag attr="value">, on a single line
+                re.compile(rf"<{re.escape(start_tag)}(\s.*?)?>"),
+                # A start tag cut off before its closing ">"
+                re.compile(rf"<{re.escape(start_tag)}(\s[^\n>]*)?"),
+            )
+            for content_type, tags in tag_groups
+            for start_tag, end_tag in tags
+        ]
+
+        # The block being scanned and the offset in its content up to which
+        # it has been scanned
+        self.block = None
+        self.position = 0
+
+    @staticmethod
+    def extract_attributes(tag_content: str) -> dict:
+        """Extract attributes from a tag if they exist."""
+        attributes = {}
+        if not tag_content:
+            return attributes
+        # Match attributes in the format: key="value" (ignores single quotes for simplicity)
+        for key, value in re.findall(r'(\w+)\s*=\s*"([^"]+)"', tag_content):
+            attributes[key] = value
+        return attributes
+
+    def _is_partial_start_tag(self, content: str, index: int) -> bool:
+        rest = content[index:]
+        for _, start_tag, _, _, partial_pattern in self.tags:
+            if f"<{start_tag}".startswith(rest) or partial_pattern.fullmatch(rest):
+                return True
+        return False
+
+    def _find_start_tag(self, content: str) -> Optional[tuple]:
+        while True:
+            index = content.find("<", self.position)
+            if index == -1:
+                self.position = len(content)
+                return None
+
+            for tag in self.tags:
+                match = tag[3].match(content, index)
+                if match:
+                    return tag, match
+
+            if self._is_partial_start_tag(content, index):
+                # Wait for the rest of the tag
+                self.position = index
+                return None
+            self.position = index + 1
+
+    def _open_block(self, tag: tuple, match: re.Match):
+        content_type, start_tag, end_tag, _, _ = tag
+        text_block = self.content_blocks[-1]
+        content = text_block["content"]
+
+        text_block["content"] = content[: match.start()]
+        if not text_block["content"]:
+            self.content_blocks.pop()
+
+        self.content_blocks.append(
+            {
+                "type": content_type,
+                "start_tag": start_tag,
+                "end_tag": end_tag,
+                "attributes": self.extract_attributes(match.group(1) or ""),
+                "content": content[match.end() :],
+                "started_at": time.time(),
+            }
+        )
+
+    def _close_block(self) -> bool:
+        """
+        Ends the last block at its closing tag, continuing with a text block
+        for what follows unless the block is code to execute.
+        """
+        block = self.content_blocks[-1]
+        start_tag = block["start_tag"]
+        end_tag = block["end_tag"]
+
+        # Strip start and end tags from the content
+        block_content = re.sub(
+            rf"<{re.escape(start_tag)}(.*?)>", "", block["content"]
+        ).strip()
+        split_content = block_content.split(f"<{end_tag}>", 1)
+
+        # Content inside the tag
+        block_content = split_content[0].strip()
+        # Leftover content (everything after `</tag>`)
+        leftover_content = split_content[1].strip() if len(split_content) > 1 else ""
+
+        if block_content:
+            block["content"] = block_content
+            block["ended_at"] = time.time()
+            block["duration"] = int(block["ended_at"] - block["started_at"])
+
+            if block["type"] == "code_interpreter":
+                return False
+        else:
+            # Remove the block if content is empty
+            self.content_blocks.pop()
+
+        self.content_blocks.append({"type": "text", "content": leftover_content})
+        return True
+
+    def parse(self) -> Optional[str]:
+        """
+        Scans what was appended to the last content block since the previous
+        call. Returns the type of the last block closed in this call, if any.
+        """
+        ended = None
+
+        while self.content_blocks:
+            block = self.content_blocks[-1]
+            if block is not self.block:
+                self.block = block
+                self.position = 0
+
+            content = block["content"]
+            if not isinstance(content, str):
+                break
+
+            if block["type"] == "text":
+                found = self._find_start_tag(content)
+                if found is None:
+                    break
+                self._open_block(*found)
+            elif (
+                any(block["type"] == tag[0] for tag in self.tags)
+                and block.get("attributes", {}).get("type") != "reasoning_content"
+            ):
+                end_tag = f"<{block['end_tag']}>"
+                index = content.find(end_tag, max(self.position - len(end_tag) + 1, 0))
+                if index == -1:
+                    self.position = len(content)
+                    break
+
+                ended = block["type"]
+                if not self._close_block():
+                    break
+            else:
+                break
+
+        return ended
+
+    def remove_tagged_content(self, content: str) -> str:
+        """Removes the closed tagged blocks from the raw content."""
+        for _, start_tag, end_tag, _, _ in self.tags:
+            content = re.sub(
+                rf"<{re.escape(start_tag)}(.*?)>.*?<{re.escape(end_tag)}>",
+                "",
+                content,
+                flags=re.DOTALL,
+            )
+        return content
@@ -82,7 +82,7 @@ async def process_filter_functions(
 
         # Apply valves to the function
         if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
-            valves = Functions.get_function_valves_by_id(filter_id)
+            valves = await Functions.get_function_valves_by_id_async(filter_id)
             function_module.valves = function_module.Valves(
                 **(valves if valves else {})
             )
@@ -109,7 +109,7 @@ async def process_filter_functions(
                 if hasattr(function_module, "UserValves"):
                     try:
                         params["__user__"]["valves"] = function_module.UserValves(
-                            **Functions.get_user_valves_by_id_and_user_id(
+                            **await Functions.get_user_valves_by_id_and_user_id_async(
                                 filter_id, params["__user__"]["id"]
                             )
                         )
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import time
+from typing import Any
+from urllib.parse import urlparse
+
+import aiohttp
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    AIOHTTP_CLIENT_POOL_LIMIT,
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+    AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT,
+    AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class ClientSessionPool:
+    """
+    Application-lifetime aiohttp sessions, one per upstream origin.
+
+    Sessions keep connections alive between requests so chat turns to the
+    same Ollama/OpenAI server skip TCP/TLS setup. Connection activity is
+    counted per origin through aiohttp tracing so pool saturation (requests
+    queued waiting for a free connection) can be observed.
+
+    A session is bound to the event loop that created it, so each loop gets
+    its own, closed when the loop shuts down.
+
+    Requests time out after aiohttp's default 300 seconds unless they pass
+    their own timeout, like chat completions with AIOHTTP_CLIENT_TIMEOUT.
+    """
+
+    def __init__(self):
+        # (origin, loop) -> session
+        self.sessions: dict[
+            tuple[str, asyncio.AbstractEventLoop], aiohttp.ClientSession
+        ] = {}
+        self.stats: dict[str, dict] = {}
+        # Async generators closing each session on loop shutdown
+        self.finalizers: dict[tuple[str, asyncio.AbstractEventLoop], Any] = {}
+
+    def _get_origin(self, url: str) -> str:
+        parsed_url = urlparse(url)
+        return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+    def _get_trace_config(self, origin: str) -> aiohttp.TraceConfig:
+        stats = self.stats.setdefault(
+            origin,
+            {
+                "requests": 0,
+                "in_flight": 0,
+                "connections_created": 0,
+                "connections_reused": 0,
+                "queued": 0,
+                "queued_seconds": 0.0,
+            },
+        )
+
+        async def on_request_start(session, context, params):
+            stats["requests"] += 1
+            stats["in_flight"] += 1
+
+        async def on_request_end(session, context, params):
+            stats["in_flight"] -= 1
+
+        async def on_connection_create_end(session, context, params):
+            stats["connections_created"] += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            stats["connections_reused"] += 1
+
+        async def on_connection_queued_start(session, context, params):
+            context.queued_at = time.monotonic()
+
+        async def on_connection_queued_end(session, context, params):
+            stats["queued"] += 1
+            stats["queued_seconds"] += time.monotonic() - context.queued_at
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_end)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_connection_queued_start.append(on_connection_queued_start)
+        trace_config.on_connection_queued_end.append(on_connection_queued_end)
+        return trace_config
+
+    async def _close_on_loop_shutdown(self, key: tuple):
+        # Suspended for the life of the loop. asyncio.run() closes pending
+        # async generators before closing the loop, which runs this finally.
+        try:
+            yield
+        finally:
+            self.finalizers.pop(key, None)
+            session = self.sessions.pop(key, None)
+            if session is not None and not session.closed:
+                await session.close()
+
+    def _close_finished_sessions(self):
+        # Loops closed without shutting down their async generators
+        for key in [key for key in self.sessions if key[1].is_closed()]:
+            del self.sessions[key]
+            self.finalizers.pop(key, None)
+
+    def get_session(self, url: str) -> aiohttp.ClientSession:
+        origin = self._get_origin(url)
+        loop = asyncio.get_running_loop()
+
+        session = self.sessions.get((origin, loop))
+        if session is not None and not session.closed:
+            return session
+
+        self._close_finished_sessions()
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=AIOHTTP_CLIENT_POOL_LIMIT,
+                limit_per_host=AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+                keepalive_timeout=AIOHTTP_CLIENT_POOL_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=AIOHTTP_CLIENT_POOL_DNS_CACHE_TTL,
+            ),
+            trace_configs=[self._get_trace_config(origin)],
+            trust_env=True,
+        )
+        self.sessions[(origin, loop)] = session
+
+        finalizer = self._close_on_loop_shutdown((origin, loop))
+        try:
+            finalizer.asend(None).send(None)
+        except StopIteration:
+            pass
+        self.finalizers[(origin, loop)] = finalizer
+        return session
+
+    def get_stats(self) -> dict:
+        stats = {}
+        for origin, origin_stats in self.stats.items():
+            stats[origin] = {
+                **origin_stats,
+                "limit_per_host": AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+                "open": any(
+                    not session.closed
+                    for (session_origin, _), session in self.sessions.items()
+                    if session_origin == origin
+                ),
+            }
+        return stats
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        for key, session in list(self.sessions.items()):
+            _, session_loop = key
+            try:
+                if session_loop is loop:
+                    del self.sessions[key]
+                    self.finalizers.pop(key, None)
+                    await session.close()
+                elif session_loop.is_running():
+                    asyncio.run_coroutine_threadsafe(session.close(), session_loop)
+            except Exception as e:
+                log.debug(f"Error closing upstream session: {e}")
+
+
+CLIENT_SESSION_POOL = ClientSessionPool()
+
+
+def get_client_session(url: str) -> aiohttp.ClientSession:
+    return CLIENT_SESSION_POOL.get_session(url)
+
+
+async def close_client_sessions():
+    await CLIENT_SESSION_POOL.close()
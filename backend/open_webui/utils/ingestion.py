@@ -0,0 +1,484 @@
+import asyncio
+import contextvars
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+from starlette.requests import Request
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    ENABLE_INGESTION_QUEUE,
+    INGESTION_QUEUE_WORKERS,
+    INGESTION_QUEUE_MAX_RETRIES,
+)
+from open_webui.models.files import Files
+from open_webui.models.users import Users
+from open_webui.socket.main import get_event_emitter
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+# Job run by the current handler thread, used to report its progress
+current_job: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar(
+    "ingestion_job", default=None
+)
+
+
+class IngestionQueue:
+    """
+    Runs file ingestion jobs (extraction, splitting, embedding and vector
+    insert) on a pool of background workers instead of inside the request.
+
+    Jobs are kept in Redis when available, so they are shared by all workers
+    and survive restarts, and in an in-process queue otherwise. Status and
+    progress changes are emitted to the job owner over "chat-events" and
+    failed jobs are retried with exponential backoff. A job can be chained to
+    another one and only runs once that job has completed; the file's status
+    is left to the job it is chained to.
+    """
+
+    QUEUE_KEY = "open-webui:ingestion:queue"
+    PROCESSING_KEY = "open-webui:ingestion:processing"
+    DELAYED_KEY = "open-webui:ingestion:delayed"
+    JOBS_KEY = "open-webui:ingestion:jobs"
+
+    # Jobs whose worker stopped sending heartbeats for this long are requeued
+    HEARTBEAT_INTERVAL = 30
+    HEARTBEAT_TIMEOUT = 120
+
+    # Finished jobs are kept this long so clients can still read their status
+    FINISHED_JOB_TTL = 86400
+
+    # Seconds between checks of the job a chained job waits for
+    CHAINED_JOB_INTERVAL = 2
+
+    # Minimum seconds between two progress events of a job
+    PROGRESS_INTERVAL = 1
+
+    def __init__(
+        self,
+        enabled: bool = ENABLE_INGESTION_QUEUE,
+        workers: int = INGESTION_QUEUE_WORKERS,
+        max_retries: int = INGESTION_QUEUE_MAX_RETRIES,
+        redis_url: Optional[str] = None,
+        redis_sentinels: Optional[list] = [],
+    ):
+        self.enabled = enabled
+        self.workers = workers
+        self.max_retries = max_retries
+        self.handlers: dict[str, Callable] = {}
+        self.failure_handlers: dict[str, Callable] = {}
+
+        self.app = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.tasks: list[asyncio.Task] = []
+
+        # job_id -> time it was first seen in the processing list
+        self.stalled: dict[str, float] = {}
+
+        # job_id -> time its progress was last emitted
+        self.progress_emitted: dict[str, float] = {}
+
+        # In-process fallback
+        self.lock = threading.Lock()
+        self.local_jobs: dict[str, dict] = {}
+        self.local_queue: Optional[asyncio.Queue] = None
+        self.local_backlog: list[str] = []
+
+        self.redis = None
+        self.async_redis = None
+        if enabled and redis_url:
+            try:
+                self.redis = get_redis_connection(redis_url, redis_sentinels)
+                self.async_redis = get_redis_connection(
+                    redis_url, redis_sentinels, async_mode=True
+                )
+            except Exception as e:
+                log.warning(f"Ingestion queue falling back to in-process queue: {e}")
+                self.redis = None
+                self.async_redis = None
+
+    def register(self, type: str, on_failure: Optional[Callable] = None):
+        """
+        Registers a sync handler called as handler(request, user, **payload).
+        on_failure is called the same way once a job has failed for good.
+        """
+
+        def decorator(func: Callable):
+            self.handlers[type] = func
+            if on_failure:
+                self.failure_handlers[type] = on_failure
+            return func
+
+        return decorator
+
+    ####################
+    # Jobs
+    ####################
+
+    def enqueue(
+        self,
+        type: str,
+        payload: dict,
+        user_id: str,
+        file_id: Optional[str] = None,
+        job_id: Optional[str] = None,
+        after: Optional[str] = None,
+    ) -> dict:
+        """
+        Queues a job and returns it. Safe to call from any thread. A job id
+        that is still pending or processing is not queued twice. With after,
+        the job waits until the job with that id has completed and fails if
+        that job fails.
+        """
+        job_id = job_id or str(uuid.uuid4())
+
+        existing = self.get_job(job_id)
+        if existing and existing["status"] in ["pending", "processing"]:
+            return existing
+
+        now = int(time.time())
+        job = {
+            "id": job_id,
+            "type": type,
+            "payload": payload,
+            "user_id": user_id,
+            "file_id": file_id,
+            "after": after,
+            "status": "pending",
+            "progress": None,
+            "attempts": 0,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+        if file_id and not after:
+            Files.update_file_data_by_id(file_id, {"status": "pending"})
+
+        if self.redis:
+            pipe = self.redis.pipeline()
+            pipe.hset(self.JOBS_KEY, job_id, json.dumps(job))
+            pipe.lpush(self.QUEUE_KEY, job_id)
+            pipe.execute()
+        else:
+            with self.lock:
+                self.local_jobs[job_id] = job
+                if self.loop is None:
+                    self.local_backlog.append(job_id)
+                else:
+                    self.loop.call_soon_threadsafe(self.local_queue.put_nowait, job_id)
+
+        return job
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        if self.redis:
+            job = self.redis.hget(self.JOBS_KEY, job_id)
+            return json.loads(job) if job else None
+
+        with self.lock:
+            job = self.local_jobs.get(job_id)
+            return dict(job) if job else None
+
+    def get_jobs(self, prefix: str = "") -> list[dict]:
+        if self.redis:
+            return [
+                json.loads(job)
+                for _, job in self.redis.hscan_iter(self.JOBS_KEY, match=f"{prefix}*")
+            ]
+
+        with self.lock:
+            return [
+                dict(job)
+                for job_id, job in self.local_jobs.items()
+                if job_id.startswith(prefix)
+            ]
+
+    async def _load_job(self, job_id: str) -> Optional[dict]:
+        if self.async_redis:
+            job = await self.async_redis.hget(self.JOBS_KEY, job_id)
+            return json.loads(job) if job else None
+
+        with self.lock:
+            job = self.local_jobs.get(job_id)
+            return dict(job) if job else None
+
+    async def _save_job(self, job: dict):
+        job["updated_at"] = int(time.time())
+        if self.async_redis:
+            await self.async_redis.hset(self.JOBS_KEY, job["id"], json.dumps(job))
+        else:
+            with self.lock:
+                self.local_jobs[job["id"]] = job
+
+    def report_progress(self, progress: float):
+        """
+        Reports the share (0 to 1) of the current job that is done. Called from
+        handler threads; does nothing outside of a job.
+        """
+        job = current_job.get()
+        if job is None or self.loop is None:
+            return
+
+        now = time.monotonic()
+        if now - self.progress_emitted.get(job["id"], 0) < self.PROGRESS_INTERVAL:
+            return
+        self.progress_emitted[job["id"]] = now
+
+        job["progress"] = round(min(max(progress, 0), 1), 3)
+        asyncio.run_coroutine_threadsafe(self._save_progress(job), self.loop)
+
+    async def _save_progress(self, job: dict):
+        # The job may have finished before this ran
+        if job["status"] != "processing":
+            return
+
+        try:
+            await self._save_job(job)
+            if job["status"] == "processing":
+                await self._emit(job, update_file=False)
+        except Exception as e:
+            log.debug(f"Error saving ingestion progress for job {job['id']}: {e}")
+
+    async def _emit(self, job: dict, update_file: bool = True):
+        if update_file and job.get("file_id") and not job.get("after"):
+            await asyncio.to_thread(
+                Files.update_file_data_by_id,
+                job["file_id"],
+                {"status": job["status"], "error": job["error"]},
+            )
+
+        try:
+            event_emitter = get_event_emitter(
+                {"user_id": job["user_id"]}, update_db=False
+            )
+            await event_emitter(
+                {
+                    "type": "file:status",
+                    "data": {
+                        "job_id": job["id"],
+                        "file_id": job.get("file_id"),
+                        "status": job["status"],
+                        "progress": job.get("progress"),
+                        "attempts": job["attempts"],
+                        "error": job["error"],
+                    },
+                }
+            )
+        except Exception as e:
+            log.debug(f"Error emitting ingestion status for job {job['id']}: {e}")
+
+    ####################
+    # Workers
+    ####################
+
+    async def start(self, app):
+        if not self.enabled:
+            return
+
+        self.app = app
+
+        if self.async_redis:
+            self.loop = asyncio.get_running_loop()
+            # Pick up jobs left behind by workers that stopped mid-job
+            await self._recover()
+            self.tasks.append(asyncio.create_task(self._maintenance()))
+        else:
+            self.local_queue = asyncio.Queue()
+            with self.lock:
+                self.loop = asyncio.get_running_loop()
+                for job_id in self.local_backlog:
+                    self.local_queue.put_nowait(job_id)
+                self.local_backlog = []
+
+        for _ in range(self.workers):
+            self.tasks.append(asyncio.create_task(self._worker()))
+
+        log.info(
+            f"Started {self.workers} ingestion workers ({'redis' if self.async_redis else 'local'} queue)"
+        )
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def _next_job_id(self) -> Optional[str]:
+        if self.async_redis:
+            return await self.async_redis.blmove(
+                self.QUEUE_KEY, self.PROCESSING_KEY, 1, "RIGHT", "LEFT"
+            )
+        return await self.local_queue.get()
+
+    async def _worker(self):
+        while True:
+            try:
+                job_id = await self._next_job_id()
+                if not job_id:
+                    continue
+
+                try:
+                    await self._run(job_id)
+                finally:
+                    if self.async_redis:
+                        await self.async_redis.lrem(self.PROCESSING_KEY, 1, job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception(f"Ingestion worker error: {e}")
+                await asyncio.sleep(1)
+
+    async def _heartbeat(self, job: dict):
+        while True:
+            await asyncio.sleep(self.HEARTBEAT_INTERVAL)
+            await self._save_job(job)
+
+    async def _run(self, job_id: str):
+        job = await self._load_job(job_id)
+        if job is None or job["status"] != "pending":
+            return
+
+        handler = self.handlers.get(job["type"])
+        if handler is None:
+            log.error(f"No ingestion handler registered for job type {job['type']}")
+            return
+
+        if job.get("after"):
+            after = await self._load_job(job["after"])
+            if after and after["status"] in ["pending", "processing"]:
+                await self._retry_later(job_id, self.CHAINED_JOB_INTERVAL)
+                return
+
+            if after and after["status"] == "failed":
+                job["status"] = "failed"
+                job["error"] = after["error"]
+                await self._handle_failure(job)
+                await self._save_job(job)
+                await self._emit(job)
+                return
+
+        job["status"] = "processing"
+        job["progress"] = 0
+        job["attempts"] += 1
+        job["error"] = None
+        await self._save_job(job)
+        await self._emit(job)
+
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            user = await asyncio.to_thread(Users.get_user_by_id, job["user_id"])
+            request = Request({"type": "http", "app": self.app, "headers": []})
+
+            # asyncio.to_thread runs the handler in a copy of this context
+            token = current_job.set(job)
+            try:
+                await asyncio.to_thread(handler, request, user, **job["payload"])
+            finally:
+                current_job.reset(token)
+
+            job["status"] = "completed"
+            job["progress"] = 1
+        except Exception as e:
+            log.exception(f"Ingestion job {job_id} failed: {e}")
+            job["error"] = str(e.detail) if hasattr(e, "detail") else str(e)
+            job["status"] = (
+                "pending" if job["attempts"] <= self.max_retries else "failed"
+            )
+        finally:
+            heartbeat.cancel()
+            self.progress_emitted.pop(job_id, None)
+
+        if job["status"] == "failed":
+            await self._handle_failure(job)
+        await self._save_job(job)
+        await self._emit(job)
+
+        if job["status"] == "pending":
+            await self._retry_later(job_id, 2 ** job["attempts"])
+
+    async def _handle_failure(self, job: dict):
+        on_failure = self.failure_handlers.get(job["type"])
+        if on_failure is None:
+            return
+
+        try:
+            user = await asyncio.to_thread(Users.get_user_by_id, job["user_id"])
+            request = Request({"type": "http", "app": self.app, "headers": []})
+            await asyncio.to_thread(on_failure, request, user, **job["payload"])
+        except Exception as e:
+            log.exception(f"Failure handler of ingestion job {job['id']} failed: {e}")
+
+    async def _retry_later(self, job_id: str, delay: float):
+        if self.async_redis:
+            await self.async_redis.zadd(self.DELAYED_KEY, {job_id: time.time() + delay})
+        else:
+
+            async def requeue():
+                await asyncio.sleep(delay)
+                self.local_queue.put_nowait(job_id)
+
+            task = asyncio.create_task(requeue())
+            self.tasks.append(task)
+            task.add_done_callback(
+                lambda task: task in self.tasks and self.tasks.remove(task)
+            )
+
+    async def _recover(self):
+        now = time.time()
+
+        # Move due retries back onto the queue
+        for job_id in await self.async_redis.zrangebyscore(self.DELAYED_KEY, 0, now):
+            if await self.async_redis.zrem(self.DELAYED_KEY, job_id):
+                await self.async_redis.lpush(self.QUEUE_KEY, job_id)
+
+        processing = await self.async_redis.lrange(self.PROCESSING_KEY, 0, -1)
+        self.stalled = {job_id: self.stalled.get(job_id, now) for job_id in processing}
+        for job_id in processing:
+            job = await self._load_job(job_id)
+            if job and job["status"] == "processing":
+                if now - job["updated_at"] < self.HEARTBEAT_TIMEOUT:
+                    continue
+            elif now - self.stalled[job_id] < self.HEARTBEAT_TIMEOUT:
+                # Taken off the queue but not started yet
+                continue
+
+            # Only the worker that removes the entry requeues the job
+            if await self.async_redis.lrem(self.PROCESSING_KEY, 1, job_id) and job:
+                log.info(f"Requeueing stalled ingestion job {job_id}")
+                job["status"] = "pending"
+                await self._save_job(job)
+                await self.async_redis.lpush(self.QUEUE_KEY, job_id)
+
+        async for job_id, job in self.async_redis.hscan_iter(self.JOBS_KEY):
+            job = json.loads(job)
+            if (
+                job["status"] in ["completed", "failed"]
+                and now - job["updated_at"] > self.FINISHED_JOB_TTL
+            ):
+                await self.async_redis.hdel(self.JOBS_KEY, job_id)
+
+    async def _maintenance(self):
+        while True:
+            await asyncio.sleep(5)
+            try:
+                await self._recover()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.debug(f"Ingestion queue maintenance failed: {e}")
+
+
+INGESTION_QUEUE = IngestionQueue(
+    redis_url=REDIS_URL,
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+)
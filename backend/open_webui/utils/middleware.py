@@ -25,9 +25,11 @@ from starlette.responses import Response, StreamingResponse
 from open_webui.models.chats import Chats
 from open_webui.models.users import Users
 from open_webui.socket.main import (
+    ChatContentStream,
     get_event_call,
     get_event_emitter,
     get_active_status_by_user_id,
+    flush_chat_event_writes,
 )
 from open_webui.routers.tasks import (
     generate_queries,
@@ -56,7 +58,7 @@ from open_webui.models.users import UserModel
 from open_webui.models.functions import Functions
 from open_webui.models.models import Models
 
-from open_webui.retrieval.utils import get_sources_from_files
+from open_webui.retrieval.utils import get_sources_from_files, merge_sources
 
 
 from open_webui.utils.chat import generate_chat_completion
@@ -75,13 +77,14 @@ from open_webui.utils.misc import (
     prepend_to_first_user_message_content,
     convert_logit_bias_input_to_json,
 )
-from open_webui.utils.tools import get_tools
+from open_webui.utils.tools import get_tools, execute_tool_calls
 from open_webui.utils.plugin import load_function_module_by_id
 from open_webui.utils.filter import (
     get_sorted_filter_ids,
     process_filter_functions,
 )
 from open_webui.utils.code_interpreter import execute_code_jupyter
+from open_webui.utils.content_tags import ContentTagParser
 
 from open_webui.tasks import create_task
 
@@ -95,6 +98,7 @@ from open_webui.env import (
     GLOBAL_LOG_LEVEL,
     BYPASS_MODEL_ACCESS_CONTROL,
     ENABLE_REALTIME_CHAT_SAVE,
+    ENABLE_RAG_SPECULATIVE_RETRIEVAL,
 )
 from open_webui.constants import TASKS
 
@@ -184,49 +188,43 @@ async def chat_completion_tools_handler(
 
             result = json.loads(content)
 
-            async def tool_call_handler(tool_call):
-                nonlocal skip_files
-
-                log.debug(f"{tool_call=}")
-
+            async def execute_tool_call(tool_call):
                 tool_function_name = tool_call.get("name", None)
-                if tool_function_name not in tools:
-                    return body, {}
-
                 tool_function_params = tool_call.get("parameters", {})
 
-                try:
-                    tool = tools[tool_function_name]
+                tool = tools[tool_function_name]
+
+                spec = tool.get("spec", {})
+                allowed_params = spec.get("parameters", {}).get("properties", {}).keys()
+                tool_function_params = {
+                    k: v for k, v in tool_function_params.items() if k in allowed_params
+                }
+                tool_call["parameters"] = tool_function_params
 
-                    spec = tool.get("spec", {})
-                    allowed_params = (
-                        spec.get("parameters", {}).get("properties", {}).keys()
+                if tool.get("direct", False):
+                    return await event_caller(
+                        {
+                            "type": "execute:tool",
+                            "data": {
+                                "id": str(uuid4()),
+                                "name": tool_function_name,
+                                "params": tool_function_params,
+                                "server": tool.get("server", {}),
+                                "session_id": metadata.get("session_id", None),
+                            },
+                        }
                     )
-                    tool_function_params = {
-                        k: v
-                        for k, v in tool_function_params.items()
-                        if k in allowed_params
-                    }
 
-                    if tool.get("direct", False):
-                        tool_result = await event_caller(
-                            {
-                                "type": "execute:tool",
-                                "data": {
-                                    "id": str(uuid4()),
-                                    "name": tool_function_name,
-                                    "params": tool_function_params,
-                                    "server": tool.get("server", {}),
-                                    "session_id": metadata.get("session_id", None),
-                                },
-                            }
-                        )
-                    else:
-                        tool_function = tool["callable"]
-                        tool_result = await tool_function(**tool_function_params)
+                tool_function = tool["callable"]
+                return await tool_function(**tool_function_params)
 
-                except Exception as e:
-                    tool_result = str(e)
+            def tool_result_handler(tool_call, tool_result):
+                nonlocal skip_files
+
+                log.debug(f"{tool_call=}")
+
+                tool_function_name = tool_call.get("name", None)
+                tool_function_params = tool_call.get("parameters", {})
 
                 tool_result_files = []
                 if isinstance(tool_result, list):
@@ -282,10 +280,20 @@ async def chat_completion_tools_handler(
 
             # check if "tool_calls" in result
             if result.get("tool_calls"):
-                for tool_call in result.get("tool_calls"):
-                    await tool_call_handler(tool_call)
+                tool_calls = result.get("tool_calls")
             else:
-                await tool_call_handler(result)
+                tool_calls = [result]
+            tool_calls = [
+                tool_call
+                for tool_call in tool_calls
+                if tool_call.get("name", None) in tools
+            ]
+
+            # Independent tool calls run concurrently, their results are added
+            # to the messages in call order
+            tool_results = await execute_tool_calls(tool_calls, execute_tool_call)
+            for tool_call, tool_result in zip(tool_calls, tool_results):
+                tool_result_handler(tool_call, tool_result)
 
         except Exception as e:
             log.debug(f"Error: {e}")
@@ -602,71 +610,150 @@ async def chat_image_generation_handler(
 
 
 async def chat_completion_files_handler(
-    request: Request, body: dict, user: UserModel
+    request: Request, body: dict, user: UserModel, queries: Optional[list] = None
 ) -> tuple[dict, dict[str, list]]:
+    """
+    Retrieves the sources for the files in the body's metadata. The search
+    queries are generated from the messages unless given.
+
+    With ENABLE_RAG_SPECULATIVE_RETRIEVAL, retrieval with the user's message
+    starts while the queries are generated; its results are merged with those
+    of the generated queries, or replaced by them when the user's message is
+    not one of the queries.
+    """
     sources = []
+    speculative_task = None
 
-    if files := body.get("metadata", {}).get("files", None):
-        queries = []
+    async def get_sources(files: list[dict], queries: list[str]) -> list[dict]:
+        # Offload get_sources_from_files to a separate thread. The executor
+        # isn't waited for on exit so cancelling this never blocks the loop.
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor()
         try:
-            queries_response = await generate_queries(
-                request,
-                {
-                    "model": body["model"],
-                    "messages": body["messages"],
-                    "type": "retrieval",
-                },
-                user,
+            return await loop.run_in_executor(
+                executor,
+                lambda: get_sources_from_files(
+                    request=request,
+                    files=files,
+                    queries=queries,
+                    embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
+                        query, prefix=prefix, user=user
+                    ),
+                    k=request.app.state.config.TOP_K,
+                    reranking_function=request.app.state.rf,
+                    k_reranker=request.app.state.config.TOP_K_RERANKER,
+                    r=request.app.state.config.RELEVANCE_THRESHOLD,
+                    hybrid_bm25_weight=request.app.state.config.HYBRID_BM25_WEIGHT,
+                    hybrid_search=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
+                    full_context=request.app.state.config.RAG_FULL_CONTEXT,
+                ),
             )
-            queries_response = queries_response["choices"][0]["message"]["content"]
+        finally:
+            executor.shutdown(wait=False)
+
+    try:
+        if (files := body.get("metadata", {}).get("files", None)) and not queries:
+            user_message = get_last_user_message(body["messages"])
+            if ENABLE_RAG_SPECULATIVE_RETRIEVAL and user_message:
+                speculative_task = asyncio.create_task(
+                    get_sources(files, [user_message])
+                )
 
+            queries = []
             try:
-                bracket_start = queries_response.find("{")
-                bracket_end = queries_response.rfind("}") + 1
+                queries_response = await generate_queries(
+                    request,
+                    {
+                        "model": body["model"],
+                        "messages": body["messages"],
+                        "type": "retrieval",
+                    },
+                    user,
+                )
+                queries_response = queries_response["choices"][0]["message"]["content"]
 
-                if bracket_start == -1 or bracket_end == -1:
-                    raise Exception("No JSON object found in the response")
+                try:
+                    bracket_start = queries_response.find("{")
+                    bracket_end = queries_response.rfind("}") + 1
 
-                queries_response = queries_response[bracket_start:bracket_end]
-                queries_response = json.loads(queries_response)
-            except Exception as e:
-                queries_response = {"queries": [queries_response]}
+                    if bracket_start == -1 or bracket_end == -1:
+                        raise Exception("No JSON object found in the response")
 
-            queries = queries_response.get("queries", [])
-        except:
-            pass
+                    queries_response = queries_response[bracket_start:bracket_end]
+                    queries_response = json.loads(queries_response)
+                except Exception as e:
+                    queries_response = {"queries": [queries_response]}
 
-        if len(queries) == 0:
-            queries = [get_last_user_message(body["messages"])]
+                queries = queries_response.get("queries", [])
+            except:
+                pass
 
-        try:
-            # Offload get_sources_from_files to a separate thread
-            loop = asyncio.get_running_loop()
-            with ThreadPoolExecutor() as executor:
-                sources = await loop.run_in_executor(
-                    executor,
-                    lambda: get_sources_from_files(
-                        request=request,
-                        files=files,
-                        queries=queries,
-                        embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
-                            query, prefix=prefix, user=user
-                        ),
+            if len(queries) == 0:
+                queries = [user_message]
+
+        if files:
+            try:
+                if speculative_task:
+                    speculative_sources = None
+                    try:
+                        speculative_sources = await speculative_task
+                    except Exception as e:
+                        log.exception(e)
+
+                    if speculative_sources is None:
+                        kept_sources, new_sources = [], await get_sources(
+                            files, queries
+                        )
+                    else:
+                        # Sources without distances were retrieved regardless of
+                        # the query and are reused as they are
+                        query_free_sources = [
+                            source
+                            for source in speculative_sources
+                            if "distances" not in source
+                        ]
+                        kept_sources = (
+                            speculative_sources
+                            if user_message in queries
+                            else query_free_sources
+                        )
+
+                        new_sources = []
+                        if new_queries := [
+                            query for query in queries if query != user_message
+                        ]:
+                            query_free_files = [
+                                source["source"] for source in query_free_sources
+                            ]
+                            new_sources = await get_sources(
+                                [
+                                    file
+                                    for file in files
+                                    if not any(
+                                        file is kept for kept in query_free_files
+                                    )
+                                ],
+                                new_queries,
+                            )
+
+                    sources = merge_sources(
+                        files,
+                        [kept_sources, new_sources],
                         k=request.app.state.config.TOP_K,
-                        reranking_function=request.app.state.rf,
-                        k_reranker=request.app.state.config.TOP_K_RERANKER,
-                        r=request.app.state.config.RELEVANCE_THRESHOLD,
-                        hybrid_bm25_weight=request.app.state.config.HYBRID_BM25_WEIGHT,
-                        hybrid_search=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
-                        full_context=request.app.state.config.RAG_FULL_CONTEXT,
-                    ),
-                )
-        except Exception as e:
-            log.exception(e)
+                    )
+                else:
+                    sources = await get_sources(files, queries)
+            except Exception as e:
+                log.exception(e)
 
-        log.debug(f"rag_contexts:sources: {sources}")
+            log.debug(f"rag_contexts:sources: {sources}")
+    finally:
+        # Don't leave speculative retrieval running when the handler fails or
+        # is cancelled before its results are used
+        if speculative_task and not speculative_task.done():
+            speculative_task.cancel()
 
-    return body, {"sources": sources}
+    return body, {"sources": sources, "queries": queries}
 
 
 def apply_params_to_form_data(form_data, model):
@@ -717,6 +804,10 @@ def apply_params_to_form_data(form_data, model):
     return form_data
 
 
+def get_unique_files(files: list[dict]) -> list[dict]:
+    return list({json.dumps(f, sort_keys=True): f for f in files}.values())
+
+
 async def process_chat_payload(request, form_data, user, metadata, model):
     form_data = apply_params_to_form_data(form_data, model)
     log.debug(f"form_data: {form_data}")
@@ -806,7 +897,7 @@ async def process_chat_payload(request, form_data, user, metadata, model):
     try:
 
         filter_functions = [
-            Functions.get_function_by_id(filter_id)
+            await Functions.get_function_by_id_async(filter_id)
             for filter_id in get_sorted_filter_ids(
                 request, model, metadata.get("filter_ids", [])
             )
@@ -822,22 +913,50 @@ async def process_chat_payload(request, form_data, user, metadata, model):
     except Exception as e:
         raise Exception(f"Error: {e}")
 
-    features = form_data.pop("features", None)
-    if features:
-        if "memory" in features and features["memory"]:
-            form_data = await chat_memory_handler(
-                request, form_data, extra_params, user
-            )
+    features = form_data.pop("features", None) or {}
 
-        if "web_search" in features and features["web_search"]:
-            form_data = await chat_web_search_handler(
-                request, form_data, extra_params, user
-            )
+    # Seconds taken by each pre-processing step
+    timings = {}
 
-        if "image_generation" in features and features["image_generation"]:
-            form_data = await chat_image_generation_handler(
-                request, form_data, extra_params, user
+    async def timed(name, coroutine):
+        start = time.perf_counter()
+        try:
+            return await coroutine
+        finally:
+            timings[name] = round(time.perf_counter() - start, 3)
+
+    # Retrieval from the attached files and knowledge doesn't depend on the
+    # steps below, so it starts right away on the conversation as sent
+    retrieval_body = None
+    retrieval_task = None
+    if form_data.get("files"):
+        retrieval_body = {
+            "model": form_data["model"],
+            "messages": [{**message} for message in form_data["messages"]],
+            "metadata": {"files": get_unique_files(form_data["files"])},
+        }
+        retrieval_task = asyncio.create_task(
+            timed(
+                "retrieval",
+                chat_completion_files_handler(request, retrieval_body, user),
             )
+        )
+
+    try:
+        # Memory, web search and image generation are independent and run
+        # concurrently; each applies its result to form_data when it's done
+        feature_handlers = {
+            "memory": chat_memory_handler,
+            "web_search": chat_web_search_handler,
+            "image_generation": chat_image_generation_handler,
+        }
+        feature_tasks = [
+            timed(feature, handler(request, form_data, extra_params, user))
+            for feature, handler in feature_handlers.items()
+            if features.get(feature)
+        ]
+        if feature_tasks:
+            await asyncio.gather(*feature_tasks)
 
         if "code_interpreter" in features and features["code_interpreter"]:
             form_data["messages"] = add_or_update_user_message(
@@ -849,78 +968,114 @@ async def process_chat_payload(request, form_data, user, metadata, model):
                 form_data["messages"],
             )
 
-    tool_ids = form_data.pop("tool_ids", None)
-    files = form_data.pop("files", None)
+        tool_ids = form_data.pop("tool_ids", None)
+        files = form_data.pop("files", None)
 
-    # Remove files duplicates
-    if files:
-        files = list({json.dumps(f, sort_keys=True): f for f in files}.values())
+        # Remove files duplicates
+        if files:
+            files = get_unique_files(files)
 
-    metadata = {
-        **metadata,
-        "tool_ids": tool_ids,
-        "files": files,
-    }
-    form_data["metadata"] = metadata
+        metadata = {
+            **metadata,
+            "tool_ids": tool_ids,
+            "files": files,
+        }
+        form_data["metadata"] = metadata
 
-    # Server side tools
-    tool_ids = metadata.get("tool_ids", None)
-    # Client side tools
-    tool_servers = metadata.get("tool_servers", None)
+        # Server side tools
+        tool_ids = metadata.get("tool_ids", None)
+        # Client side tools
+        tool_servers = metadata.get("tool_servers", None)
 
-    log.debug(f"{tool_ids=}")
-    log.debug(f"{tool_servers=}")
+        log.debug(f"{tool_ids=}")
+        log.debug(f"{tool_servers=}")
 
-    tools_dict = {}
+        tools_dict = {}
 
-    if tool_ids:
-        tools_dict = get_tools(
-            request,
-            tool_ids,
-            user,
-            {
-                **extra_params,
-                "__model__": models[task_model_id],
-                "__messages__": form_data["messages"],
-                "__files__": metadata.get("files", []),
-            },
-        )
+        if tool_ids:
+            tools_dict = get_tools(
+                request,
+                tool_ids,
+                user,
+                {
+                    **extra_params,
+                    "__model__": models[task_model_id],
+                    "__messages__": form_data["messages"],
+                    "__files__": metadata.get("files", []),
+                },
+            )
 
-    if tool_servers:
-        for tool_server in tool_servers:
-            tool_specs = tool_server.pop("specs", [])
+        if tool_servers:
+            for tool_server in tool_servers:
+                tool_specs = tool_server.pop("specs", [])
 
-            for tool in tool_specs:
-                tools_dict[tool["name"]] = {
-                    "spec": tool,
-                    "direct": True,
-                    "server": tool_server,
-                }
+                for tool in tool_specs:
+                    tools_dict[tool["name"]] = {
+                        "spec": tool,
+                        "direct": True,
+                        "server": tool_server,
+                    }
 
-    if tools_dict:
-        if metadata.get("function_calling") == "native":
-            # If the function calling is native, then call the tools function calling handler
-            metadata["tools"] = tools_dict
-            form_data["tools"] = [
-                {"type": "function", "function": tool.get("spec", {})}
-                for tool in tools_dict.values()
-            ]
-        else:
-            # If the function calling is not native, then call the tools function calling handler
-            try:
-                form_data, flags = await chat_completion_tools_handler(
-                    request, form_data, extra_params, user, models, tools_dict
-                )
+        if tools_dict:
+            if metadata.get("function_calling") == "native":
+                # If the function calling is native, then call the tools function calling handler
+                metadata["tools"] = tools_dict
+                form_data["tools"] = [
+                    {"type": "function", "function": tool.get("spec", {})}
+                    for tool in tools_dict.values()
+                ]
+            else:
+                # If the function calling is not native, then call the tools function calling handler
+                try:
+                    form_data, flags = await timed(
+                        "tools",
+                        chat_completion_tools_handler(
+                            request, form_data, extra_params, user, models, tools_dict
+                        ),
+                    )
+                    sources.extend(flags.get("sources", []))
+
+                except Exception as e:
+                    log.exception(e)
+
+        try:
+            if retrieval_task and "files" not in form_data["metadata"]:
+                # A tool handles the files itself
+                retrieval_task.cancel()
+            elif retrieval_task:
+                _, flags = await retrieval_task
                 sources.extend(flags.get("sources", []))
 
-            except Exception as e:
-                log.exception(e)
+                # Files added since, such as web search results, are retrieved
+                # from with the same queries
+                retrieved_files = retrieval_body["metadata"]["files"]
+                new_files = [file for file in files if file not in retrieved_files]
+                if new_files:
+                    _, flags = await timed(
+                        "web_search_retrieval",
+                        chat_completion_files_handler(
+                            request,
+                            {**form_data, "metadata": {"files": new_files}},
+                            user,
+                            queries=flags.get("queries"),
+                        ),
+                    )
+                    sources.extend(flags.get("sources", []))
+            else:
+                form_data, flags = await timed(
+                    "retrieval", chat_completion_files_handler(request, form_data, user)
+                )
+                sources.extend(flags.get("sources", []))
+        except Exception as e:
+            log.exception(e)
+    finally:
+        # Stop retrieval when pre-processing fails or is cancelled before
+        # its results are used
+        if retrieval_task and not retrieval_task.done():
+            retrieval_task.cancel()
 
-    try:
-        form_data, flags = await chat_completion_files_handler(request, form_data, user)
-        sources.extend(flags.get("sources", []))
-    except Exception as e:
-        log.exception(e)
+    if timings:
+        log.info(f"Chat request pre-processing timings (seconds): {timings}")
 
     # If context is not empty, insert it into the messages
     if len(sources) > 0:
@@ -1079,13 +1234,16 @@ async def process_chat_response(
                                 "follow_ups", []
                             )
 
-                            Chats.upsert_message_to_chat_by_id_and_message_id(
+                            await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                                 metadata["chat_id"],
                                 metadata["message_id"],
                                 {
                                     "followUps": follow_ups,
                                 },
                             )
+                            await Chats.compact_chat_messages_by_id_async(
+                                metadata["chat_id"]
+                            )
 
                             await event_emitter(
                                 {
@@ -1141,7 +1299,9 @@ async def process_chat_response(
                             if not title:
                                 title = messages[0].get("content", user_message)
 
-                            Chats.update_chat_title_by_id(metadata["chat_id"], title)
+                            await Chats.update_chat_title_by_id_async(
+                                metadata["chat_id"], title
+                            )
 
                             await event_emitter(
                                 {
@@ -1152,7 +1312,9 @@ async def process_chat_response(
                     elif len(messages) == 2:
                         title = messages[0].get("content", user_message)
 
-                        Chats.update_chat_title_by_id(metadata["chat_id"], title)
+                        await Chats.update_chat_title_by_id_async(
+                            metadata["chat_id"], title
+                        )
 
                         await event_emitter(
                             {
@@ -1217,9 +1379,11 @@ async def process_chat_response(
     # Non-streaming response
     if not isinstance(response, StreamingResponse):
         if event_emitter:
+            await flush_chat_event_writes(metadata["chat_id"], metadata["message_id"])
+
             if "error" in response:
                 error = response["error"].get("detail", response["error"])
-                Chats.upsert_message_to_chat_by_id_and_message_id(
+                await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                     metadata["chat_id"],
                     metadata["message_id"],
                     {
@@ -1228,7 +1392,7 @@ async def process_chat_response(
                 )
 
             if "selected_model_id" in response:
-                Chats.upsert_message_to_chat_by_id_and_message_id(
+                await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                     metadata["chat_id"],
                     metadata["message_id"],
                     {
@@ -1249,7 +1413,7 @@ async def process_chat_response(
                         }
                     )
 
-                    title = Chats.get_chat_title_by_id(metadata["chat_id"])
+                    title = await Chats.get_chat_title_by_id_async(metadata["chat_id"])
 
                     await event_emitter(
                         {
@@ -1263,7 +1427,7 @@ async def process_chat_response(
                     )
 
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -1273,8 +1437,10 @@ async def process_chat_response(
                     )
 
                     # Send a webhook notification if the user is not active
-                    if not get_active_status_by_user_id(user.id):
-                        webhook_url = Users.get_user_webhook_url_by_id(user.id)
+                    if not await get_active_status_by_user_id(user.id):
+                        webhook_url = await Users.get_user_webhook_url_by_id_async(
+                            user.id
+                        )
                         if webhook_url:
                             post_webhook(
                                 request.app.state.WEBUI_NAME,
@@ -1290,6 +1456,9 @@ async def process_chat_response(
 
                     await background_tasks_handler()
 
+            # Fold the message rows written above into the chat
+            await Chats.compact_chat_messages_by_id_async(metadata["chat_id"])
+
             if events and isinstance(events, list) and isinstance(response, dict):
                 extra_response = {}
                 for event in events:
@@ -1336,7 +1505,7 @@ async def process_chat_response(
         "__model__": model,
     }
     filter_functions = [
-        Functions.get_function_by_id(filter_id)
+        await Functions.get_function_by_id_async(filter_id)
         for filter_id in get_sorted_filter_ids(
             request, model, metadata.get("filter_ids", [])
         )
@@ -1347,7 +1516,7 @@ async def process_chat_response(
         task_id = str(uuid4())  # Create a unique task ID.
         model_id = form_data.get("model", "")
 
-        Chats.upsert_message_to_chat_by_id_and_message_id(
+        await Chats.upsert_message_to_chat_by_id_and_message_id_async(
             metadata["chat_id"],
             metadata["message_id"],
             {
@@ -1524,157 +1693,9 @@ async def process_chat_response(
 
                 return messages
 
-            def tag_content_handler(content_type, tags, content, content_blocks):
-                end_flag = False
-
-                def extract_attributes(tag_content):
-                    """Extract attributes from a tag if they exist."""
-                    attributes = {}
-                    if not tag_content:  # Ensure tag_content is not None
-                        return attributes
-                    # Match attributes in the format: key="value" (ignores single quotes for simplicity)
-                    matches = re.findall(r'(\w+)\s*=\s*"([^"]+)"', tag_content)
-                    for key, value in matches:
-                        attributes[key] = value
-                    return attributes
-
-                if content_blocks[-1]["type"] == "text":
-                    for start_tag, end_tag in tags:
-                        # Match start tag e.g., <tag> or <tag attr="value">
-                        start_tag_pattern = rf"<{re.escape(start_tag)}(\s.*?)?>"
-                        match = re.search(start_tag_pattern, content)
-                        if match:
-                            attr_content = (
-                                match.group(1) if match.group(1) else ""
-                            )  # Ensure it's not None
-                            attributes = extract_attributes(
-                                attr_content
-                            )  # Extract attributes safely
-
-                            # Capture everything before and after the matched tag
-                            before_tag = content[
-                                : match.start()
-                            ]  # Content before opening tag
-                            after_tag = content[
-                                match.end() :
-                            ]  # Content after opening tag
-
-                            # Remove the start tag and after from the currently handling text block
-                            content_blocks[-1]["content"] = content_blocks[-1][
-                                "content"
-                            ].replace(match.group(0) + after_tag, "")
-
-                            if before_tag:
-                                content_blocks[-1]["content"] = before_tag
-
-                            if not content_blocks[-1]["content"]:
-                                content_blocks.pop()
-
-                            # Append the new block
-                            content_blocks.append(
-                                {
-                                    "type": content_type,
-                                    "start_tag": start_tag,
-                                    "end_tag": end_tag,
-                                    "attributes": attributes,
-                                    "content": "",
-                                    "started_at": time.time(),
-                                }
-                            )
-
-                            if after_tag:
-                                content_blocks[-1]["content"] = after_tag
-                                tag_content_handler(
-                                    content_type, tags, after_tag, content_blocks
-                                )
-
-                            break
-                elif content_blocks[-1]["type"] == content_type:
-                    start_tag = content_blocks[-1]["start_tag"]
-                    end_tag = content_blocks[-1]["end_tag"]
-                    # Match end tag e.g., </tag>
-                    end_tag_pattern = rf"<{re.escape(end_tag)}>"
-
-                    # Check if the content has the end tag
-                    if re.search(end_tag_pattern, content):
-                        end_flag = True
-
-                        block_content = content_blocks[-1]["content"]
-                        # Strip start and end tags from the content
-                        start_tag_pattern = rf"<{re.escape(start_tag)}(.*?)>"
-                        block_content = re.sub(
-                            start_tag_pattern, "", block_content
-                        ).strip()
-
-                        end_tag_regex = re.compile(end_tag_pattern, re.DOTALL)
-                        split_content = end_tag_regex.split(block_content, maxsplit=1)
-
-                        # Content inside the tag
-                        block_content = (
-                            split_content[0].strip() if split_content else ""
-                        )
-
-                        # Leftover content (everything after `</tag>`)
-                        leftover_content = (
-                            split_content[1].strip() if len(split_content) > 1 else ""
-                        )
-
-                        if block_content:
-                            content_blocks[-1]["content"] = block_content
-                            content_blocks[-1]["ended_at"] = time.time()
-                            content_blocks[-1]["duration"] = int(
-                                content_blocks[-1]["ended_at"]
-                                - content_blocks[-1]["started_at"]
-                            )
-
-                            # Reset the content_blocks by appending a new text block
-                            if content_type != "code_interpreter":
-                                if leftover_content:
-
-                                    content_blocks.append(
-                                        {
-                                            "type": "text",
-                                            "content": leftover_content,
-                                        }
-                                    )
-                                else:
-                                    content_blocks.append(
-                                        {
-                                            "type": "text",
-                                            "content": "",
-                                        }
-                                    )
-
-                        else:
-                            # Remove the block if content is empty
-                            content_blocks.pop()
+            await flush_chat_event_writes(metadata["chat_id"], metadata["message_id"])
 
-                            if leftover_content:
-                                content_blocks.append(
-                                    {
-                                        "type": "text",
-                                        "content": leftover_content,
-                                    }
-                                )
-                            else:
-                                content_blocks.append(
-                                    {
-                                        "type": "text",
-                                        "content": "",
-                                    }
-                                )
-
-                        # Clean processed content
-                        content = re.sub(
-                            rf"<{re.escape(start_tag)}(.*?)>(.|\n)*?<{re.escape(end_tag)}>",
-                            "",
-                            content,
-                            flags=re.DOTALL,
-                        )
-
-                return content, content_blocks, end_flag
-
-            message = Chats.get_message_by_id_and_message_id(
+            message = await Chats.get_message_by_id_and_message_id_async(
                 metadata["chat_id"], metadata["message_id"]
             )
 
@@ -1723,6 +1744,18 @@ async def process_chat_response(
 
             solution_tags = [("|begin_of_solution|", "|end_of_solution|")]
 
+            tag_parser = ContentTagParser(
+                content_blocks,
+                [
+                    ("reasoning", reasoning_tags if DETECT_REASONING else []),
+                    (
+                        "code_interpreter",
+                        code_interpreter_tags if DETECT_CODE_INTERPRETER else [],
+                    ),
+                    ("solution", solution_tags if DETECT_SOLUTION else []),
+                ],
+            )
+
             try:
                 for event in events:
                     await event_emitter(
@@ -1733,7 +1766,7 @@ async def process_chat_response(
                     )
 
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -1747,6 +1780,10 @@ async def process_chat_response(
 
                     response_tool_calls = []
 
+                    content_stream = ChatContentStream(
+                        event_emitter, lambda: serialize_content_blocks(content_blocks)
+                    )
+
                     async for line in response.body_iterator:
                         line = line.decode("utf-8") if isinstance(line, bytes) else line
                         data = line
@@ -1779,7 +1816,7 @@ async def process_chat_response(
 
                                 if "selected_model_id" in data:
                                     model_id = data["selected_model_id"]
-                                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                                    await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                                         metadata["chat_id"],
                                         metadata["message_id"],
                                         {
@@ -1900,11 +1937,8 @@ async def process_chat_response(
 
                                         reasoning_block["content"] += reasoning_content
 
-                                        data = {
-                                            "content": serialize_content_blocks(
-                                                content_blocks
-                                            )
-                                        }
+                                        data = None
+                                        await content_stream.update()
 
                                     if value:
                                         if (
@@ -1943,42 +1977,13 @@ async def process_chat_response(
                                             content_blocks[-1]["content"] + value
                                         )
 
-                                        if DETECT_REASONING:
-                                            content, content_blocks, _ = (
-                                                tag_content_handler(
-                                                    "reasoning",
-                                                    reasoning_tags,
-                                                    content,
-                                                    content_blocks,
-                                                )
-                                            )
-
-                                        if DETECT_CODE_INTERPRETER:
-                                            content, content_blocks, end = (
-                                                tag_content_handler(
-                                                    "code_interpreter",
-                                                    code_interpreter_tags,
-                                                    content,
-                                                    content_blocks,
-                                                )
-                                            )
-
-                                            if end:
-                                                break
-
-                                        if DETECT_SOLUTION:
-                                            content, content_blocks, _ = (
-                                                tag_content_handler(
-                                                    "solution",
-                                                    solution_tags,
-                                                    content,
-                                                    content_blocks,
-                                                )
-                                            )
+                                        # Split off reasoning, code and solution blocks
+                                        if tag_parser.parse() == "code_interpreter":
+                                            break
 
                                         if ENABLE_REALTIME_CHAT_SAVE:
                                             # Save message in the database
-                                            Chats.upsert_message_to_chat_by_id_and_message_id(
+                                            await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                                                 metadata["chat_id"],
                                                 metadata["message_id"],
                                                 {
@@ -1988,18 +1993,16 @@ async def process_chat_response(
                                                 },
                                             )
                                         else:
-                                            data = {
-                                                "content": serialize_content_blocks(
-                                                    content_blocks
-                                                ),
-                                            }
+                                            data = None
+                                            await content_stream.update()
 
-                                await event_emitter(
-                                    {
-                                        "type": "chat:completion",
-                                        "data": data,
-                                    }
-                                )
+                                if data:
+                                    await event_emitter(
+                                        {
+                                            "type": "chat:completion",
+                                            "data": data,
+                                        }
+                                    )
                         except Exception as e:
                             done = "data: [DONE]" in line
                             if done:
@@ -2008,6 +2011,8 @@ async def process_chat_response(
                                 log.debug("Error: ", e)
                                 continue
 
+                    await content_stream.flush()
+
                     if content_blocks:
                         # Clean up the last text block
                         if content_blocks[-1]["type"] == "text":
@@ -2060,11 +2065,8 @@ async def process_chat_response(
 
                     tools = metadata.get("tools", {})
 
-                    results = []
-
+                    tool_calls_params = []
                     for tool_call in response_tool_calls:
-                        tool_call_id = tool_call.get("id", "")
-                        tool_name = tool_call.get("function", {}).get("name", "")
                         tool_args = tool_call.get("function", {}).get("arguments", "{}")
 
                         tool_function_params = {}
@@ -2092,51 +2094,44 @@ async def process_chat_response(
                         tool_call.setdefault("function", {})["arguments"] = json.dumps(
                             tool_function_params
                         )
+                        tool_calls_params.append((tool_call, tool_function_params))
 
-                        tool_result = None
+                    async def execute_tool_call(tool_call_params):
+                        tool_call, tool_function_params = tool_call_params
+                        tool_name = tool_call.get("function", {}).get("name", "")
+                        if tool_name not in tools:
+                            return None
 
-                        if tool_name in tools:
-                            tool = tools[tool_name]
-                            spec = tool.get("spec", {})
+                        tool = tools[tool_name]
+                        spec = tool.get("spec", {})
 
-                            try:
-                                allowed_params = (
-                                    spec.get("parameters", {})
-                                    .get("properties", {})
-                                    .keys()
-                                )
+                        allowed_params = (
+                            spec.get("parameters", {}).get("properties", {}).keys()
+                        )
+                        tool_function_params = {
+                            k: v
+                            for k, v in tool_function_params.items()
+                            if k in allowed_params
+                        }
 
-                                tool_function_params = {
-                                    k: v
-                                    for k, v in tool_function_params.items()
-                                    if k in allowed_params
+                        if tool.get("direct", False):
+                            return await event_caller(
+                                {
+                                    "type": "execute:tool",
+                                    "data": {
+                                        "id": str(uuid4()),
+                                        "name": tool_name,
+                                        "params": tool_function_params,
+                                        "server": tool.get("server", {}),
+                                        "session_id": metadata.get("session_id", None),
+                                    },
                                 }
+                            )
 
-                                if tool.get("direct", False):
-                                    tool_result = await event_caller(
-                                        {
-                                            "type": "execute:tool",
-                                            "data": {
-                                                "id": str(uuid4()),
-                                                "name": tool_name,
-                                                "params": tool_function_params,
-                                                "server": tool.get("server", {}),
-                                                "session_id": metadata.get(
-                                                    "session_id", None
-                                                ),
-                                            },
-                                        }
-                                    )
-
-                                else:
-                                    tool_function = tool["callable"]
-                                    tool_result = await tool_function(
-                                        **tool_function_params
-                                    )
-
-                            except Exception as e:
-                                tool_result = str(e)
+                        tool_function = tool["callable"]
+                        return await tool_function(**tool_function_params)
 
+                    def get_tool_call_result(tool_call, tool_result):
                         tool_result_files = []
                         if isinstance(tool_result, list):
                             for item in tool_result:
@@ -2150,18 +2145,42 @@ async def process_chat_response(
                         ):
                             tool_result = json.dumps(tool_result, indent=2)
 
-                        results.append(
+                        return {
+                            "tool_call_id": tool_call.get("id", ""),
+                            "content": tool_result,
+                            **(
+                                {"files": tool_result_files}
+                                if tool_result_files
+                                else {}
+                            ),
+                        }
+
+                    results = [None] * len(response_tool_calls)
+
+                    async def tool_call_complete_handler(index, tool_result):
+                        # Show each result as soon as its call completes
+                        results[index] = get_tool_call_result(
+                            response_tool_calls[index], tool_result
+                        )
+                        content_blocks[-1]["results"] = [
+                            result for result in results if result is not None
+                        ]
+                        await event_emitter(
                             {
-                                "tool_call_id": tool_call_id,
-                                "content": tool_result,
-                                **(
-                                    {"files": tool_result_files}
-                                    if tool_result_files
-                                    else {}
-                                ),
+                                "type": "chat:completion",
+                                "data": {
+                                    "content": serialize_content_blocks(content_blocks),
+                                },
                             }
                         )
 
+                    # Independent tool calls run concurrently, results are kept in call order
+                    await execute_tool_calls(
+                        tool_calls_params,
+                        execute_tool_call,
+                        on_complete=tool_call_complete_handler,
+                    )
+
                     content_blocks[-1]["results"] = results
 
                     content_blocks.append(
@@ -2369,7 +2388,11 @@ async def process_chat_response(
                             log.debug(e)
                             break
 
-                title = Chats.get_chat_title_by_id(metadata["chat_id"])
+                await flush_chat_event_writes(
+                    metadata["chat_id"], metadata["message_id"]
+                )
+
+                title = await Chats.get_chat_title_by_id_async(metadata["chat_id"])
                 data = {
                     "done": True,
                     "content": serialize_content_blocks(content_blocks),
@@ -2378,7 +2401,7 @@ async def process_chat_response(
 
                 if not ENABLE_REALTIME_CHAT_SAVE:
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -2386,17 +2409,21 @@ async def process_chat_response(
                         },
                     )
 
+                # Fold the streamed message rows into the chat once per response
+                await Chats.compact_chat_messages_by_id_async(metadata["chat_id"])
+
                 # Send a webhook notification if the user is not active
-                if not get_active_status_by_user_id(user.id):
-                    webhook_url = Users.get_user_webhook_url_by_id(user.id)
+                if not await get_active_status_by_user_id(user.id):
+                    webhook_url = await Users.get_user_webhook_url_by_id_async(user.id)
                     if webhook_url:
+                        webhook_content = tag_parser.remove_tagged_content(content)
                         post_webhook(
                             request.app.state.WEBUI_NAME,
                             webhook_url,
-                            f"{title} - {request.app.state.config.WEBUI_URL}/c/{metadata['chat_id']}\n\n{content}",
+                            f"{title} - {request.app.state.config.WEBUI_URL}/c/{metadata['chat_id']}\n\n{webhook_content}",
                             {
                                 "action": "chat",
-                                "message": content,
+                                "message": webhook_content,
                                 "title": title,
                                 "url": f"{request.app.state.config.WEBUI_URL}/c/{metadata['chat_id']}",
                             },
@@ -2413,10 +2440,13 @@ async def process_chat_response(
             except asyncio.CancelledError:
                 log.warning("Task was cancelled!")
                 await event_emitter({"type": "task-cancelled"})
+                await flush_chat_event_writes(
+                    metadata["chat_id"], metadata["message_id"]
+                )
 
                 if not ENABLE_REALTIME_CHAT_SAVE:
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -2424,12 +2454,24 @@ async def process_chat_response(
                         },
                     )
 
+                await Chats.compact_chat_messages_by_id_async(metadata["chat_id"])
+
             if response.background is not None:
                 await response.background()
 
+        async def post_response_task(response, events):
+            try:
+                await post_response_handler(response, events)
+            finally:
+                # Also write the buffered events when the handler fails or is
+                # cancelled, shielded from a repeated cancellation
+                await asyncio.shield(
+                    flush_chat_event_writes(metadata["chat_id"], metadata["message_id"])
+                )
+
         # background_tasks.add_task(post_response_handler, response, events)
         task_id, _ = await create_task(
-            request, post_response_handler(response, events), id=metadata["chat_id"]
+            request, post_response_task(response, events), id=metadata["chat_id"]
         )
         return {"status": True, "task_id": task_id}
 
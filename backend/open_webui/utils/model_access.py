@@ -0,0 +1,124 @@
+import logging
+import time
+from typing import Optional
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+)
+from open_webui.models.groups import Groups
+from open_webui.models.models import Models
+from open_webui.utils.access_control import has_access
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+class ModelAccessCache:
+    """
+    Remembers which models each user can read, so listing models resolves
+    access for all of them with one model and one group query instead of
+    two queries per model.
+
+    Entries are dropped when a model or group changes. The generation counter
+    is kept in Redis when available so every worker sees the invalidation.
+    """
+
+    REDIS_KEY = "open-webui:model-access:generation"
+
+    # Upper bound on staleness for changes made outside the API
+    TTL = 300
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        redis_sentinels: Optional[list] = [],
+    ):
+        self.generation = 0
+        self.entries: dict[str, dict] = {}
+
+        self.redis = None
+        self.async_redis = None
+        if redis_url:
+            try:
+                self.redis = get_redis_connection(redis_url, redis_sentinels)
+                self.async_redis = get_redis_connection(
+                    redis_url, redis_sentinels, async_mode=True
+                )
+            except Exception as e:
+                log.warning(f"Model access cache invalidation is local only: {e}")
+                self.redis = None
+                self.async_redis = None
+
+    async def _get_generation(self) -> int:
+        if self.async_redis:
+            try:
+                return int(await self.async_redis.get(self.REDIS_KEY) or 0)
+            except Exception as e:
+                log.debug(f"Model access cache Redis read failed: {e}")
+        return self.generation
+
+    def invalidate(self):
+        self.generation += 1
+        self.entries = {}
+        if self.redis:
+            try:
+                self.redis.incr(self.REDIS_KEY)
+            except Exception as e:
+                log.debug(f"Model access cache Redis write failed: {e}")
+
+    async def get_accessible_model_ids(
+        self, user_id: str, model_ids: list[str]
+    ) -> set[str]:
+        """
+        Returns the ids in model_ids the user owns or has read access to.
+        Models without a database entry are not accessible.
+        """
+        generation = await self._get_generation()
+        now = time.monotonic()
+
+        entry = self.entries.get(user_id)
+        if (
+            entry is None
+            or entry["generation"] != generation
+            or now - entry["created_at"] > self.TTL
+        ):
+            self.entries = {
+                cached_user_id: cached
+                for cached_user_id, cached in self.entries.items()
+                if now - cached["created_at"] <= self.TTL
+            }
+            entry = {"generation": generation, "created_at": now, "access": {}}
+            self.entries[user_id] = entry
+
+        access = entry["access"]
+        missing_ids = [id for id in model_ids if id not in access]
+        if missing_ids:
+            user_group_ids = set(await Groups.get_group_ids_by_member_id_async(user_id))
+            models = {
+                model.id: model
+                for model in await Models.get_models_by_ids_async(missing_ids)
+            }
+
+            for id in missing_ids:
+                model = models.get(id)
+                access[id] = model is not None and (
+                    user_id == model.user_id
+                    or has_access(
+                        user_id,
+                        type="read",
+                        access_control=model.access_control,
+                        user_group_ids=user_group_ids,
+                    )
+                )
+
+        return {id for id in model_ids if access[id]}
+
+
+MODEL_ACCESS_CACHE = ModelAccessCache(
+    redis_url=REDIS_URL,
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+)
@@ -0,0 +1,243 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    MODELS_CACHE_TTL,
+    MODELS_CACHE_STALE_TTL,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+class ModelCatalogCache:
+    """
+    Caches the model lists fetched from the Ollama and OpenAI connections.
+
+    Concurrent requests for a list share one fetch, a list past its TTL keeps
+    being served for stale_ttl seconds while it is refreshed in the background,
+    and with Redis the lists are shared by all workers so each refresh polls
+    the upstreams once instead of once per worker.
+
+    Lists are stored serialized and every caller gets its own copy, so callers
+    may keep modifying the models they receive.
+
+    Every invalidation bumps a generation number of the list name, shared
+    through Redis; a refresh that started before it returns its list to the
+    requests waiting on it but doesn't cache it.
+    """
+
+    REDIS_KEY_PREFIX = "open-webui:model-catalog"
+
+    # Refresh lock expiry, in case the worker holding it stops mid-fetch
+    LOCK_TIMEOUT = 30
+
+    def __init__(
+        self,
+        ttl: float = MODELS_CACHE_TTL,
+        stale_ttl: float = MODELS_CACHE_STALE_TTL,
+        redis_url: Optional[str] = None,
+        redis_sentinels: Optional[list] = [],
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+        # key -> {"value": serialized list, "fetched_at": unix time, "generation": int}
+        self.entries: dict[str, dict] = {}
+        self.in_flight: dict[str, asyncio.Task] = {}
+        # name -> number of invalidations, used when there is no Redis
+        self.generations: dict[str, int] = {}
+
+        self.redis = None
+        if redis_url:
+            try:
+                self.redis = get_redis_connection(
+                    redis_url, redis_sentinels, async_mode=True
+                )
+            except Exception as e:
+                log.warning(f"Model catalog cache is local only: {e}")
+
+    @staticmethod
+    def get_key(name: str, *parts: Any) -> str:
+        """
+        Builds a cache key from everything the fetched list depends on, such
+        as the connection configs, without putting secrets in Redis keys.
+        """
+        return (
+            f"{name}:"
+            + hashlib.sha256(
+                json.dumps(parts, sort_keys=True, default=str).encode()
+            ).hexdigest()
+        )
+
+    def _get_redis_key(self, key: str) -> str:
+        return f"{self.REDIS_KEY_PREFIX}:{key}"
+
+    def _get_generation_key(self, key: str) -> str:
+        # Outside the prefix of the lists, so invalidating doesn't reset it
+        name = key.split(":", 1)[0]
+        return f"{self.REDIS_KEY_PREFIX}-generation:{name}"
+
+    async def _get_generation(self, key: str) -> int:
+        if self.redis:
+            try:
+                return int(await self.redis.get(self._get_generation_key(key)) or 0)
+            except Exception as e:
+                log.debug(f"Model catalog Redis read failed: {e}")
+        return self.generations.get(key.split(":", 1)[0], 0)
+
+    async def _load_shared(self, key: str) -> tuple[Optional[dict], Optional[int]]:
+        """
+        Returns the list shared through Redis and the current generation, or
+        None for the generation if it is unknown.
+        """
+        if not self.redis:
+            return None, None
+
+        try:
+            entry, generation = await self.redis.mget(
+                self._get_redis_key(key), self._get_generation_key(key)
+            )
+            generation = int(generation or 0)
+            if not entry:
+                return None, generation
+
+            entry = json.loads(entry)
+            # Written by a refresh that started before an invalidation
+            if entry.get("generation", 0) != generation:
+                return None, generation
+            return entry, generation
+        except Exception as e:
+            log.debug(f"Model catalog Redis read failed: {e}")
+            return None, None
+
+    async def _refresh(
+        self, key: str, fetch: Callable[[], Awaitable[Any]], background: bool
+    ) -> Optional[str]:
+        lock_key = f"{self._get_redis_key(key)}:lock"
+        if background and self.redis:
+            try:
+                # Another worker is already refreshing this list
+                if not await self.redis.set(lock_key, 1, nx=True, ex=self.LOCK_TIMEOUT):
+                    return None
+            except Exception as e:
+                log.debug(f"Model catalog Redis lock failed: {e}")
+
+        try:
+            generation = await self._get_generation(key)
+            entry = {
+                "value": json.dumps(await fetch()),
+                "fetched_at": time.time(),
+                "generation": generation,
+            }
+
+            # The list was invalidated while it was being fetched
+            if await self._get_generation(key) != generation:
+                return entry["value"]
+
+            self.entries[key] = entry
+
+            if self.redis:
+                try:
+                    await self.redis.set(
+                        self._get_redis_key(key),
+                        json.dumps(entry),
+                        ex=max(int(self.ttl + self.stale_ttl) + 1, 1),
+                    )
+                except Exception as e:
+                    log.debug(f"Model catalog Redis write failed: {e}")
+
+            return entry["value"]
+        finally:
+            if background and self.redis:
+                try:
+                    await self.redis.delete(lock_key)
+                except Exception:
+                    pass
+
+    def _refresh_once(
+        self, key: str, fetch: Callable[[], Awaitable[Any]], background: bool
+    ) -> asyncio.Task:
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._refresh(key, fetch, background))
+            self.in_flight[key] = task
+
+            def done(task: asyncio.Task):
+                if self.in_flight.get(key) is task:
+                    del self.in_flight[key]
+                if not task.cancelled() and task.exception():
+                    log.warning(
+                        f"Refreshing model list {key} failed: {task.exception()}"
+                    )
+
+            task.add_done_callback(done)
+        return task
+
+    async def get(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        if self.ttl <= 0:
+            return await fetch()
+
+        entry = self.entries.get(key)
+        if entry is None or time.time() - entry["fetched_at"] >= self.ttl:
+            shared, generation = await self._load_shared(key)
+            # Invalidated by another worker, don't keep serving the old list
+            if entry is not None and generation not in (None, entry["generation"]):
+                entry = None
+                self.entries.pop(key, None)
+            if shared and (entry is None or shared["fetched_at"] > entry["fetched_at"]):
+                entry = shared
+                self.entries[key] = entry
+
+        if entry is not None:
+            age = time.time() - entry["fetched_at"]
+            if age < self.ttl:
+                return json.loads(entry["value"])
+            if age < self.ttl + self.stale_ttl:
+                self._refresh_once(key, fetch, background=True)
+                return json.loads(entry["value"])
+
+        # Nothing usable cached, wait for the (shared) fetch. Shielded so a
+        # cancelled request doesn't cancel the fetch other requests wait on.
+        value = await asyncio.shield(self._refresh_once(key, fetch, background=False))
+        if value is None:
+            # Joined a background refresh that yielded to another worker
+            value = await self._refresh(key, fetch, background=False)
+        return json.loads(value)
+
+    async def invalidate(self, name: str):
+        """
+        Drops the cached lists of the given name so the next request fetches
+        them from the upstreams again.
+        """
+        prefix = f"{name}:"
+        self.generations[name] = self.generations.get(name, 0) + 1
+        for key in [key for key in self.entries if key.startswith(prefix)]:
+            del self.entries[key]
+        for key in [key for key in self.in_flight if key.startswith(prefix)]:
+            del self.in_flight[key]
+
+        if self.redis:
+            try:
+                await self.redis.incr(self._get_generation_key(prefix))
+                async for redis_key in self.redis.scan_iter(
+                    match=f"{self.REDIS_KEY_PREFIX}:{prefix}*"
+                ):
+                    await self.redis.delete(redis_key)
+            except Exception as e:
+                log.debug(f"Model catalog Redis invalidation failed: {e}")
+
+
+MODEL_CATALOG_CACHE = ModelCatalogCache(
+    redis_url=REDIS_URL,
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+)
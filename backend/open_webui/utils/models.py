@@ -119,22 +119,26 @@ async def get_all_models(request, user: UserModel = None):
         models = models + arena_models
 
     global_action_ids = [
-        function.id for function in Functions.get_global_action_functions()
+        function.id for function in await Functions.get_global_action_functions_async()
     ]
     enabled_action_ids = [
         function.id
-        for function in Functions.get_functions_by_type("action", active_only=True)
+        for function in await Functions.get_functions_by_type_async(
+            "action", active_only=True
+        )
     ]
 
     global_filter_ids = [
-        function.id for function in Functions.get_global_filter_functions()
+        function.id for function in await Functions.get_global_filter_functions_async()
     ]
     enabled_filter_ids = [
         function.id
-        for function in Functions.get_functions_by_type("filter", active_only=True)
+        for function in await Functions.get_functions_by_type_async(
+            "filter", active_only=True
+        )
     ]
 
-    custom_models = Models.get_all_models()
+    custom_models = await Models.get_all_models_async()
     for custom_model in custom_models:
         if custom_model.base_model_id is None:
             for model in models:
@@ -271,7 +275,7 @@ async def get_all_models(request, user: UserModel = None):
 
         model["actions"] = []
         for action_id in action_ids:
-            action_function = Functions.get_function_by_id(action_id)
+            action_function = await Functions.get_function_by_id_async(action_id)
             if action_function is None:
                 raise Exception(f"Action not found: {action_id}")
 
@@ -282,7 +286,7 @@ async def get_all_models(request, user: UserModel = None):
 
         model["filters"] = []
         for filter_id in filter_ids:
-            filter_function = Functions.get_function_by_id(filter_id)
+            filter_function = await Functions.get_function_by_id_async(filter_id)
             if filter_function is None:
                 raise Exception(f"Filter not found: {filter_id}")
 
@@ -49,6 +49,7 @@ from open_webui.env import (
 from open_webui.utils.misc import parse_duration
 from open_webui.utils.auth import get_password_hash, create_token
 from open_webui.utils.webhook import post_webhook
+from open_webui.utils.model_access import MODEL_ACCESS_CACHE
 
 from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
 
@@ -198,6 +199,7 @@ class OAuthManager:
                         created_group = Groups.insert_new_group(
                             creator_id, new_group_form
                         )
+                        MODEL_ACCESS_CACHE.invalidate()
                         if created_group:
                             log.info(
                                 f"Successfully created group '{group_name}' with ID {created_group.id} using creator ID {creator_id}"
@@ -253,6 +255,7 @@ class OAuthManager:
                 Groups.update_group_by_id(
                     id=group_model.id, form_data=update_form, overwrite=False
                 )
+                MODEL_ACCESS_CACHE.invalidate()
 
         # Add user to new groups
         for group_model in all_available_groups:
@@ -284,6 +287,7 @@ class OAuthManager:
                 Groups.update_group_by_id(
                     id=group_model.id, form_data=update_form, overwrite=False
                 )
+                MODEL_ACCESS_CACHE.invalidate()
 
     async def _process_picture_url(
         self, picture_url: str, access_token: str = None
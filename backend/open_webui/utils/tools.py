@@ -40,6 +40,8 @@ from open_webui.env import (
     SRC_LOG_LEVELS,
     AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA,
     AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL,
+    TOOL_CALL_MAX_CONCURRENCY,
+    TOOL_CALL_TIMEOUT,
 )
 
 import copy
@@ -646,3 +648,40 @@ async def execute_tool_server(
         error = str(err)
         log.exception(f"API Request Error: {error}")
         return {"error": error}
+
+
+async def execute_tool_calls(
+    tool_calls: list,
+    execute: Callable[[Any], Awaitable[Any]],
+    on_complete: Optional[Callable[[int, Any], Awaitable[None]]] = None,
+    max_concurrency: int = TOOL_CALL_MAX_CONCURRENCY,
+    timeout: Optional[float] = TOOL_CALL_TIMEOUT,
+) -> list:
+    """
+    Runs execute(tool_call) for all tool calls concurrently, at most
+    max_concurrency at a time and each for at most timeout seconds, and
+    returns the results in the order of tool_calls. A call that fails or times
+    out results in its error message. on_complete(index, result) is awaited
+    as each call finishes.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+
+    async def run(index: int, tool_call: Any) -> Any:
+        try:
+            if semaphore:
+                async with semaphore:
+                    result = await asyncio.wait_for(execute(tool_call), timeout)
+            else:
+                result = await asyncio.wait_for(execute(tool_call), timeout)
+        except asyncio.TimeoutError:
+            result = f"Tool call timed out after {timeout} seconds"
+        except Exception as e:
+            result = str(e)
+
+        if on_complete:
+            await on_complete(index, result)
+        return result
+
+    return await asyncio.gather(
+        *[run(index, tool_call) for index, tool_call in enumerate(tool_calls)]
+    )